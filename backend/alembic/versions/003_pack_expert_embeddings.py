@@ -0,0 +1,89 @@
+"""Store experts.embedding as packed float32 bytea, or pgvector
+
+Revision ID: 003
+Revises: c2c68bce9c7e
+Create Date: 2025-08-04 00:00:00.000000
+
+EXPERT_EMBEDDING_STORAGE picks the layout and must match the app's setting
+(app/utils/vector_column.py):
+    bytea     384 little-endian float32s per row (1.5 KB instead of ~8 KB of JSON)
+    pgvector  vector(384) with an HNSW cosine index; needs the vector extension
+Rows whose JSON isn't a 384-float array become NULL.
+"""
+import os
+import json
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = 'c2c68bce9c7e'
+branch_labels = None
+depends_on = None
+
+EMBEDDING_DIM = 384
+BATCH_ROWS = 1000
+STORAGE = os.getenv("EXPERT_EMBEDDING_STORAGE", "bytea").lower()
+
+def _convert_rows(select_sql: str, update_sql: str, convert):
+    """Rewrite a column in keyset-paginated batches; convert(value) -> new value or None"""
+    bind = op.get_bind()
+    last_id = ""
+    while True:
+        rows = bind.execute(sa.text(select_sql), {"last_id": last_id, "limit": BATCH_ROWS}).fetchall()
+        if not rows:
+            break
+        bind.execute(sa.text(update_sql), [{"id": id_, "value": convert(value)} for id_, value in rows])
+        last_id = rows[-1][0]
+
+def _pack(value):
+    values = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(values, list) or len(values) != EMBEDDING_DIM:
+        return None
+    return np.asarray(values, dtype="<f4").tobytes()
+
+def _unpack(value):
+    return None if value is None else json.dumps(np.frombuffer(value, dtype="<f4").tolist())
+
+def upgrade():
+    if STORAGE == "pgvector":
+        op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        op.execute(f"""
+            ALTER TABLE experts ALTER COLUMN embedding TYPE vector({EMBEDDING_DIM}) USING (
+                CASE WHEN json_typeof(embedding) = 'array' AND json_array_length(embedding) = {EMBEDDING_DIM}
+                     THEN (embedding::text)::vector({EMBEDDING_DIM}) END
+            )
+        """)
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_experts_embedding_hnsw "
+            "ON experts USING hnsw (embedding vector_cosine_ops)"
+        )
+        return
+
+    op.add_column('experts', sa.Column('embedding_f32', sa.LargeBinary(), nullable=True))
+    _convert_rows(
+        "SELECT id, embedding::text FROM experts WHERE id > :last_id AND embedding IS NOT NULL "
+        "ORDER BY id LIMIT :limit",
+        "UPDATE experts SET embedding_f32 = :value WHERE id = :id",
+        _pack
+    )
+    op.drop_column('experts', 'embedding')
+    op.alter_column('experts', 'embedding_f32', new_column_name='embedding')
+
+def downgrade():
+    if STORAGE == "pgvector":
+        op.execute("DROP INDEX IF EXISTS ix_experts_embedding_hnsw")
+        op.execute("ALTER TABLE experts ALTER COLUMN embedding TYPE json USING (embedding::text)::json")
+        return
+
+    op.add_column('experts', sa.Column('embedding_json', sa.JSON(), nullable=True))
+    _convert_rows(
+        "SELECT id, embedding FROM experts WHERE id > :last_id AND embedding IS NOT NULL "
+        "ORDER BY id LIMIT :limit",
+        "UPDATE experts SET embedding_json = CAST(:value AS json) WHERE id = :id",
+        _unpack
+    )
+    op.drop_column('experts', 'embedding')
+    op.alter_column('experts', 'embedding_json', new_column_name='embedding')
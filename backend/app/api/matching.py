@@ -3,6 +3,10 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from app.models.expert_dna import MatchingPreferences
 from app.services.search_service import search_service
+from app.services.expert_service import ExpertService
+from app.services.similar_experts import similar_experts_index
+from app.services.vector_search import vector_search_service
+from app.utils.database import get_collection
 
 router = APIRouter(prefix="/api/matching", tags=["matching"])
 
@@ -73,10 +77,23 @@ async def smart_match_experts(request: SmartMatchRequest):
 
 @router.get("/similar-experts/{expert_id}")
 async def get_similar_experts(expert_id: str, limit: int = 5):
-    """Get similar experts based on an expert ID"""
+    """Get similar experts based on an expert ID, from the precomputed neighbour table"""
     try:
+        similar = similar_experts_index.get_similar(expert_id, limit=limit)
+        scores = {(source, id_): score for source, id_, score in similar}
+        experts = {}
+        vector_search_service.init_collections()
+        for source in {source for source, _, _ in similar}:
+            collection = get_collection(f"{source}_experts")
+            stored = collection.get(
+                ids=[id_ for s, id_, _ in similar if s == source], include=["metadatas"]
+            )
+            for id_, metadata in zip(stored["ids"], stored["metadatas"]):
+                expert = ExpertService._expert_from_metadata(metadata, source).dict()
+                expert["similarity"] = scores[(source, id_)]
+                experts[(source, id_)] = expert
         return {
-            "similar_experts": [],
+            "similar_experts": [experts[(s, id_)] for s, id_, _ in similar if (s, id_) in experts],
             "expert_id": expert_id
         }
     except Exception as e:
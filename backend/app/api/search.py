@@ -2,6 +2,7 @@
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any, Optional
 from app.models.schemas import SearchQuery, SearchResponse
+from app.services.metadata_filter import InvalidFilterError, parse_filters
 from app.services.search_service import SearchService
 from app.models.expert import Expert
 
@@ -10,9 +11,17 @@ router = APIRouter(prefix="/api/search", tags=["search"])
 # Initialize service
 search_service = SearchService()
 
+def validate_filters(filters: Dict[str, Any]):
+    """Reject filter values that can't be applied with a 400 instead of failing mid-search"""
+    try:
+        parse_filters(filters)
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/", response_model=SearchResponse)
 async def search_experts(query: SearchQuery):
     """Search for experts based on query and filters"""
+    validate_filters(query.filters)
     try:
         results = await search_service.search(
             query=query.query,
@@ -34,6 +43,7 @@ async def search_experts(query: SearchQuery):
 @router.post("/vector", response_model=SearchResponse)
 async def vector_search(query: SearchQuery):
     """Vector similarity search for experts"""
+    validate_filters(query.filters)
     try:
         results = await search_service.vector_search(
             query=query.query,
@@ -45,7 +55,8 @@ async def vector_search(query: SearchQuery):
             results=results["experts"],
             total=results["total"],
             query=query.query,
-            filters=query.filters
+            filters=query.filters,
+            timings=results.get("timings", {})
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
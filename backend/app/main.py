@@ -38,6 +38,9 @@ except ImportError as e:
 
 from app.routers import clerk_webhook
 
+# Load the embedding model on a background thread at startup instead of on first search
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "true").lower() == "true"
+
 # Create FastAPI app
 app = FastAPI(title="Expert Finder API", version="2.0.0")
 
@@ -109,6 +112,11 @@ if ENHANCED_OUTREACH_ENABLED:
 @app.on_event("startup")
 async def startup_event():
     """Initialize the database on startup"""
+    # A search snapshot, if present, serves queries before the vector store is opened
+    from app.services.search_snapshot import SEARCH_SNAPSHOT_RESTORE, search_state_restorer
+    if SEARCH_SNAPSHOT_RESTORE:
+        search_state_restorer.restore()
+    
     try:
         init_db()
         print("✅ Database initialized successfully")
@@ -117,10 +125,38 @@ async def startup_event():
         print("🔄 Continuing startup without database...")
         # Don't fail startup in production if DB is not available
         
+    if EMBEDDING_WARMUP:
+        from app.utils.embeddings import embedding_generator
+        embedding_generator.warm_up_in_background()
+        print("🔥 Embedding model warming up in the background")
+
+    from app.utils.reranker import reranker
+    if reranker.enabled:
+        reranker.warm_up_in_background()
+        print("🔥 Cross-encoder reranker warming up in the background")
+
+    # One pooled client for Google CSE, GitHub and Clerk calls
+    from app.utils.http_client import outbound_http
+    await outbound_http.start()
+
+    from app.services.similar_experts import SIMILAR_EXPERTS_ENABLED, similar_experts_index
+    if SIMILAR_EXPERTS_ENABLED:
+        similar_experts_index.start_background_refresh()
+        print("🔗 Similar-experts table refreshing in the background")
+        
     print(f"📦 Outreach module enabled: {OUTREACH_ENABLED}")
     print(f"🚀 Enhanced outreach enabled: {ENHANCED_OUTREACH_ENABLED}")
     print("🌟 Expert Finder API is starting up...")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush in-memory vector index state to disk and close outbound connections"""
+    from app.services.vector_search import vector_search_service
+    vector_search_service.save()
+    
+    from app.utils.http_client import outbound_http
+    await outbound_http.close()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -140,6 +176,85 @@ async def health_check():
         "outreach_enabled": OUTREACH_ENABLED
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: only ready once the embedding model is loaded"""
+    from app.utils.embeddings import embedding_generator
+    if not embedding_generator.is_loaded:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "loading",
+                "embedding_model_loaded": False,
+                "error": embedding_generator.load_error
+            }
+        )
+    return {
+        "status": "ready",
+        "embedding_model_loaded": True,
+        "embedding_backend": embedding_generator.backend,
+        "load_seconds": embedding_generator.load_seconds
+    }
+
+@app.get("/debug/embeddings")
+async def debug_embeddings():
+    """Embedding backend in use, its per-call latency and micro-batching metrics"""
+    from app.utils.embeddings import embedding_generator
+    from app.utils.embedding_batcher import embedding_batcher
+    stats = embedding_generator.get_stats()
+    stats["batching"] = embedding_batcher.get_stats()
+    return stats
+
+@app.get("/debug/rerank")
+async def debug_rerank():
+    """Cross-encoder rerank usage, latency and how often it fell back to vector order"""
+    from app.utils.reranker import reranker
+    return reranker.get_stats()
+
+@app.get("/debug/similar-experts")
+async def debug_similar_experts():
+    """Size, freshness and last update of the precomputed similar-experts table"""
+    from app.services.similar_experts import similar_experts_index
+    return similar_experts_index.get_stats()
+
+@app.get("/debug/search-snapshot")
+async def debug_search_snapshot():
+    """Whether startup restored a snapshot, how long it took and the consistency check result"""
+    from app.services.search_snapshot import search_state_restorer
+    return search_state_restorer.status
+
+@app.get("/debug/search-planner")
+async def debug_search_planner():
+    """How often searches were answered locally, and write-behind indexing of discovered experts"""
+    from app.services.discovered_experts import discovered_expert_indexer
+    return discovered_expert_indexer.get_stats()
+
+@app.get("/debug/http-pool")
+async def debug_http_pool():
+    """Outbound connection pool utilization and per-host request counts and latency"""
+    from app.utils.http_client import outbound_http
+    return outbound_http.get_stats()
+
+@app.get("/debug/github-profiles")
+async def debug_github_profiles():
+    """GitHub profile cache hit ratio, 304 revalidations and negatively cached users"""
+    from app.services.github_profiles import github_profile_cache
+    return github_profile_cache.get_stats()
+
+@app.get("/debug/search-cache")
+async def debug_search_cache():
+    """Search result cache hit ratio (fresh and stale), background refreshes and read/write latency"""
+    from app.services.search_cache import search_result_cache
+    return search_result_cache.get_stats()
+
+@app.get("/debug/singleflight")
+async def debug_singleflight():
+    """How many searches, GitHub lookups and embeddings were coalesced onto an in-flight call"""
+    from app.utils.singleflight import get_all_stats, redis_singleflight
+    stats = get_all_stats()
+    stats["redis"] = redis_singleflight.get_stats()
+    return stats
+
 @app.get("/favicon.ico")
 async def favicon():
     """Return favicon to prevent 404 errors"""
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, String, Text, JSON, DateTime, Integer, Float, Boolean, ForeignKey, Enum
 from sqlalchemy.sql import func
 from app.utils.database import Base
+from app.utils.vector_column import EmbeddingColumn
 import uuid
 
 class ExpertDB(Base):
@@ -22,7 +23,7 @@ class ExpertDB(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
     # Additional fields for matching
-    embedding = Column(JSON)  # Store embeddings for similarity search
+    embedding = Column(EmbeddingColumn())  # float32 bytes or pgvector, see app/utils/vector_column.py
     expertise_level = Column(Integer)  # 1-5 scale
     rating = Column(Float)
     total_projects = Column(Integer)
@@ -49,6 +49,16 @@ class Expert(ExpertBase):
     languages: List[str] = []
     timezone: Optional[str] = None
     
+    # Profile signals used for search ranking
+    source: Optional[str] = None  # "linkedin" | "scholar"
+    linkedin_url: Optional[str] = None
+    scholar_url: Optional[str] = None
+    experience_years: Optional[int] = None
+    education_level: Optional[str] = None
+    citations: Optional[int] = None
+    credibility_score: Optional[float] = None
+    similarity: Optional[float] = None  # cosine similarity to the query, set by vector search
+    
     class Config:
         from_attributes = True
 
@@ -13,3 +13,5 @@ class SearchResponse(BaseModel):
     total: int
     query: str
     filters: Dict[str, Any]
+    # Per-source search timings (vector search): {"sources": {...}, "merge_ms", "total_ms"}
+    timings: Dict[str, Any] = {}
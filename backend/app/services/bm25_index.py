@@ -0,0 +1,225 @@
+"""In-memory inverted index with BM25 scoring over expert search text"""
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Keeps tech tokens like "c++", "c#" and "node.js" intact
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#]+|\.[a-z0-9]+)*")
+STOP_WORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "the", "to", "with", "who", "what", "find", "expert", "experts",
+])
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall((text or "").lower()) if token not in STOP_WORDS]
+
+class _GrowableArray:
+    """Append-only NumPy buffer; views taken before a resize stay valid"""
+
+    def __init__(self, dtype, capacity: int = 4):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.empty(max(4, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+class BM25Index:
+    """
+    Term -> (doc, term frequency) postings for every indexed expert.
+
+    Documents are keyed by (source, id); re-adding a key replaces the old
+    document, which is tombstoned. A query scores only the postings of its
+    terms (term-at-a-time into a score array) and returns the top k with
+    argpartition, so no full ranking is ever built.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.loaded_sources = set()
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._postings: Dict[str, Tuple[_GrowableArray, _GrowableArray]] = {}
+        self._doc_keys: List[Tuple[str, str]] = []
+        self._key_to_doc: Dict[Tuple[str, str], int] = {}
+        self._doc_lengths = _GrowableArray(np.float32, 1024)
+        self._alive = _GrowableArray(bool, 1024)
+        self._source_codes: Dict[str, int] = {}
+        self._doc_sources = _GrowableArray(np.int8, 1024)
+        self._live_docs = 0
+        self._live_length = 0.0
+
+    def __len__(self) -> int:
+        return self._live_docs
+
+    def add(self, source: str, ids: List[str], texts: List[str]):
+        with self._lock:
+            code = self._source_codes.setdefault(source, len(self._source_codes))
+            for id_, text in zip(ids, texts):
+                self._remove_key((source, id_))
+                doc = len(self._doc_keys)
+                tokens = tokenize(text)
+                self._doc_keys.append((source, id_))
+                self._key_to_doc[(source, id_)] = doc
+                self._doc_lengths.append(len(tokens))
+                self._alive.append(True)
+                self._doc_sources.append(code)
+                self._live_docs += 1
+                self._live_length += len(tokens)
+
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for token, tf in counts.items():
+                    if token not in self._postings:
+                        self._postings[token] = (_GrowableArray(np.int32), _GrowableArray(np.float32))
+                    docs, tfs = self._postings[token]
+                    docs.append(doc)
+                    tfs.append(tf)
+
+    def ensure_source(self, source: str, load_documents: Callable[[], Tuple[List[str], List[str]]]) -> bool:
+        """Index a source's existing (ids, texts) once; True if it was loaded by this call"""
+        if source in self.loaded_sources:
+            return False
+        with self._load_lock:
+            if source in self.loaded_sources:
+                return False
+            # Mark first so rows written while loading are indexed by add() too
+            self.loaded_sources.add(source)
+            try:
+                ids, texts = load_documents()
+            except Exception:
+                self.loaded_sources.discard(source)
+                raise
+            self.add(source, ids, texts)
+            return True
+
+    def delete(self, source: str, ids: Iterable[str]):
+        with self._lock:
+            for id_ in ids:
+                self._remove_key((source, id_))
+
+    def _remove_key(self, key: Tuple[str, str]):
+        doc = self._key_to_doc.pop(key, None)
+        if doc is not None:
+            self._alive.data[doc] = False
+            self._live_docs -= 1
+            self._live_length -= float(self._doc_lengths.data[doc])
+
+    def search(self, query: str, limit: int, sources: Optional[Iterable[str]] = None) -> List[Tuple[float, str, str]]:
+        """Top `limit` (score, source, id), best first"""
+        terms = set(tokenize(query))
+        with self._lock:
+            postings = [self._postings[term] for term in terms if term in self._postings]
+            if not postings or not self._live_docs:
+                return []
+            num_docs = len(self._doc_keys)
+            doc_lengths = self._doc_lengths.view()
+            alive = self._alive.view()
+            doc_sources = self._doc_sources.view()
+            allowed = None if sources is None else [
+                self._source_codes[source] for source in sources if source in self._source_codes
+            ]
+            postings = [(docs.view(), tfs.view()) for docs, tfs in postings]
+            avg_length = self._live_length / self._live_docs if self._live_docs else 1.0
+            live_docs = self._live_docs
+
+        scores = np.zeros(num_docs, dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lengths / max(avg_length, 1e-6))
+        for docs, tfs in postings:
+            idf = np.log(1 + (live_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            # Each doc appears once per term's postings, so plain fancy-index += is safe
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + length_norm[docs])
+
+        candidates = np.unique(np.concatenate([docs for docs, _ in postings]))
+        keep = alive[candidates]
+        if allowed is not None:
+            keep &= np.isin(doc_sources[candidates], allowed)
+        candidates = candidates[keep]
+        if not len(candidates):
+            return []
+        candidate_scores = scores[candidates]
+        if len(candidates) > limit:
+            top = np.argpartition(-candidate_scores, limit - 1)[:limit]
+            candidates, candidate_scores = candidates[top], candidate_scores[top]
+        order = np.argsort(-candidate_scores, kind="stable")
+        return [
+            (float(candidate_scores[i]),) + self._doc_keys[candidates[i]]
+            for i in order
+        ]
+
+    def export_state(self) -> Dict[str, np.ndarray]:
+        """Flat arrays of the whole index (for app/services/search_snapshot.py)"""
+        with self._lock:
+            terms = list(self._postings)
+            lengths = np.array([self._postings[term][0].size for term in terms], dtype=np.int64)
+            return {
+                "terms": np.array(terms, dtype=object),
+                "term_offsets": np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+                "posting_docs": np.concatenate([self._postings[t][0].view() for t in terms] or [np.zeros(0, np.int32)]),
+                "posting_tfs": np.concatenate([self._postings[t][1].view() for t in terms] or [np.zeros(0, np.float32)]),
+                "doc_keys": np.array(["\t".join(key) for key in self._doc_keys], dtype=object),
+                "doc_lengths": self._doc_lengths.view().copy(),
+                "alive": self._alive.view().copy(),
+                "doc_sources": self._doc_sources.view().copy(),
+                "source_names": np.array(sorted(self._source_codes, key=self._source_codes.get), dtype=object),
+                "loaded_sources": np.array(sorted(self.loaded_sources), dtype=object),
+            }
+
+    def load_state(self, state: Dict[str, np.ndarray]):
+        """Replace the index with export_state() arrays; postings stay views until appended to"""
+        def wrap(values: np.ndarray) -> _GrowableArray:
+            grown = _GrowableArray(values.dtype, 1)
+            grown.data, grown.size = np.asarray(values), len(values)
+            return grown
+
+        # Plain ndarray views and int offsets: slicing a np.memmap per term is ~10x slower
+        offsets = np.asarray(state["term_offsets"]).tolist()
+        docs, tfs = np.asarray(state["posting_docs"]), np.asarray(state["posting_tfs"])
+        postings = {
+            term: (wrap(docs[offsets[i]:offsets[i + 1]]), wrap(tfs[offsets[i]:offsets[i + 1]]))
+            for i, term in enumerate(state["terms"])
+        }
+        doc_keys = [tuple(key.split("\t", 1)) for key in state["doc_keys"]]
+        alive = np.array(state["alive"], dtype=bool)  # written in place by deletes
+        with self._lock:
+            self._postings = postings
+            self._doc_keys = doc_keys
+            self._key_to_doc = {key: doc for doc, key in enumerate(doc_keys) if alive[doc]}
+            self._doc_lengths = wrap(state["doc_lengths"])
+            self._alive = wrap(alive)
+            self._doc_sources = wrap(state["doc_sources"])
+            self._source_codes = {name: code for code, name in enumerate(state["source_names"])}
+            self.loaded_sources = set(state["loaded_sources"])
+            self._live_docs = int(alive.sum())
+            self._live_length = float(np.asarray(state["doc_lengths"])[alive].sum())
+
+    def reset(self):
+        """Forget everything; sources are reloaded on their next ensure_source()"""
+        self.load_state(BM25Index().export_state())
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": self._live_docs,
+                "tombstones": len(self._doc_keys) - self._live_docs,
+                "terms": len(self._postings),
+                "sources": sorted(self.loaded_sources),
+            }
+
+# Global instance
+bm25_index = BM25Index()
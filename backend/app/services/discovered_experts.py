@@ -0,0 +1,200 @@
+"""
+Write-behind indexing of experts found by web search.
+
+SearchService.search hands every validated profile it discovers to
+discovered_expert_indexer.enqueue(); a background thread batches them into
+ExpertService.add_experts, keyed by canonical profile URL so the same person
+found under different URLs (www., country subdomains, query strings, x.com)
+is stored once and unchanged profiles are skipped by the content hash.
+Later queries on the same topic can then be answered from the local index.
+"""
+import os
+import re
+import time
+import uuid
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from app.models.expert import Expert
+
+DISCOVERED_INDEXING_ENABLED = os.getenv("DISCOVERED_INDEXING_ENABLED", "true").lower() == "true"
+DISCOVERED_INDEX_BATCH_SIZE = int(os.getenv("DISCOVERED_INDEX_BATCH_SIZE", "64"))
+DISCOVERED_INDEX_FLUSH_SECONDS = float(os.getenv("DISCOVERED_INDEX_FLUSH_SECONDS", "1.0"))
+DISCOVERED_INDEX_QUEUE_SIZE = int(os.getenv("DISCOVERED_INDEX_QUEUE_SIZE", "10000"))
+
+# Profile types worth storing; "unknown" pages are never indexed
+INDEXABLE_PROFILE_TYPES = ("linkedin", "github", "twitter", "researchgate", "google_scholar", "professional")
+# Academic profiles go to the scholar collection, everything else to linkedin
+SCHOLAR_PROFILE_TYPES = ("researchgate", "google_scholar")
+
+_HOST_ALIASES = {"x.com": "twitter.com", "mobile.twitter.com": "twitter.com"}
+
+def canonical_profile_url(url: str) -> Optional[str]:
+    """One URL per profile: https, no www./country subdomain, no query, fragment or trailing slash"""
+    if not url:
+        return None
+    parts = urlsplit(url.strip() if "://" in url else "https://" + url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith(".linkedin.com"):
+        host = "linkedin.com"
+    host = _HOST_ALIASES.get(host, host)
+    if not host:
+        return None
+    path = re.sub(r"/+", "/", parts.path).rstrip("/")
+
+    if host == "linkedin.com":
+        match = re.match(r"/in/[^/]+", path, flags=re.IGNORECASE)
+        path = match.group(0).lower() if match else path.lower()
+    elif host in ("github.com", "twitter.com"):
+        path = "/".join(path.split("/")[:2]).lower()
+    elif host == "scholar.google.com":
+        user = parse_qs(parts.query).get("user")
+        return f"https://{host}/citations?user={user[0]}" if user else f"https://{host}{path}"
+    return f"https://{host}{path}"
+
+def discovered_expert_id(canonical_url: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, canonical_url))
+
+def collection_for(profile_type: str) -> str:
+    return "scholar" if profile_type in SCHOLAR_PROFILE_TYPES else "linkedin"
+
+def expert_from_result(result: Dict[str, Any]) -> Optional[Expert]:
+    """Expert for a validated web result (SearchService._extract_expert_from_result shape), else None"""
+    profile_type = result.get("profile_type")
+    url = canonical_profile_url(result.get("profile_url") or result.get("url"))
+    if profile_type not in INDEXABLE_PROFILE_TYPES or not url or not result.get("name"):
+        return None
+    now = datetime.utcnow()
+    links = {"profile": url, "profile_type": profile_type}
+    for key in ("github_url", "twitter_url", "website"):
+        if result.get(key):
+            links[key.replace("_url", "")] = result[key]
+    return Expert(
+        id=discovered_expert_id(url),
+        name=result["name"],
+        title=result.get("title"),
+        email=result.get("email"),
+        location=result.get("location"),
+        organization=result.get("company"),
+        bio=result.get("bio"),
+        skills=result.get("skills") or [],
+        links=links,
+        verified=bool(result.get("is_verified_profile")),
+        source=collection_for(profile_type),
+        linkedin_url=url if profile_type == "linkedin" else None,
+        scholar_url=url if profile_type == "google_scholar" else None,
+        created_at=now,
+        updated_at=now,
+    )
+
+class DiscoveredExpertIndexer:
+    """Bounded queue drained by one thread into batched add_experts calls"""
+
+    def __init__(self, expert_service=None, batch_size: int = DISCOVERED_INDEX_BATCH_SIZE,
+                 flush_seconds: float = DISCOVERED_INDEX_FLUSH_SECONDS,
+                 max_queue: int = DISCOVERED_INDEX_QUEUE_SIZE):
+        self._expert_service = expert_service
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Expert]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "answered_locally": 0, "answered_externally": 0,
+            "queued": 0, "dropped": 0, "added": 0, "updated": 0, "unchanged": 0, "failed": 0,
+        }
+
+    @property
+    def expert_service(self):
+        if self._expert_service is None:
+            from app.services.expert_service import ExpertService
+            self._expert_service = ExpertService()
+        return self._expert_service
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] = self._stats.get(key, 0) + amount
+
+    def record_plan(self, answered_locally: bool):
+        """Count which path the search planner took"""
+        self._count("answered_locally" if answered_locally else "answered_externally")
+
+    def enqueue(self, results: List[Dict[str, Any]]) -> int:
+        """Queue validated profiles from a web search; never blocks the request. Returns how many"""
+        queued = 0
+        for result in results:
+            try:
+                expert = expert_from_result(result)
+            except Exception as e:
+                print(f"⚠️ Skipping discovered expert {result.get('profile_url')}: {e}")
+                continue
+            if expert is None:
+                continue
+            try:
+                self._queue.put_nowait(expert)
+                queued += 1
+            except queue.Full:
+                self._count("dropped")
+        if queued:
+            self._count("queued", queued)
+            self._ensure_worker()
+        return queued
+
+    def _ensure_worker(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="discovered-indexer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> List[Expert]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self.flush(batch)
+            except Exception as e:
+                print(f"⚠️ Indexing discovered experts failed: {e}")
+                self._count("failed", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, experts: List[Expert]):
+        """Store one batch; the last copy of a profile within the batch wins"""
+        by_source: Dict[str, Dict[str, Expert]] = {}
+        for expert in experts:
+            by_source.setdefault(expert.source, {})[expert.id] = expert
+        for source, unique in by_source.items():
+            for row in self.expert_service.add_experts(list(unique.values()), source=source):
+                self._count(row["status"])
+
+    def join(self):
+        """Block until everything queued so far is stored (tests, shutdown)"""
+        self._queue.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+# Global instance
+discovered_expert_indexer = DiscoveredExpertIndexer()
@@ -1,5 +1,4 @@
 from typing import List, Dict, Any, Optional
-import httpx
 import asyncio
 from app.services.search_service import SearchService
 import re
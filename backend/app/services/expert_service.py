@@ -1,37 +1,65 @@
-from typing import List, Optional
+from typing import Callable, List, Optional
 from app.models.expert import Expert
 from app.models.db_models import ExpertDB
-from app.utils.database import get_collection, init_db
+from app.utils.database import SessionLocal, get_collection, init_db
 from app.utils.embeddings import embedding_generator
+from app.utils.embedding_batcher import embedding_batcher
+from app.utils.reranker import reranker
+from app.services.federated_search import (
+    HYBRID_BM25_WEIGHT, HYBRID_CANDIDATES, HYBRID_VECTOR_WEIGHT,
+    federated_executor, reciprocal_rank_fusion
+)
+from app.services.bm25_index import bm25_index
+from app.services.metadata_filter import FILTER_OVERSAMPLE, matches, parse_filters
+from app.services.sql_vector_search import sql_vector_search
+from app.services.similar_experts import similar_experts_index
+import time
+import asyncio
+import hashlib
+import json
+import os
+import numpy as np
 import uuid
+from datetime import datetime
 from typing import Dict
 from typing import Any
 
+# Rows per embedding call + upsert in add_experts
+ADD_EXPERTS_CHUNK_SIZE = int(os.getenv("ADD_EXPERTS_CHUNK_SIZE", "256"))
+
+# List/dict Expert fields, stored as JSON strings in collection metadata
+STRUCTURED_METADATA_FIELDS = ("skills", "experience", "links", "languages", "rate")
+# Serve searches from experts.embedding in Postgres when no vector collection is available
+SQL_VECTOR_FALLBACK = os.getenv("SQL_VECTOR_FALLBACK", "true").lower() == "true"
+
 class ExpertService:
     def __init__(self):
         # Lazy-load collections to avoid initialization issues
         self._linkedin_collection = None
         self._scholar_collection = None
     
+    # Resolved on every access (not cached) so a swapped-in store, e.g. after a
+    # snapshot restore hands over to the primary, is picked up; assigning
+    # _linkedin_collection / _scholar_collection pins one instead.
     @property
     def linkedin_collection(self):
-        if self._linkedin_collection is None:
-            try:
-                self._linkedin_collection = get_collection("linkedin_experts")
-            except Exception as e:
-                print(f"⚠️ Failed to load linkedin collection: {e}")
-                return None
-        return self._linkedin_collection
+        if self._linkedin_collection is not None:
+            return self._linkedin_collection
+        try:
+            return get_collection("linkedin_experts")
+        except Exception as e:
+            print(f"⚠️ Failed to load linkedin collection: {e}")
+            return None
     
     @property
     def scholar_collection(self):
-        if self._scholar_collection is None:
-            try:
-                self._scholar_collection = get_collection("scholar_experts")
-            except Exception as e:
-                print(f"⚠️ Failed to load scholar collection: {e}")
-                return None
-        return self._scholar_collection
+        if self._scholar_collection is not None:
+            return self._scholar_collection
+        try:
+            return get_collection("scholar_experts")
+        except Exception as e:
+            print(f"⚠️ Failed to load scholar collection: {e}")
+            return None
     
     def create_expert_text(self, expert: Expert) -> str:
         """Create searchable text from expert data"""
@@ -46,7 +74,76 @@ class ExpertService:
         return " ".join(filter(None, parts))
     
     def add_expert(self, expert: Expert, source: str = "linkedin"):
-        """Add an expert to the database"""
+        """Add (or update) an expert in the database"""
+        row = self.add_experts([expert], source=source)[0]
+        if row["status"] == "failed":
+            print(f"⚠️ Failed to add expert to collection: {row['error']}")
+        return expert
+    
+    def add_experts(
+        self,
+        experts: List[Expert],
+        source: str = "linkedin",
+        chunk_size: int = ADD_EXPERTS_CHUNK_SIZE,
+        embed: Optional[Callable[[List[str]], np.ndarray]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Add or update many experts with one embedding call and one upsert per chunk.
+        
+        Experts whose content hash matches the stored row are skipped. Returns one
+        {"id", "status"} per input row, status being "added", "updated",
+        "unchanged" or "failed" (with an "error"). `embed` overrides the
+        embedding function, e.g. with a process pool for bulk imports.
+        """
+        collection = self.linkedin_collection if source == "linkedin" else self.scholar_collection
+        if collection is None:
+            error = f"Collection not available for source: {source}"
+            return [{"id": expert.id, "status": "failed", "error": error} for expert in experts]
+        
+        embed = embed or embedding_generator.generate_embeddings_array
+        rows = []
+        for start in range(0, len(experts), max(1, chunk_size)):
+            rows.extend(self._add_expert_chunk(collection, experts[start:start + chunk_size], embed))
+        return rows
+    
+    def _add_expert_chunk(self, collection, experts: List[Expert], embed) -> List[Dict[str, Any]]:
+        latest = {expert.id: expert for expert in experts}  # last duplicate wins
+        metadatas = {id_: self._expert_metadata(expert) for id_, expert in latest.items()}
+        
+        try:
+            stored = collection.get(ids=list(latest), include=["metadatas"])
+            stored_hashes = {
+                id_: (metadata or {}).get("content_hash")
+                for id_, metadata in zip(stored["ids"], stored["metadatas"])
+            }
+        except Exception as e:
+            print(f"⚠️ Could not read stored experts, re-embedding the whole chunk: {e}")
+            stored_hashes = {}
+        
+        changed = [id_ for id_ in latest if stored_hashes.get(id_) != metadatas[id_]["content_hash"]]
+        statuses = {id_: {"status": "unchanged"} for id_ in latest}
+        if changed:
+            try:
+                texts = [self.create_expert_text(latest[id_]) for id_ in changed]
+                embeddings = embed(texts)
+                collection.upsert(
+                    ids=changed,
+                    embeddings=embeddings,
+                    documents=texts,
+                    metadatas=[metadatas[id_] for id_ in changed]
+                )
+                self._after_write(collection, changed, texts)
+                for id_ in changed:
+                    statuses[id_] = {"status": "updated" if id_ in stored_hashes else "added"}
+            except Exception as e:
+                print(f"⚠️ Failed to write {len(changed)} experts: {e}")
+                for id_ in changed:
+                    statuses[id_] = {"status": "failed", "error": str(e)}
+        
+        return [{"id": expert.id, **statuses[expert.id]} for expert in experts]
+    
+    async def add_expert_async(self, expert: Expert, source: str = "linkedin"):
+        """Add an expert without blocking the event loop; the embedding is micro-batched"""
         collection = self.linkedin_collection if source == "linkedin" else self.scholar_collection
         
         if collection is None:
@@ -54,67 +151,248 @@ class ExpertService:
             return expert
         
         try:
-            # Generate embedding
             text = self.create_expert_text(expert)
-            embedding = embedding_generator.generate_embedding(text)
-            
-            # Add to collection
-            collection.add(
-                embeddings=[embedding],
-                documents=[text],
-                metadatas=[expert.dict()],
-                ids=[expert.id]
-            )
+            embedding = await embedding_batcher.embed(text)
+            await asyncio.to_thread(self._store_expert, collection, expert, text, embedding)
         except Exception as e:
             print(f"⚠️ Failed to add expert to collection: {e}")
         
         return expert
     
-    def search_experts(self, query: str, source: str = "all", limit: int = 10) -> List[Expert]:
-        """Search for experts based on query"""
-        results = []
-        
+    def _store_expert(self, collection, expert: Expert, text: str, embedding: np.ndarray):
+        """Write one expert row to a vector collection"""
+        self._store_experts(collection, [expert], [text], embedding[None, :])
+    
+    def _store_experts(self, collection, experts: List[Expert], texts: List[str], embeddings: np.ndarray):
+        """Upsert many expert rows to a vector collection in a single call; embeddings is float32 [n, 384]"""
+        ids = [expert.id for expert in experts]
+        collection.upsert(
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=[self._expert_metadata(expert) for expert in experts],
+            ids=ids
+        )
+        self._after_write(collection, ids, texts)
+    
+    def _after_write(self, collection, ids: List[str], texts: List[str]):
+        """Keep the keyword index and the similar-experts table in step with a write"""
+        source = self._source_of(collection)
+        if source in bm25_index.loaded_sources:
+            bm25_index.add(source, ids, texts)
+        similar_experts_index.mark_changed(source, ids)
+    
+    @staticmethod
+    def content_hash(expert: Expert) -> str:
+        """Hash of everything stored for an expert except timestamps and derived scores"""
+        fields = expert.dict(exclude={"created_at", "updated_at", "credibility_score", "similarity"})
+        return hashlib.blake2b(
+            json.dumps(fields, sort_keys=True, default=str).encode("utf-8"), digest_size=16
+        ).hexdigest()
+    
+    def _expert_metadata(self, expert: Expert) -> Dict[str, Any]:
+        """Expert fields as flat scalar metadata (what Chroma accepts) plus its content hash"""
+        metadata = {}
+        for key, value in expert.dict().items():
+            if value is None:
+                continue
+            if isinstance(value, (list, dict)):
+                value = json.dumps(value, default=str)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            metadata[key] = value
+        metadata["content_hash"] = self.content_hash(expert)
+        return metadata
+    
+    @staticmethod
+    def _expert_from_metadata(metadata: Dict[str, Any], source: str) -> Expert:
+        data = dict(metadata)
+        data.pop("content_hash", None)
+        for key in STRUCTURED_METADATA_FIELDS:
+            if isinstance(data.get(key), str):
+                data[key] = json.loads(data[key])
+        data["source"] = source
+        return Expert(**data)
+    
+    def _source_of(self, collection) -> Optional[str]:
+        if collection is self.linkedin_collection:
+            return "linkedin"
+        if collection is self.scholar_collection:
+            return "scholar"
+        return None
+    
+    def _load_keyword_index(self, collections: Dict[str, Any]):
+        """Build the BM25 postings from the documents already stored in each collection"""
+        for source, collection in collections.items():
+            def load_documents(collection=collection):
+                stored = collection.get(include=["documents"])
+                return stored["ids"], [doc or "" for doc in stored["documents"]]
+            if bm25_index.ensure_source(source, load_documents):
+                print(f"✅ BM25 index built for {source}: {len(bm25_index)} experts indexed")
+    
+    def _keyword_search(self, query: str, collections: Dict[str, Any], limit: int):
+        started = time.perf_counter()
+        hits, error = [], None
+        try:
+            self._load_keyword_index(collections)
+            hits = bm25_index.search(query, limit, sources=list(collections))
+        except Exception as e:
+            print(f"⚠️ Keyword search failed: {e}")
+            error = str(e)
+        timing = {"ms": round((time.perf_counter() - started) * 1000, 3), "hits": len(hits), "error": error}
+        return hits, timing
+    
+    def search_experts(self, query: str, source: str = "all", limit: int = 10, timings: Optional[Dict[str, Any]] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> List[Expert]:
+        """Search for experts based on query; per-source timings are written into `timings` if given"""
         # Generate query embedding
-        query_embedding = embedding_generator.generate_embedding(query)
+        query_embedding = embedding_generator.generate_embedding_array(query)
+        return self._search_by_embedding(query_embedding, source, limit, query, timings, filters)
+    
+    async def search_experts_async(self, query: str, source: str = "all", limit: int = 10, timings: Optional[Dict[str, Any]] = None,
+                                   filters: Optional[Dict[str, Any]] = None) -> List[Expert]:
+        """Search for experts without blocking the event loop; the embedding is micro-batched"""
+        query_embedding = await embedding_batcher.embed(query)
+        return await asyncio.to_thread(self._search_by_embedding, query_embedding, source, limit, query, timings, filters)
+    
+    def _search_by_embedding(self, query_embedding: np.ndarray, source: str, limit: int, query: Optional[str] = None,
+                             timings: Optional[Dict[str, Any]] = None, filters: Optional[Dict[str, Any]] = None) -> List[Expert]:
+        """
+        Query the vector collections (and BM25, fused by RRF) concurrently and rank the top hits.
+        filters (SearchQuery.filters: location, skills, source, min_rating) restrict the
+        candidates before ranking, so selective filters still fill `limit`.
+        """
+        rerank = reranker.enabled and bool(query)
+        n_results = max(limit, reranker.top_n) if rerank else limit
+        filters = parse_filters(filters)
+        sources = filters.get("source") if filters else None
         
-        # Search in LinkedIn collection
+        collections = {}
         if source in ["all", "linkedin"] and self.linkedin_collection is not None:
-            try:
-                linkedin_results = self.linkedin_collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=limit
-                )
-                if linkedin_results['metadatas'] and linkedin_results['metadatas'][0]:
-                    for metadata in linkedin_results['metadatas'][0]:
-                        expert = Expert(**metadata)
-                        expert.source = "linkedin"
-                        results.append(expert)
-            except Exception as e:
-                print(f"⚠️ Error searching LinkedIn collection: {e}")
-        
-        # Search in Scholar collection
+            collections["linkedin"] = self.linkedin_collection
         if source in ["all", "scholar"] and self.scholar_collection is not None:
+            collections["scholar"] = self.scholar_collection
+        if sources:
+            collections = {name: c for name, c in collections.items() if name in sources}
+        if SQL_VECTOR_FALLBACK and self.linkedin_collection is None and self.scholar_collection is None:
+            return self._search_sql(query_embedding, limit, filters)
+        
+        # BM25 runs on the same pool while the vector queries are in flight
+        hybrid = bool(query) and HYBRID_BM25_WEIGHT > 0 and bool(collections)
+        depth = max(n_results, HYBRID_CANDIDATES) if hybrid else n_results
+        keyword_future = federated_executor.submit(self._keyword_search, query, collections, depth) if hybrid else None
+        hits, search_timings = federated_executor.query(collections, query_embedding[None, :], depth, filters)
+        
+        metadata_by_key = {(hit_source, id_): metadata for _, hit_source, id_, metadata in hits}
+        distance_by_key = {(hit_source, id_): distance for distance, hit_source, id_, _ in hits}
+        if keyword_future is not None:
+            keyword_hits, search_timings["sources"]["bm25"] = keyword_future.result()
+            fused = reciprocal_rank_fusion(
+                [[(hit_source, id_) for _, hit_source, id_, _ in hits],
+                 [(hit_source, id_) for _, hit_source, id_ in keyword_hits]],
+                [HYBRID_VECTOR_WEIGHT, HYBRID_BM25_WEIGHT],
+                limit=n_results if filters is None else len(hits) + len(keyword_hits)
+            )
+            fused_scores = dict(fused)
+            keys = [key for key, _ in fused]
+            self._fetch_missing_metadata(keys, metadata_by_key, collections)
+            if filters is not None:
+                # Keyword hits aren't pre-filtered; vector hits already match
+                keys = [key for key in keys if matches(metadata_by_key.get(key), filters)][:n_results]
+        else:
+            fused_scores = None
+            keys = list(metadata_by_key)[:n_results]
+        if timings is not None:
+            timings.update(search_timings)
+        
+        # Only the final rows become models
+        results, result_keys = [], []
+        for hit_source, id_ in keys:
+            metadata = metadata_by_key.get((hit_source, id_))
+            if metadata is None:
+                continue
             try:
-                scholar_results = self.scholar_collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=limit
-                )
-                if scholar_results['metadatas'] and scholar_results['metadatas'][0]:
-                    for metadata in scholar_results['metadatas'][0]:
-                        expert = Expert(**metadata)
-                        expert.source = "scholar"
-                        results.append(expert)
+                expert = self._expert_from_metadata(metadata, hit_source)
+                if (hit_source, id_) in distance_by_key:
+                    expert.similarity = round(1.0 - float(distance_by_key[(hit_source, id_)]), 6)
+                results.append(expert)
+                result_keys.append((hit_source, id_))
             except Exception as e:
-                print(f"⚠️ Error searching Scholar collection: {e}")
+                print(f"⚠️ Skipping malformed {hit_source} expert: {e}")
         
         # Calculate credibility scores
         results = self.calculate_credibility_scores(results)
         
-        # Sort by credibility score
-        results.sort(key=lambda x: x.credibility_score or 0, reverse=True)
+        if fused_scores is not None:
+            # Keep the fused (weighted RRF) order; credibility only breaks ties
+            ranked = sorted(
+                zip(result_keys, results),
+                key=lambda pair: (-fused_scores[pair[0]], -(pair[1].credibility_score or 0))
+            )
+            results = [expert for _, expert in ranked]
+        else:
+            # Sort by credibility score
+            results.sort(key=lambda x: x.credibility_score or 0, reverse=True)
+        
+        if rerank:
+            results = self._rerank(query, results)
         
         return results[:limit]
     
+    def _search_sql(self, query_embedding: np.ndarray, limit: int, filters: Optional[Dict[str, Any]] = None) -> List[Expert]:
+        """Nearest experts from the relational store alone (see app/services/sql_vector_search.py)"""
+        db = SessionLocal()
+        try:
+            depth = limit * FILTER_OVERSAMPLE if filters else limit
+            hits = sql_vector_search.query(db, query_embedding, depth)
+            rows = {row.id: row for row in db.query(ExpertDB).filter(ExpertDB.id.in_([id_ for _, id_ in hits]))}
+            results = []
+            for distance, id_ in hits:
+                row = rows.get(id_)
+                if row is None:
+                    continue
+                metadata = {"location": row.location, "skills": row.skills, "rating": row.rating}
+                if matches(metadata, filters):
+                    expert = self._expert_from_db(row)
+                    expert.similarity = round(1.0 - float(distance), 6)  # cosine, as on the vector path
+                    results.append(expert)
+            return results[:limit]
+        except Exception as e:
+            print(f"⚠️ SQL vector search failed: {e}")
+            return []
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _expert_from_db(row: ExpertDB) -> Expert:
+        return Expert(
+            id=row.id, name=row.name, title=row.title, email=row.email, location=row.location,
+            organization=row.organization, bio=row.bio, skills=row.skills or [], experience=row.experience or [],
+            links=row.links or {}, created_at=row.created_at, updated_at=row.updated_at, rating=row.rating,
+            total_projects=row.total_projects, verified=bool(row.is_verified)
+        )
+    
+    def _fetch_missing_metadata(self, keys, metadata_by_key: Dict, collections: Dict[str, Any]):
+        """Look up metadata for keyword-only hits, one get() per source"""
+        missing: Dict[str, List[str]] = {}
+        for hit_source, id_ in keys:
+            if (hit_source, id_) not in metadata_by_key:
+                missing.setdefault(hit_source, []).append(id_)
+        for hit_source, ids in missing.items():
+            try:
+                stored = collections[hit_source].get(ids=ids, include=["metadatas"])
+                for id_, metadata in zip(stored["ids"], stored["metadatas"]):
+                    metadata_by_key[(hit_source, id_)] = metadata
+            except Exception as e:
+                print(f"⚠️ Failed to load {hit_source} experts for keyword hits: {e}")
+    
+    def _rerank(self, query: str, experts: List[Expert]) -> List[Expert]:
+        """Reorder the top candidates by cross-encoder relevance; keeps the given order on fallback"""
+        candidates = experts[:reranker.top_n]
+        order = reranker.rerank(query, [self.create_expert_text(expert) for expert in candidates])
+        if order is None:
+            return experts
+        return [candidates[i] for i in order] + experts[len(candidates):]
+    
     def calculate_credibility_scores(self, experts: List[Expert]) -> List[Expert]:
         """Calculate credibility scores for experts"""
         if not experts:
@@ -0,0 +1,136 @@
+"""Concurrent queries across the per-source expert collections"""
+import os
+import time
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.metadata_filter import FILTER_OVERSAMPLE, chroma_where, matches
+
+SEARCH_FANOUT_WORKERS = int(os.getenv("SEARCH_FANOUT_WORKERS", "4"))
+
+# Hybrid retrieval: reciprocal rank fusion of vector and BM25 rankings
+HYBRID_VECTOR_WEIGHT = float(os.getenv("HYBRID_VECTOR_WEIGHT", "1.0"))
+HYBRID_BM25_WEIGHT = float(os.getenv("HYBRID_BM25_WEIGHT", "1.0"))  # 0 = vector only
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "50"))  # depth fetched from each retriever
+
+# (distance, source, id, metadata) for one hit
+Hit = Tuple[float, str, str, Dict[str, Any]]
+
+def cosine_distances(collection, distances: List[float]) -> List[float]:
+    """
+    Distances from `collection` as cosine distances (1 - cos), what the built-in indexes return.
+    Chroma collections created without metadata={"hnsw:space": "cosine"} measure squared L2,
+    which for unit-norm embeddings is 2 * (1 - cos).
+    """
+    if not hasattr(collection, "metadata"):
+        return distances
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    if space == "l2":
+        return [distance / 2.0 for distance in distances]
+    return distances  # cosine, or ip (1 - dot) on unit-norm vectors
+
+class FederatedQueryExecutor:
+    """
+    Runs one query against several collections at once and merges the hits.
+
+    Each collection query runs on a shared thread pool (Chroma and the
+    built-in indexes release the GIL in their matmuls/IO). Every collection
+    returns its hits sorted by distance, so the global top n is a k-way heap
+    merge that stops after n rows.
+    """
+
+    def __init__(self, max_workers: int = SEARCH_FANOUT_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="expert-search"
+        )
+
+    def submit(self, fn, *args):
+        """Run another retriever on the same pool, alongside the collection queries"""
+        return self._executor.submit(fn, *args)
+
+    @staticmethod
+    def _query_source(source: str, collection, query_embeddings: np.ndarray, n_results: int,
+                      filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Hit], Dict[str, Any]]:
+        started = time.perf_counter()
+        hits, error = [], None
+        try:
+            # Built-in indexes pre-filter; Chroma gets what it can evaluate, the rest is checked here
+            prefiltered = not filters or getattr(collection, "supports_filters", False)
+            where = filters if prefiltered else chroma_where(filters)
+            result = collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results if prefiltered else n_results * FILTER_OVERSAMPLE,
+                include=["metadatas", "distances"],
+                **({"where": where} if where else {})
+            )
+            if result["ids"] and result["ids"][0]:
+                hits = [
+                    (distance, source, id_, metadata)
+                    for id_, distance, metadata in zip(
+                        result["ids"][0], cosine_distances(collection, result["distances"][0]), result["metadatas"][0]
+                    )
+                    if prefiltered or matches(metadata, filters)
+                ][:n_results]
+        except Exception as e:
+            print(f"⚠️ Error searching {source} collection: {e}")
+            error = str(e)
+        timing = {
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+            "hits": len(hits),
+            "error": error,
+        }
+        return hits, timing
+
+    def query(self, collections: Dict[str, Any], query_embeddings: np.ndarray, n_results: int,
+              filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Hit], Dict[str, Any]]:
+        """
+        Top n_results hits across all collections, nearest first, plus timings:
+        {"sources": {source: {"ms", "hits", "error"}}, "merge_ms", "total_ms"}.
+        filters is parse_filters() output, applied before ranking.
+        """
+        started = time.perf_counter()
+        futures = {
+            source: self._executor.submit(self._query_source, source, collection, query_embeddings, n_results, filters)
+            for source, collection in collections.items()
+        }
+        per_source_hits, timings = [], {}
+        for source, future in futures.items():
+            hits, timings[source] = future.result()
+            per_source_hits.append(hits)
+
+        merge_started = time.perf_counter()
+        merged = list(islice(heapq.merge(*per_source_hits, key=lambda hit: hit[0]), n_results))
+        finished = time.perf_counter()
+        return merged, {
+            "sources": timings,
+            "merge_ms": round((finished - merge_started) * 1000, 3),
+            "total_ms": round((finished - started) * 1000, 3),
+        }
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Iterable[Hashable]],
+    weights: Sequence[float],
+    limit: int,
+    k: int = HYBRID_RRF_K
+) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked key lists: score(key) = sum of weight / (k + rank) over the
+    rankings it appears in. Only the (bounded) retrieved candidates are
+    scored; the top `limit` come from a heap rather than a full sort.
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        if weight <= 0:
+            continue
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+    return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+# Global instance
+federated_executor = FederatedQueryExecutor()
@@ -0,0 +1,111 @@
+"""
+Cache of GitHub user profiles fetched during search enrichment.
+
+Fresh entries are served without a request. Expired entries keep their
+ETag, so the next fetch is a conditional request; a 304 renews the entry
+and, for authenticated calls, does not count against the rate limit.
+404s are cached as missing users, and failed fetches are cached for a short
+while (still serving the old profile, if there was one) so a flaky or
+rate-limited API is not hammered on every search.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+GITHUB_PROFILE_TTL_SECONDS = float(os.getenv("GITHUB_PROFILE_TTL_SECONDS", "3600"))
+GITHUB_MISSING_TTL_SECONDS = float(os.getenv("GITHUB_MISSING_TTL_SECONDS", "86400"))
+GITHUB_ERROR_TTL_SECONDS = float(os.getenv("GITHUB_ERROR_TTL_SECONDS", "60"))
+GITHUB_PROFILE_CACHE_SIZE = int(os.getenv("GITHUB_PROFILE_CACHE_SIZE", "5000"))
+# Concurrent GitHub API calls while enriching one page of results
+GITHUB_ENRICH_CONCURRENCY = int(os.getenv("GITHUB_ENRICH_CONCURRENCY", "5"))
+
+class CachedProfile:
+    """A profile (None for a missing user or failed fetch), its ETag and when it expires"""
+    __slots__ = ("profile", "etag", "expires_at")
+
+    def __init__(self, profile: Optional[Dict[str, Any]], etag: Optional[str], expires_at: float):
+        self.profile = profile
+        self.etag = etag
+        self.expires_at = expires_at
+
+class GitHubProfileCache:
+    """LRU of GitHub profiles keyed by lowercased username, with per-entry TTLs"""
+
+    def __init__(
+        self,
+        ttl: float = GITHUB_PROFILE_TTL_SECONDS,
+        missing_ttl: float = GITHUB_MISSING_TTL_SECONDS,
+        error_ttl: float = GITHUB_ERROR_TTL_SECONDS,
+        max_entries: int = GITHUB_PROFILE_CACHE_SIZE
+    ):
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedProfile]" = OrderedDict()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "revalidated": 0,
+                       "fetched": 0, "missing": 0, "errors": 0}
+
+    def _count(self, key: str):
+        self._stats[key] += 1
+
+    def _put(self, username: str, entry: CachedProfile):
+        key = username.lower()
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def lookup(self, username: str) -> Tuple[Optional[CachedProfile], bool]:
+        """(entry or None, whether it is still fresh); stale entries are kept for their ETag"""
+        with self._lock:
+            entry = self._entries.get(username.lower())
+            if entry is None:
+                self._count("misses")
+                return None, False
+            self._entries.move_to_end(username.lower())
+            if entry.expires_at > time.monotonic():
+                self._count("hits" if entry.profile is not None else "negative_hits")
+                return entry, True
+            self._count("misses")
+            return entry, False
+
+    def store(self, username: str, profile: Dict[str, Any], etag: Optional[str]):
+        """A 200 response"""
+        with self._lock:
+            self._count("fetched")
+            self._put(username, CachedProfile(profile, etag, time.monotonic() + self.ttl))
+
+    def revalidated(self, username: str, entry: CachedProfile):
+        """A 304 response: the cached profile is still current"""
+        with self._lock:
+            self._count("revalidated")
+            entry.expires_at = time.monotonic() + self.ttl
+            self._put(username, entry)
+
+    def store_missing(self, username: str):
+        """A 404: no such user"""
+        with self._lock:
+            self._count("missing")
+            self._put(username, CachedProfile(None, None, time.monotonic() + self.missing_ttl))
+
+    def store_error(self, username: str, stale: Optional[CachedProfile] = None):
+        """A failed fetch: keep serving the stale profile (or nothing) until error_ttl passes"""
+        with self._lock:
+            self._count("errors")
+            profile, etag = (stale.profile, stale.etag) if stale is not None else (None, None)
+            self._put(username, CachedProfile(profile, etag, time.monotonic() + self.error_ttl))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["negative_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+# Global instance, shared by every SearchService
+github_profile_cache = GitHubProfileCache()
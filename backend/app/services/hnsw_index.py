@@ -0,0 +1,346 @@
+"""
+HNSW approximate nearest-neighbour backend for the built-in vector index.
+
+Uses hnswlib when it is installed and otherwise a NumPy implementation of the
+same algorithm (Malkov & Yashunin). Either way the graph sits on top of a
+NumpyVectorIndex directory, so ids, metadata and full-precision vectors are
+shared with the exact backend, and the graph itself is saved to a single file
+next to them (hnsw.bin for hnswlib, hnsw.npz for the NumPy graph). On cold
+start the saved graph is loaded and only rows appended after it was written
+are inserted.
+"""
+import os
+import heapq
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.services.vector_index import EMBEDDING_DIM, VECTOR_INDEX_READ_ONLY, NumpyVectorIndex
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "100"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+HNSW_SAVE_EVERY = int(os.getenv("HNSW_SAVE_EVERY", "1000"))  # inserted rows between graph saves
+HNSW_IMPLEMENTATION = os.getenv("HNSW_IMPLEMENTATION", "auto").lower()  # auto | hnswlib | numpy
+
+class HNSWGraph:
+    """
+    Hierarchical navigable small world graph over rows of a vector matrix.
+
+    Nodes are row numbers of `vectors` (unit-normalized, so similarity is the
+    dot product). Level-0 links live in a dense int32 array; the few nodes on
+    upper levels keep their links in per-level dicts.
+    """
+
+    def __init__(self, M: int = HNSW_M, ef_construction: int = HNSW_EF_CONSTRUCTION, seed: int = 0):
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.level_mult = 1.0 / np.log(M)
+        self.rng = np.random.default_rng(seed)
+        self.vectors = None
+        self.size = 0
+        self.entry = -1
+        self.max_level = -1
+        self.levels = np.zeros(0, dtype=np.int8)
+        self.links0 = np.full((0, self.M0), -1, dtype=np.int32)
+        self.counts0 = np.zeros(0, dtype=np.int16)
+        self.upper: List[dict] = []  # upper[level - 1][node] -> list of neighbours
+
+    def _ensure_capacity(self, n: int):
+        capacity = len(self.levels)
+        if n <= capacity:
+            return
+        new_capacity = max(n, 2 * capacity, 1024)
+        extra = new_capacity - capacity
+        self.levels = np.concatenate([self.levels, np.zeros(extra, dtype=np.int8)])
+        self.links0 = np.concatenate([self.links0, np.full((extra, self.M0), -1, dtype=np.int32)])
+        self.counts0 = np.concatenate([self.counts0, np.zeros(extra, dtype=np.int16)])
+
+    def _neighbors(self, node: int, level: int) -> List[int]:
+        if level == 0:
+            return self.links0[node, :self.counts0[node]].tolist()
+        return self.upper[level - 1].get(node, [])
+
+    def _set_neighbors(self, node: int, level: int, neighbors: List[int]):
+        if level == 0:
+            self.links0[node, :len(neighbors)] = neighbors
+            self.links0[node, len(neighbors):] = -1
+            self.counts0[node] = len(neighbors)
+        else:
+            self.upper[level - 1][node] = list(neighbors)
+
+    def _search_layer(self, query: np.ndarray, entry_points: List[int], ef: int, level: int,
+                      vectors: Optional[np.ndarray] = None) -> List[Tuple[float, int]]:
+        """Best-first search of one layer; returns up to ef (similarity, node), best first"""
+        vectors = self.vectors if vectors is None else vectors
+        visited = set(entry_points)
+        sims = (vectors[entry_points] @ query).tolist()
+        candidates = [(-s, n) for s, n in zip(sims, entry_points)]
+        heapq.heapify(candidates)
+        results = [(s, n) for s, n in zip(sims, entry_points)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if -neg_sim < results[0][0] and len(results) >= ef:
+                break
+            neighbors = [n for n in self._neighbors(node, level) if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            lower = results[0][0]
+            for sim, neighbor in zip((vectors[neighbors] @ query).tolist(), neighbors):
+                if len(results) < ef or sim > lower:
+                    heapq.heappush(candidates, (-sim, neighbor))
+                    heapq.heappush(results, (sim, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+                    lower = results[0][0]
+        return sorted(results, reverse=True)
+
+    def _select_neighbors(self, candidates: List[Tuple[float, int]], m: int) -> List[int]:
+        """
+        Neighbour-selection heuristic: keep a candidate only if it is closer to
+        the base point than to every neighbour already kept, which spreads the
+        links across directions; top up with the nearest pruned ones.
+        """
+        if len(candidates) <= m:
+            return [node for _, node in candidates]
+        nodes = np.array([node for _, node in candidates])
+        sims = np.array([sim for sim, _ in candidates], dtype=np.float32)
+        vectors = self.vectors[nodes]
+        pairwise = vectors @ vectors.T
+        selected = []
+        blocked = np.zeros(len(nodes), dtype=bool)
+        for i in range(len(nodes)):
+            if blocked[i]:
+                continue
+            selected.append(i)
+            if len(selected) == m:
+                break
+            # Candidates at least as close to this neighbour as to the base point are pruned
+            blocked |= pairwise[i] >= sims
+        if len(selected) < m:
+            blocked[selected] = False
+            selected.extend(np.flatnonzero(blocked)[:m - len(selected)].tolist())
+        return nodes[selected].tolist()
+
+    def insert(self, node: int):
+        self._ensure_capacity(node + 1)
+        self.size = max(self.size, node + 1)
+        query = self.vectors[node]
+        level = int(-np.log(1.0 - self.rng.random()) * self.level_mult)
+        self.levels[node] = level
+        while len(self.upper) < level:
+            self.upper.append({})
+
+        if self.entry < 0:
+            self.entry, self.max_level = node, level
+            return
+
+        entry_points = [self.entry]
+        for layer in range(self.max_level, level, -1):
+            entry_points = [self._search_layer(query, entry_points, 1, layer)[0][1]]
+
+        for layer in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(query, entry_points, self.ef_construction, layer)
+            neighbors = self._select_neighbors(found, self.M)
+            self._set_neighbors(node, layer, neighbors)
+
+            max_links = self.M0 if layer == 0 else self.M
+            for neighbor in neighbors:
+                links = self._neighbors(neighbor, layer) + [node]
+                if len(links) > max_links:
+                    sims = self.vectors[links] @ self.vectors[neighbor]
+                    order = np.argsort(-sims)
+                    links = self._select_neighbors([(sims[i], links[i]) for i in order], max_links)
+                self._set_neighbors(neighbor, layer, links)
+            entry_points = [n for _, n in found]
+
+        if level > self.max_level:
+            self.entry, self.max_level = node, level
+
+    def search(self, query: np.ndarray, k: int, ef: int, alive: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        """
+        Rows of the k most similar live nodes, best first. The caller passes
+        the vectors and must not insert concurrently; search never changes
+        the graph.
+        """
+        if self.entry < 0:
+            return np.zeros(0, dtype=np.int64)
+        entry_points = [self.entry]
+        for layer in range(self.max_level, 0, -1):
+            entry_points = [self._search_layer(query, entry_points, 1, layer, vectors)[0][1]]
+        found = self._search_layer(query, entry_points, max(ef, k), 0, vectors)
+        return np.array([node for _, node in found if alive[node]][:k], dtype=np.int64)
+
+    def save(self, path: str):
+        upper_nodes, upper_levels, upper_links = [], [], []
+        for level, links in enumerate(self.upper, start=1):
+            for node, neighbors in links.items():
+                upper_nodes.append(node)
+                upper_levels.append(level)
+                upper_links.append(neighbors + [-1] * (self.M - len(neighbors)))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array([self.M, self.ef_construction, self.entry, self.max_level, self.size]),
+                levels=self.levels[:self.size],
+                links0=self.links0[:self.size],
+                counts0=self.counts0[:self.size],
+                upper_nodes=np.array(upper_nodes, dtype=np.int64),
+                upper_levels=np.array(upper_levels, dtype=np.int64),
+                upper_links=np.array(upper_links, dtype=np.int32).reshape(-1, self.M),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "HNSWGraph":
+        data = np.load(path)
+        M, ef_construction, entry, max_level, size = (int(v) for v in data["meta"])
+        graph = cls(M=M, ef_construction=ef_construction, seed=size)
+        graph.entry, graph.max_level, graph.size = entry, max_level, size
+        graph.levels = data["levels"].copy()
+        graph.links0 = data["links0"].copy()
+        graph.counts0 = data["counts0"].copy()
+        graph.upper = [{} for _ in range(max(max_level, 0))]
+        for node, level, links in zip(data["upper_nodes"], data["upper_levels"], data["upper_links"]):
+            graph.upper[level - 1][int(node)] = [int(n) for n in links if n >= 0]
+        return graph
+
+class HNSWVectorIndex(NumpyVectorIndex):
+    """
+    NumpyVectorIndex whose queries walk an HNSW graph instead of scanning.
+
+    Every row is inserted as it is added (upserted rows too; superseded and
+    deleted rows stay in the graph as waypoints but are never returned).
+    ef_search can be changed at any time; M and ef_construction apply to
+    graphs built from scratch.
+    """
+
+    def __init__(self, path: str, name: Optional[str] = None, dim: int = EMBEDDING_DIM,
+                 M: int = HNSW_M, ef_construction: int = HNSW_EF_CONSTRUCTION, ef_search: int = HNSW_EF_SEARCH,
+                 implementation: str = HNSW_IMPLEMENTATION, read_only: bool = VECTOR_INDEX_READ_ONLY):
+        if implementation == "auto":
+            implementation = "hnswlib" if HNSWLIB_AVAILABLE else "numpy"
+        if implementation == "hnswlib" and not HNSWLIB_AVAILABLE:
+            raise ImportError("hnswlib is not installed")
+        self.implementation = implementation
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.graph_path = os.path.join(path, "hnsw.bin" if implementation == "hnswlib" else "hnsw.npz")
+        self._graph = None
+        self._unsaved_rows = 0
+        self._loading = True
+        self._load_graph(dim)
+        super().__init__(path, name=name, dim=dim, read_only=read_only)
+        self._loading = False
+        if self._unsaved_rows and not read_only:
+            self.save()
+
+    def _load_graph(self, dim: int):
+        if self.implementation == "hnswlib":
+            self._graph = hnswlib.Index(space="ip", dim=dim)
+            if os.path.exists(self.graph_path):
+                self._graph.load_index(self.graph_path)
+            else:
+                self._graph.init_index(max_elements=1024, ef_construction=self.ef_construction, M=self.M)
+        elif os.path.exists(self.graph_path):
+            self._graph = HNSWGraph.load(self.graph_path)
+        else:
+            self._graph = HNSWGraph(M=self.M, ef_construction=self.ef_construction)
+
+    @property
+    def graph_size(self) -> int:
+        if self.implementation == "hnswlib":
+            return self._graph.get_current_count()
+        return self._graph.size
+
+    def _on_rows_mapped(self, start: int, stop: int):
+        first = self.graph_size
+        if stop <= first:
+            return
+        if self.implementation == "hnswlib":
+            if stop > self._graph.get_max_elements():
+                self._graph.resize_index(max(stop, 2 * self._graph.get_max_elements()))
+            self._graph.add_items(np.asarray(self._vectors[first:stop]), np.arange(first, stop))
+            dead = np.flatnonzero(~self._alive[first:stop]) + first
+            self._on_rows_removed(dead.tolist())
+        else:
+            self._graph.vectors = np.asarray(self._vectors)  # plain ndarray view: cheaper indexing
+            for row in range(first, stop):
+                self._graph.insert(row)
+
+        self._unsaved_rows += stop - first
+        if not self._loading and not self.read_only and self._unsaved_rows >= HNSW_SAVE_EVERY:
+            self.save()
+
+    def _on_rows_removed(self, rows: List[int]):
+        if self.implementation != "hnswlib":
+            return  # filtered with the alive mask at query time
+        for row in rows:
+            try:
+                self._graph.mark_deleted(int(row))
+            except RuntimeError:
+                pass  # already marked, or not inserted yet
+
+    def save(self):
+        """Write the graph to its single file (atomically replaced)"""
+        with self._lock:
+            if self.implementation == "hnswlib":
+                tmp_path = self.graph_path + ".tmp"
+                self._graph.save_index(tmp_path)
+                os.replace(tmp_path, self.graph_path)
+            else:
+                self._graph.save(self.graph_path)
+            self._unsaved_rows = 0
+
+    def _search_many(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        # Under the index lock: refresh/_replay_log insert into the graph (growing its
+        # link arrays and vectors) under the same lock, and hnswlib's ef is shared state
+        with self._lock:
+            return self._search_graph(queries, k, mask)
+
+    def _search_graph(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray]) -> List[np.ndarray]:
+        live = int(self._alive[:len(self._vectors)].sum())
+        allowed = live if mask is None else int(mask[:len(self._vectors)].sum())
+        if not allowed:
+            return [np.zeros(0, dtype=np.int64) for _ in queries]
+        k = min(k, allowed)
+        # A filter passes only a fraction of the graph's candidates, so widen the beam to match
+        ef = min(max(self.ef_search, k) * live // allowed, 20 * max(self.ef_search, k))
+
+        if self.implementation == "hnswlib":
+            self._graph.set_ef(max(ef, k))
+            if mask is None:
+                labels, _ = self._graph.knn_query(queries, k=k)
+            else:
+                labels, _ = self._graph.knn_query(queries, k=k, filter=lambda label: bool(mask[label]))
+            return [row_labels.astype(np.int64) for row_labels in labels]
+
+        vectors = np.asarray(self._vectors)
+        alive = self._alive if mask is None else mask
+        return [self._graph.search(query, k, ef, alive, vectors) for query in queries]
+
+    def memory_stats(self):
+        stats = super().memory_stats()
+        stats.update({
+            "backend": "hnsw",
+            "implementation": self.implementation,
+            "graph_nodes": self.graph_size,
+            "M": self.M,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+        })
+        return stats
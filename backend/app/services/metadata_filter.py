@@ -0,0 +1,190 @@
+"""
+Structured search filters (location, skills, source, min_rating) and the
+per-attribute index the built-in vector indexes evaluate them with before
+scanning any vectors.
+"""
+import os
+import re
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.bm25_index import _GrowableArray
+
+# Below either bound the planner scores the filtered rows directly instead of the whole index
+FILTER_BRUTE_FORCE_ROWS = int(os.getenv("FILTER_BRUTE_FORCE_ROWS", "20000"))
+FILTER_BRUTE_FORCE_FRACTION = float(os.getenv("FILTER_BRUTE_FORCE_FRACTION", "0.05"))
+# Collections that can't pre-filter (Chroma) fetch this many times n_results, then post-filter
+FILTER_OVERSAMPLE = int(os.getenv("FILTER_OVERSAMPLE", "5"))
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+class InvalidFilterError(ValueError):
+    """A user-supplied filter value that can't be applied (the API answers 400)"""
+
+def _as_list(value) -> List[str]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(item) for item in value if item]
+
+def _location_tokens(location: Optional[str]) -> List[str]:
+    return _WORD_RE.findall((location or "").lower())
+
+def _skill_terms(skills) -> List[str]:
+    if isinstance(skills, str):
+        try:
+            skills = json.loads(skills)
+        except ValueError:
+            skills = skills.split(",")
+    return sorted({str(skill).strip().lower() for skill in skills or [] if str(skill).strip()})
+
+def _as_rating(value) -> Optional[float]:
+    """A finite rating, or None for missing and unparseable values"""
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        return None
+    return rating if np.isfinite(rating) else None
+
+def parse_filters(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Normalize SearchQuery.filters; None when nothing applies.
+    An expert matches when it satisfies every given attribute, where
+    location is any of the given places (all of a place's words must
+    appear), skills is any of the given skills, and min_rating is
+    rating >= min_rating (unrated experts never match). Raises
+    InvalidFilterError for a min_rating that is not a number.
+    """
+    if not filters:
+        return None
+    parsed: Dict[str, Any] = {}
+    locations = [_location_tokens(location) for location in _as_list(filters.get("location"))]
+    if any(locations):
+        parsed["location"] = [tokens for tokens in locations if tokens]
+    skills = _skill_terms(_as_list(filters.get("skills")))
+    if skills:
+        parsed["skills"] = skills
+    sources = [source.lower() for source in _as_list(filters.get("source") or filters.get("sources"))]
+    if sources and "all" not in sources:
+        parsed["source"] = sources
+    min_rating = filters.get("min_rating", filters.get("rating"))
+    if min_rating not in (None, ""):
+        parsed["min_rating"] = _as_rating(min_rating)
+        if parsed["min_rating"] is None:
+            raise InvalidFilterError(f"min_rating must be a number, got {min_rating!r}")
+    return parsed or None
+
+def matches(metadata: Optional[Dict[str, Any]], filters: Optional[Dict[str, Any]]) -> bool:
+    """Row-at-a-time check with the same semantics as MetadataFilterIndex.evaluate"""
+    if not filters:
+        return True
+    metadata = metadata or {}
+    if "location" in filters:
+        tokens = set(_location_tokens(metadata.get("location")))
+        if not any(tokens.issuperset(place) for place in filters["location"]):
+            return False
+    if "skills" in filters and not set(_skill_terms(metadata.get("skills"))) & set(filters["skills"]):
+        return False
+    if "source" in filters and metadata.get("source") and metadata["source"] not in filters["source"]:
+        return False
+    if "min_rating" in filters:
+        rating = _as_rating(metadata.get("rating"))
+        if rating is None or rating < filters["min_rating"]:
+            return False
+    return True
+
+def chroma_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The part of a filter Chroma can evaluate itself (skills and location are JSON/free text there)"""
+    if filters and "min_rating" in filters:
+        return {"rating": {"$gte": filters["min_rating"]}}
+    return None
+
+class MetadataFilterIndex:
+    """
+    Per-attribute row sets for one vector index.
+
+    Location words and skills map to sorted row arrays (rows are appended in
+    increasing order, so appends keep them sorted); ratings live in a per-row
+    array with a sorted order rebuilt lazily, so a min_rating filter is one
+    searchsorted. Rows superseded or deleted stay in the postings and are
+    dropped by the index's alive mask.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locations: Dict[str, _GrowableArray] = {}
+        self._skills: Dict[str, _GrowableArray] = {}
+        self._ratings = np.full(0, np.nan, dtype=np.float32)
+        self._rating_order: Optional[np.ndarray] = None
+
+    def add(self, row: int, metadata: Optional[Dict[str, Any]]):
+        metadata = metadata or {}
+        with self._lock:
+            for token in set(_location_tokens(metadata.get("location"))):
+                self._locations.setdefault(token, _GrowableArray(np.int32)).append(row)
+            for skill in _skill_terms(metadata.get("skills")):
+                self._skills.setdefault(skill, _GrowableArray(np.int32)).append(row)
+            if row >= len(self._ratings):
+                grown = np.full(max(row + 1, 2 * len(self._ratings)), np.nan, dtype=np.float32)
+                grown[:len(self._ratings)] = self._ratings
+                self._ratings = grown
+            rating = _as_rating(metadata.get("rating"))
+            self._ratings[row] = np.nan if rating is None else rating
+            self._rating_order = None
+
+    def _postings(self, table: Dict[str, _GrowableArray], term: str) -> np.ndarray:
+        postings = table.get(term)
+        return postings.view() if postings is not None else np.zeros(0, dtype=np.int32)
+
+    def _union(self, arrays: Iterable[np.ndarray]) -> np.ndarray:
+        arrays = list(arrays)
+        return arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+
+    def evaluate(self, filters: Dict[str, Any], alive: np.ndarray) -> np.ndarray:
+        """Sorted live rows matching every filtered attribute, smallest row set intersected first"""
+        with self._lock:
+            row_sets = []
+            if "location" in filters:
+                row_sets.append(self._union(
+                    self._intersect([self._postings(self._locations, token) for token in place])
+                    for place in filters["location"]
+                ))
+            if "skills" in filters:
+                row_sets.append(self._union(self._postings(self._skills, skill) for skill in filters["skills"]))
+            if "min_rating" in filters:
+                if self._rating_order is None:
+                    rated = np.flatnonzero(~np.isnan(self._ratings))
+                    self._rating_order = rated[np.argsort(self._ratings[rated], kind="stable")]
+                ordered = self._ratings[self._rating_order]
+                start = np.searchsorted(ordered, filters["min_rating"], side="left")
+                row_sets.append(np.sort(self._rating_order[start:]))
+
+        if not row_sets:
+            return np.flatnonzero(alive)
+        rows = self._intersect(row_sets)
+        rows = rows[rows < len(alive)]
+        return rows[alive[rows]].astype(np.int64)
+
+    @staticmethod
+    def _intersect(row_sets: List[np.ndarray]) -> np.ndarray:
+        row_sets = sorted(row_sets, key=len)
+        rows = row_sets[0]
+        for other in row_sets[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "location_terms": len(self._locations),
+                "skills": len(self._skills),
+                "rated_rows": int((~np.isnan(self._ratings)).sum()),
+            }
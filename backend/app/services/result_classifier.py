@@ -0,0 +1,232 @@
+"""
+Single-pass classification of web search results.
+
+SearchService used to run dozens of separate re.search / `in` scans per
+result to decide whether it is an article or ad, whether it looks like an
+expert profile, and which skills the snippet mentions. Here every keyword
+list is compiled once per process into one regex per field (URL, title,
+snippet). Keyword alternations are emitted as a prefix trie, so the engine
+branches on the next character instead of trying each keyword in turn, and
+each field is scanned once.
+"""
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# URL fragments (plain substrings) of articles, ads, forums and event pages
+ARTICLE_URL_FRAGMENTS = [
+    '/article/', '/blog/', '/news/', '/post/', '/stories/',
+    'medium.com', 'forbes.com', 'techcrunch.com', 'venturebeat.com',
+    'businessinsider.com', 'huffpost.com', 'buzzfeed.com',
+    '/amp/', '.amp', '/sponsored/', '/advertisement/',
+    'reddit.com/r/', 'quora.com/q/', 'stackoverflow.com/questions/',
+    'youtube.com/watch', 'vimeo.com', '/press-release/',
+    'slideshare.net', 'scribd.com', '/whitepaper/',
+    'eventbrite.com', 'meetup.com', '/webinar/'
+]
+
+# URL fragments of expert profiles
+PROFILE_URL_FRAGMENTS = [
+    'linkedin.com/in/', 'github.com/', 'twitter.com/',
+    'researchgate.net/profile/', 'scholar.google.com/citations',
+    'orcid.org/', 'academia.edu/', 'about.me/',
+    'personal.', 'portfolio.', '.bio', '/cv', '/resume',
+    'faculty.', 'staff.', '/people/', '/team/', '/profile/',
+    'angellist.com/', 'behance.net/', 'dribbble.com/'
+]
+
+ARTICLE_TITLE_KEYWORDS = [
+    'how to', 'guide to', 'tips for', 'best practices',
+    'top 10', 'top 5', 'why you should', 'what is',
+    'ultimate guide', 'complete guide', 'everything you need',
+    '10 ways', '5 steps', 'tutorial:', 'learn how'
+]
+# "7 best ...", "10 top ..." list articles
+LISTICLE_TITLE_PATTERN = r'\d+\s+(?:best|top|great|amazing|essential)'
+
+ARTICLE_SNIPPET_KEYWORDS = [
+    'in this article', 'this post', 'read more',
+    'continue reading', 'click here', 'subscribe',
+    'sponsored by', 'advertisement', 'promoted',
+    'this guide', 'tutorial shows', 'learn more about'
+]
+
+# Stems: "engineer" also covers "engineering", "prof" covers "professor"
+PROFESSIONAL_INDICATORS = [
+    'phd', 'dr.', 'dr ', 'prof', 'professor', 'engineer',
+    'developer', 'scientist', 'researcher', 'analyst',
+    'consultant', 'expert', 'specialist', 'architect',
+    'manager', 'director', 'founder', 'ceo', 'cto', 'designer'
+]
+
+SKILL_KEYWORDS = [
+    # Programming languages
+    'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
+    'node.js', 'nodejs', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
+    'go', 'golang', 'rust', 'scala', 'r', 'matlab', 'julia',
+
+    # Cloud & DevOps
+    'aws', 'azure', 'gcp', 'google cloud', 'docker', 'kubernetes', 'k8s',
+    'terraform', 'ansible', 'jenkins', 'ci/cd', 'devops', 'cloud',
+
+    # Data & AI
+    'machine learning', 'deep learning', 'ai', 'artificial intelligence',
+    'data science', 'data analysis', 'tensorflow', 'pytorch', 'keras',
+    'nlp', 'computer vision', 'neural networks', 'scikit-learn',
+
+    # Databases
+    'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis',
+    'elasticsearch', 'cassandra', 'dynamodb', 'firebase',
+
+    # Other technologies
+    'blockchain', 'web3', 'solidity', 'ethereum', 'smart contracts',
+    'iot', 'robotics', 'cybersecurity', 'security', 'networking',
+    'microservices', 'api', 'rest', 'graphql', 'agile', 'scrum'
+]
+MAX_SKILLS = 15
+
+_UPPERCASE_SKILLS = {'aws', 'gcp', 'api', 'rest', 'sql', 'nosql', 'nlp', 'ai', 'iot'}
+_SKILL_NAMES = {'node.js': 'Node.js', 'graphql': 'GraphQL', 'ci/cd': 'CI/CD'}
+
+# Title and snippet keywords start where no word character precedes them, and
+# skills must also end at one, so "go" no longer matches in "google", "r" in
+# "for" or "ai" in "said". "&" counts as a word character so "R&D" is not R.
+_WORD_START = r'(?<![\w&])'
+_WORD_END = r'(?![\w&])'
+
+# Title starts like a person's name ("Jane Doe ...")
+_NAME_TITLE_RE = re.compile(r'^[A-Z][a-z]+\s+[A-Z][a-z]+')
+
+def skill_display_name(skill: str) -> str:
+    if skill in _UPPERCASE_SKILLS:
+        return skill.upper()
+    return _SKILL_NAMES.get(skill, skill.title())
+
+_SKILL_DISPLAY_NAMES = {skill: skill_display_name(skill) for skill in SKILL_KEYWORDS}
+
+def trie_pattern(words: Iterable[str], whole_words: Iterable[str] = ()) -> str:
+    """
+    Regex matching any of the literal words, with shared prefixes factored
+    out so the engine branches on the next character instead of trying each
+    word in turn. Words in whole_words only match when followed by a word end.
+    """
+    whole_words = set(whole_words)
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = _WORD_END if word in whole_words else ''
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if '' not in node:
+            return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Longer words first, so the longest word at a position wins
+        branches.append(node[''])
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return emit(trie)
+
+class KeywordScanner:
+    """
+    Multi-keyword matcher in the spirit of Aho-Corasick: every keyword of
+    every category goes into one trie-shaped regex inside a lookahead, so a
+    single findall reports the longest keyword at each candidate start,
+    including overlapping ones ("google cloud" and "cloud"). Hits map back to
+    their categories by dictionary lookup; text matched by extra_pattern
+    (a non-literal regex) counts as extra_category.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], whole_word: Iterable[str] = (),
+                 word_start: bool = True, extra_pattern: Optional[str] = None, extra_category: str = ''):
+        self._categories: Dict[str, Tuple[str, ...]] = {}
+        whole_words = set()
+        for category, words in categories.items():
+            for word in words:
+                self._categories[word] = self._categories.get(word, ()) + (category,)
+                if category in whole_word:
+                    # A keyword in a whole-word category is whole-word everywhere
+                    whole_words.add(word)
+        self._extra_category = (extra_category,)
+        alternatives = trie_pattern(self._categories, whole_words)
+        if extra_pattern:
+            alternatives += '|' + extra_pattern
+        self._pattern = re.compile((_WORD_START if word_start else '') + '(?=(' + alternatives + '))')
+
+    def scan(self, text: str) -> List[Tuple[str, str]]:
+        """(category, keyword) for every hit in the already-lowercased text"""
+        lookup, extra = self._categories, self._extra_category
+        return [
+            (category, keyword)
+            for keyword in self._pattern.findall(text)
+            for category in lookup.get(keyword, extra)
+        ]
+
+    def categories(self, text: str) -> Set[str]:
+        lookup, extra = self._categories, self._extra_category
+        return {category for keyword in self._pattern.findall(text) for category in lookup.get(keyword, extra)}
+
+class ResultClassification(NamedTuple):
+    is_article: bool
+    is_profile: bool
+    skills: List[str]
+
+class ResultClassifier:
+    """Precompiled per-field scanners shared by every search request"""
+
+    def __init__(self):
+        self._url = KeywordScanner(
+            {'article': ARTICLE_URL_FRAGMENTS, 'profile': PROFILE_URL_FRAGMENTS},
+            word_start=False
+        )
+        self._title = KeywordScanner(
+            {'article': ARTICLE_TITLE_KEYWORDS, 'indicator': PROFESSIONAL_INDICATORS},
+            extra_pattern=LISTICLE_TITLE_PATTERN, extra_category='article'
+        )
+        self._snippet = KeywordScanner(
+            {'article': ARTICLE_SNIPPET_KEYWORDS, 'indicator': PROFESSIONAL_INDICATORS, 'skill': SKILL_KEYWORDS},
+            whole_word=('skill',)
+        )
+        self._skills = KeywordScanner({'skill': SKILL_KEYWORDS}, whole_word=('skill',))
+
+    @staticmethod
+    def _skills_from(hits: List[Tuple[str, str]]) -> List[str]:
+        """Display names in order of first mention, at most MAX_SKILLS"""
+        names = dict.fromkeys(_SKILL_DISPLAY_NAMES[keyword] for category, keyword in hits if category == 'skill')
+        return list(names)[:MAX_SKILLS]
+
+    def classify(self, url: str, title: str, snippet: str) -> ResultClassification:
+        """
+        Article/ad flag, profile flag and snippet skills, scanning each field
+        at most once. Articles are never profiles, so the remaining fields are
+        skipped as soon as one field marks the result as an article.
+        """
+        url_hits = self._url.categories((url or '').lower())
+        if 'article' in url_hits:
+            return ResultClassification(True, False, [])
+        title_hits = self._title.categories((title or '').lower())
+        if 'article' in title_hits:
+            return ResultClassification(True, False, [])
+        snippet_hits = self._snippet.scan((snippet or '').lower())
+        snippet_categories = {category for category, _ in snippet_hits}
+        if 'article' in snippet_categories:
+            return ResultClassification(True, False, [])
+
+        is_profile = 'profile' in url_hits or (
+            bool(_NAME_TITLE_RE.match(title or ''))
+            and ('indicator' in title_hits or 'indicator' in snippet_categories)
+        )
+        return ResultClassification(False, is_profile, self._skills_from(snippet_hits))
+
+    def is_article_or_ad(self, url: str, title: str, snippet: str) -> bool:
+        return self.classify(url, title, snippet).is_article
+
+    def is_expert_profile(self, url: str, title: str, snippet: str) -> bool:
+        return self.classify(url, title, snippet).is_profile
+
+    def extract_skills(self, text: str) -> List[str]:
+        """Skills mentioned in the text, in order of first mention, at most MAX_SKILLS"""
+        return self._skills_from(self._skills.scan((text or '').lower()))
+
+# Global instance
+result_classifier = ResultClassifier()
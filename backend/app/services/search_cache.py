@@ -0,0 +1,142 @@
+"""
+Stale-while-revalidate cache of SearchService.search results.
+
+Entries live in app/utils/cache.py (Redis, or the in-process fallback)
+wrapped in an envelope with the time they were computed. Within
+SEARCH_CACHE_FRESH_SECONDS an entry is served as is. After that, and up to
+SEARCH_CACHE_STALE_SECONDS more, it is still served immediately while one
+background task recomputes it. Older entries have expired from the store and
+are recomputed inline.
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.services.bm25_index import tokenize
+from app.utils.cache import cache_result, get_cached_result
+from app.utils.singleflight import SINGLEFLIGHT_REDIS_ENABLED, redis_singleflight
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_CACHE_FRESH_SECONDS = int(os.getenv("SEARCH_CACHE_FRESH_SECONDS", "300"))
+SEARCH_CACHE_STALE_SECONDS = int(os.getenv("SEARCH_CACHE_STALE_SECONDS", "3600"))
+SEARCH_CACHE_KEY_PREFIX = "search:v1:"
+# Latency samples kept for the percentiles in get_stats()
+SEARCH_CACHE_LATENCY_SAMPLES = 1000
+
+def normalize_query(query: str) -> str:
+    """Case, punctuation, stop words ("find", "experts", ...), repeats and word order don't matter"""
+    return " ".join(sorted(set(tokenize(query))))
+
+def search_cache_key(query: str, source: str, limit: int, offset: int,
+                     filters: Optional[Dict[str, Any]] = None) -> str:
+    parts = {
+        "q": normalize_query(query),
+        "source": (source or "all").lower(),
+        "limit": limit,
+        "offset": offset,
+        "filters": filters or {},
+    }
+    digest = hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=16)
+    return SEARCH_CACHE_KEY_PREFIX + digest.hexdigest()
+
+class SearchResultCache:
+    """get_or_compute() with stale-while-revalidate, plus hit ratio and latency metrics"""
+
+    def __init__(self, fresh_seconds: int = SEARCH_CACHE_FRESH_SECONDS,
+                 stale_seconds: int = SEARCH_CACHE_STALE_SECONDS):
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+        self._read_ms = deque(maxlen=SEARCH_CACHE_LATENCY_SAMPLES)
+        self._write_ms = deque(maxlen=SEARCH_CACHE_LATENCY_SAMPLES)
+
+    async def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            return await get_cached_result(key)
+        finally:
+            self._read_ms.append(1000 * (time.perf_counter() - start))
+
+    async def _write(self, key: str, result: Dict[str, Any]):
+        # Empty pages are often a transient upstream failure; don't pin them
+        if not result.get("experts"):
+            return
+        start = time.perf_counter()
+        try:
+            await cache_result(
+                key, {"cached_at": time.time(), "result": result},
+                ttl=self.fresh_seconds + self.stale_seconds
+            )
+        finally:
+            self._write_ms.append(1000 * (time.perf_counter() - start))
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        envelope = await self._read(key)
+        if envelope and "result" in envelope:
+            age = time.time() - envelope.get("cached_at", 0)
+            if age < self.fresh_seconds:
+                self._stats["fresh_hits"] += 1
+                return dict(envelope["result"], cache="fresh")
+            self._stats["stale_hits"] += 1
+            self._schedule_refresh(key, compute)
+            return dict(envelope["result"], cache="stale")
+
+        self._stats["misses"] += 1
+
+        async def compute_and_store() -> Dict[str, Any]:
+            result = await compute()
+            await self._write(key, result)
+            return result
+
+        if SINGLEFLIGHT_REDIS_ENABLED:
+            # One worker computes the miss; the others pick its result up from the cache
+            return await redis_singleflight.do(key, compute_and_store, load=lambda: self._load_result(key))
+        return await compute_and_store()
+
+    async def _load_result(self, key: str) -> Optional[Dict[str, Any]]:
+        envelope = await self._read(key)
+        return dict(envelope["result"], cache="shared") if envelope and "result" in envelope else None
+
+    def _schedule_refresh(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]):
+        """At most one background recompute per key at a time"""
+        if key in self._refreshing:
+            return
+        task = asyncio.get_running_loop().create_task(self._refresh(key, compute))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]):
+        try:
+            await self._write(key, await compute())
+            self._stats["refreshes"] += 1
+        except Exception as e:
+            self._stats["refresh_errors"] += 1
+            print(f"⚠️ Background search refresh failed: {e}")
+
+    @staticmethod
+    def _latency(samples) -> Dict[str, float]:
+        if not samples:
+            return {"avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+        ordered = sorted(samples)
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered), 3),
+            "p50_ms": round(ordered[len(ordered) // 2], 3),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        lookups = stats["fresh_hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["fresh_hits"] + stats["stale_hits"]) / lookups, 3) if lookups else 0.0
+        stats["refreshing"] = len(self._refreshing)
+        stats["read_latency"] = self._latency(self._read_ms)
+        stats["write_latency"] = self._latency(self._write_ms)
+        return stats
+
+# Global instance
+search_result_cache = SearchResultCache()
@@ -6,7 +6,6 @@ File: /backend/app/services/search_service.py
 
 from typing import List, Dict, Any, Optional
 import os
-import httpx
 import json
 import re
 import asyncio
@@ -14,6 +13,21 @@ from datetime import datetime
 from app.agents.web_search_agent import web_search_agent
 from app.services.enhanced_search_service import enhanced_search_service
 from app.services.linkedin_profile_extractor import linkedin_profile_extractor
+from app.services.expert_service import ExpertService
+from app.services.discovered_experts import DISCOVERED_INDEXING_ENABLED, discovered_expert_indexer
+from app.services.result_classifier import result_classifier
+from app.utils.http_client import outbound_http
+from app.utils.singleflight import SingleFlight
+from app.services.github_profiles import GITHUB_ENRICH_CONCURRENCY, github_profile_cache
+from app.services.search_cache import SEARCH_CACHE_ENABLED, search_cache_key, search_result_cache
+
+# Query planner: serve from the local index when it has enough hits at least this similar
+LOCAL_FIRST_ENABLED = os.getenv("LOCAL_FIRST_ENABLED", "true").lower() == "true"
+LOCAL_MIN_SIMILARITY = float(os.getenv("LOCAL_MIN_SIMILARITY", "0.55"))
+
+# Coalesce concurrent identical searches and GitHub profile lookups
+search_flights = SingleFlight("search")
+github_profile_flights = SingleFlight("github_profile")
 
 class SearchService:
     """Service for searching experts online with accurate profile detection"""
@@ -24,30 +38,11 @@ class SearchService:
         self.github_token = os.getenv("GITHUB_TOKEN", "")  # Optional: for GitHub API
         self.use_google_api = bool(self.google_api_key and self.google_cse_id)
         
-        # Initialize caches
-        self._profile_cache = {}
-        
-        # Article/Ad patterns to filter out
-        self.article_patterns = [
-            r'/article/', r'/blog/', r'/news/', r'/post/', r'/stories/',
-            r'medium\.com', r'forbes\.com', r'techcrunch\.com', r'venturebeat\.com',
-            r'businessinsider\.com', r'huffpost\.com', r'buzzfeed\.com',
-            r'/amp/', r'\.amp', r'/sponsored/', r'/advertisement/',
-            r'reddit\.com/r/', r'quora\.com/q/', r'stackoverflow\.com/questions/',
-            r'youtube\.com/watch', r'vimeo\.com', r'/press-release/',
-            r'slideshare\.net', r'scribd\.com', r'/whitepaper/',
-            r'eventbrite\.com', r'meetup\.com', r'/webinar/'
-        ]
+        # GitHub profiles by username (TTL, ETags, negative entries); shared process-wide
+        self._profile_cache = github_profile_cache
         
-        # Expert profile patterns to prioritize
-        self.expert_patterns = [
-            r'linkedin\.com/in/', r'github\.com/', r'twitter\.com/',
-            r'researchgate\.net/profile/', r'scholar\.google\.com/citations',
-            r'orcid\.org/', r'academia\.edu/', r'about\.me/',
-            r'personal\.', r'portfolio\.', r'\.bio', r'/cv', r'/resume',
-            r'faculty\.', r'staff\.', r'/people/', r'/team/', r'/profile/',
-            r'angellist\.com/', r'behance\.net/', r'dribbble\.com/'
-        ]
+        # Local vector index of stored experts
+        self.expert_service = ExpertService()
         
         # Professional platforms for focused search
         self.professional_platforms = {
@@ -62,103 +57,91 @@ class SearchService:
     
     def _is_article_or_ad(self, url: str, title: str, snippet: str) -> bool:
         """Check if a result is an article or ad instead of an expert profile"""
-        url_lower = url.lower()
-        title_lower = title.lower()
-        snippet_lower = snippet.lower()
-        
-        # Check URL patterns
-        for pattern in self.article_patterns:
-            if re.search(pattern, url_lower):
-                return True
-        
-        # Check title patterns that indicate articles
-        article_title_keywords = [
-            'how to', 'guide to', 'tips for', 'best practices',
-            'top 10', 'top 5', 'why you should', 'what is',
-            'ultimate guide', 'complete guide', 'everything you need',
-            '10 ways', '5 steps', 'tutorial:', 'learn how'
-        ]
-        for keyword in article_title_keywords:
-            if keyword in title_lower:
-                return True
-        
-        # Check if it's a list/compilation article
-        if re.search(r'\d+\s+(best|top|great|amazing|essential)', title_lower):
-            return True
-        
-        # Check snippet for article-like content
-        article_snippet_patterns = [
-            'in this article', 'this post', 'read more',
-            'continue reading', 'click here', 'subscribe',
-            'sponsored by', 'advertisement', 'promoted',
-            'this guide', 'tutorial shows', 'learn more about'
-        ]
-        for pattern in article_snippet_patterns:
-            if pattern in snippet_lower:
-                return True
-        
-        return False
+        return result_classifier.classify(url, title, snippet).is_article
     
     def _is_expert_profile(self, url: str, title: str, snippet: str) -> bool:
         """Check if a result is likely an expert profile"""
-        url_lower = url.lower()
-        
-        # Check for expert profile patterns
-        for pattern in self.expert_patterns:
-            if re.search(pattern, url_lower):
-                return True
-        
-        # Check if title contains person's name pattern
-        # Look for typical name structures
-        if re.match(r'^[A-Z][a-z]+\s+[A-Z][a-z]+', title):
-            # Check if it has professional indicators
-            prof_indicators = [
-                'phd', 'dr.', 'dr ', 'prof', 'professor', 'engineer', 
-                'developer', 'scientist', 'researcher', 'analyst', 
-                'consultant', 'expert', 'specialist', 'architect', 
-                'manager', 'director', 'founder', 'ceo', 'cto', 'designer'
-            ]
-            title_and_snippet = (title + ' ' + snippet).lower()
-            for indicator in prof_indicators:
-                if indicator in title_and_snippet:
-                    return True
-        
-        return False
+        return result_classifier.classify(url, title, snippet).is_profile
     
     async def _extract_github_profile(self, username: str) -> Optional[Dict]:
-        """Extract profile data from GitHub API"""
+        """Extract profile data from GitHub API; concurrent lookups of one user share a call"""
         if not username:
             return None
+        return await github_profile_flights.do(username.lower(), lambda: self._fetch_github_profile(username))
+    
+    async def _fetch_github_profile(self, username: str) -> Optional[Dict]:
+        """GitHub API call through the profile cache"""
+        cached, fresh = self._profile_cache.lookup(username)
+        if fresh:
+            return cached.profile
             
         try:
             headers = {}
             if self.github_token:
                 headers['Authorization'] = f'token {self.github_token}'
+            if cached is not None and cached.etag:
+                # Conditional request: a 304 is free against the rate limit
+                headers['If-None-Match'] = cached.etag
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f'https://api.github.com/users/{username}',
-                    headers=headers
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        'name': data.get('name') or username,
-                        'bio': data.get('bio', ''),
-                        'location': data.get('location', ''),
-                        'company': data.get('company', ''),
-                        'blog': data.get('blog', ''),
-                        'email': data.get('email', ''),
-                        'followers': data.get('followers', 0),
-                        'public_repos': data.get('public_repos', 0),
-                        'github_url': data.get('html_url'),
-                        'avatar_url': data.get('avatar_url')
-                    }
+            response = await outbound_http.get(
+                f'https://api.github.com/users/{username}',
+                headers=headers
+            )
+            
+            if response.status_code == 304 and cached is not None:
+                self._profile_cache.revalidated(username, cached)
+                return cached.profile
+            
+            if response.status_code == 200:
+                data = response.json()
+                profile = {
+                    'name': data.get('name') or username,
+                    'bio': data.get('bio', ''),
+                    'location': data.get('location', ''),
+                    'company': data.get('company', ''),
+                    'blog': data.get('blog', ''),
+                    'email': data.get('email', ''),
+                    'followers': data.get('followers', 0),
+                    'public_repos': data.get('public_repos', 0),
+                    'github_url': data.get('html_url'),
+                    'avatar_url': data.get('avatar_url')
+                }
+                self._profile_cache.store(username, profile, response.headers.get('ETag'))
+                return profile
+            
+            if response.status_code == 404:
+                self._profile_cache.store_missing(username)
+                return None
+            
+            print(f"GitHub profile fetch for {username} returned {response.status_code}")
         except Exception as e:
             print(f"Error fetching GitHub profile: {e}")
         
-        return None
+        self._profile_cache.store_error(username, cached)
+        return cached.profile if cached is not None else None
+    
+    async def _enrich_with_github(self, experts: List[Dict]):
+        """Merge GitHub API data into GitHub results, at most GITHUB_ENRICH_CONCURRENCY calls at a time"""
+        semaphore = asyncio.Semaphore(GITHUB_ENRICH_CONCURRENCY)
+        
+        async def enrich(expert: Dict):
+            async with semaphore:
+                github_data = await self._extract_github_profile(expert['username'])
+            if github_data:
+                expert.update({
+                    'bio': github_data.get('bio') or expert.get('bio'),
+                    'location': github_data.get('location') or expert.get('location'),
+                    'company': github_data.get('company'),
+                    'website': github_data.get('blog') or expert.get('website'),
+                    'avatar_url': github_data.get('avatar_url'),
+                    'github_followers': github_data.get('followers'),
+                    'github_repos': github_data.get('public_repos')
+                })
+        
+        await asyncio.gather(*(
+            enrich(expert) for expert in experts
+            if expert.get('profile_type') == 'github' and expert.get('username')
+        ))
     
     def _extract_expert_from_result(self, result: Dict, source: str = "web") -> Optional[Dict]:
         """Extract expert information from a search result"""
@@ -166,12 +149,15 @@ class SearchService:
         title = result.get('title', '')
         snippet = result.get('snippet', '')
         
+        # One scan per field: article/ad flag, profile flag and snippet skills
+        classification = result_classifier.classify(url, title, snippet)
+        
         # Skip if it's an article or ad
-        if self._is_article_or_ad(url, title, snippet):
+        if classification.is_article:
             return None
         
         # Prioritize if it's an expert profile
-        is_profile = self._is_expert_profile(url, title, snippet)
+        is_profile = classification.is_profile
         
         # Extract name from title
         name = self._extract_name_from_title(title)
@@ -204,8 +190,8 @@ class SearchService:
         elif is_profile:
             profile_type = "professional"
         
-        # Extract skills from snippet
-        skills = self._extract_skills_from_text(snippet)
+        # Skills from snippet
+        skills = classification.skills
         
         # Calculate relevance score
         base_score = 70
@@ -293,52 +279,8 @@ class SearchService:
         return first_sentence[:100] if first_sentence else "Expert"
     
     def _extract_skills_from_text(self, text: str) -> List[str]:
-        """Extract skills from text with improved detection"""
-        skills = []
-        text_lower = text.lower()
-        
-        # Comprehensive skill keywords
-        skill_keywords = [
-            # Programming languages
-            'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
-            'node.js', 'nodejs', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
-            'go', 'golang', 'rust', 'scala', 'r', 'matlab', 'julia',
-            
-            # Cloud & DevOps
-            'aws', 'azure', 'gcp', 'google cloud', 'docker', 'kubernetes', 'k8s',
-            'terraform', 'ansible', 'jenkins', 'ci/cd', 'devops', 'cloud',
-            
-            # Data & AI
-            'machine learning', 'deep learning', 'ai', 'artificial intelligence',
-            'data science', 'data analysis', 'tensorflow', 'pytorch', 'keras',
-            'nlp', 'computer vision', 'neural networks', 'scikit-learn',
-            
-            # Databases
-            'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis',
-            'elasticsearch', 'cassandra', 'dynamodb', 'firebase',
-            
-            # Other technologies
-            'blockchain', 'web3', 'solidity', 'ethereum', 'smart contracts',
-            'iot', 'robotics', 'cybersecurity', 'security', 'networking',
-            'microservices', 'api', 'rest', 'graphql', 'agile', 'scrum'
-        ]
-        
-        # Extract skills
-        for skill in skill_keywords:
-            if skill in text_lower:
-                # Capitalize appropriately
-                if skill in ['aws', 'gcp', 'api', 'rest', 'sql', 'nosql', 'nlp', 'ai', 'iot']:
-                    skills.append(skill.upper())
-                elif skill == 'node.js':
-                    skills.append('Node.js')
-                elif skill == 'graphql':
-                    skills.append('GraphQL')
-                elif skill == 'ci/cd':
-                    skills.append('CI/CD')
-                else:
-                    skills.append(skill.title())
-        
-        return list(set(skills))[:15]  # Return up to 15 unique skills
+        """Extract skills from text (whole-word matches, up to 15)"""
+        return result_classifier.extract_skills(text)
     
     def _extract_email_from_text(self, text: str) -> Optional[str]:
         """Extract email from text"""
@@ -370,11 +312,42 @@ class SearchService:
         offset: int = 0,
         filters: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Search for experts online with improved accuracy"""
+        """Search for experts online with improved accuracy, through the result cache"""
         
         if not query:
             return {"experts": [], "total": 0, "offset": offset, "has_more": False}
         
+        # Same normalized query, source, page and filters -> same cache entry
+        key = search_cache_key(query, source, limit, offset, filters)
+        
+        async def compute() -> Dict[str, Any]:
+            uncached = lambda: self._search_uncached(query, source, limit, offset, filters)
+            if not SEARCH_CACHE_ENABLED:
+                return await uncached()
+            return await search_result_cache.get_or_compute(key, uncached)
+        
+        # Concurrent identical searches in this process share one computation;
+        # each caller gets its own copies of the expert dicts (matching rescores them)
+        result = await search_flights.do(key, compute)
+        return dict(result, experts=[dict(expert) for expert in result.get("experts", [])])
+    
+    async def _search_uncached(
+        self,
+        query: str,
+        source: str,
+        limit: int,
+        offset: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Local index first, then web search, GitHub enrichment and write-behind indexing"""
+        
+        # Answer from the local index when it already knows enough relevant experts
+        local = await self._search_local(query, source, limit, offset, filters)
+        if local is not None:
+            discovered_expert_indexer.record_plan(answered_locally=True)
+            return local
+        discovered_expert_indexer.record_plan(answered_locally=False)
+        
         # Build enhanced query for better results
         enhanced_queries = []
         
@@ -428,20 +401,12 @@ class SearchService:
         end_idx = offset + limit
         paginated_experts = unique_experts[start_idx:end_idx]
         
-        # Enhance with additional data if possible (e.g., GitHub API)
-        for expert in paginated_experts:
-            if expert.get('profile_type') == 'github' and expert.get('username'):
-                github_data = await self._extract_github_profile(expert['username'])
-                if github_data:
-                    expert.update({
-                        'bio': github_data.get('bio') or expert.get('bio'),
-                        'location': github_data.get('location') or expert.get('location'),
-                        'company': github_data.get('company'),
-                        'website': github_data.get('blog') or expert.get('website'),
-                        'avatar_url': github_data.get('avatar_url'),
-                        'github_followers': github_data.get('followers'),
-                        'github_repos': github_data.get('public_repos')
-                    })
+        # Enhance with additional data if possible (GitHub API, concurrently)
+        await self._enrich_with_github(paginated_experts)
+        
+        # Store what was found, off the request path, so the next query can stay local
+        if DISCOVERED_INDEXING_ENABLED:
+            discovered_expert_indexer.enqueue(unique_experts)
         
         return {
             "experts": paginated_experts,
@@ -452,6 +417,77 @@ class SearchService:
             "source": source
         }
     
+    async def _search_local(
+        self,
+        query: str,
+        source: str,
+        limit: int,
+        offset: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """The local results page if offset + limit hits clear LOCAL_MIN_SIMILARITY, else None"""
+        if not LOCAL_FIRST_ENABLED:
+            return None
+        try:
+            experts = await self.expert_service.search_experts_async(query, limit=offset + limit, filters=filters)
+        except Exception as e:
+            print(f"⚠️ Local expert search failed, using web search: {e}")
+            return None
+        
+        confident = []
+        for expert in experts:
+            links = expert.links or {}
+            profile_type = links.get("profile_type") or ("linkedin" if expert.linkedin_url else "local")
+            if (expert.similarity or 0) < LOCAL_MIN_SIMILARITY:
+                continue
+            if source not in ("all", profile_type):
+                continue
+            expert_data = expert.dict()
+            expert_data.update({
+                "source": "Local Index",
+                "url": links.get("profile") or expert.linkedin_url or expert.scholar_url,
+                "profile_url": links.get("profile") or expert.linkedin_url or expert.scholar_url,
+                "profile_type": profile_type,
+                "match_score": round(expert.similarity * 100),
+                "is_verified_profile": expert.verified,
+            })
+            confident.append(expert_data)
+        if len(confident) < offset + limit:
+            return None
+        
+        return {
+            "experts": confident[offset:offset + limit],
+            "total": len(confident),
+            "offset": offset,
+            "has_more": False,
+            "query": query,
+            "source": source,
+            "answered_from": "local_index"
+        }
+    
+    async def vector_search(
+        self,
+        query: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Similarity search over the locally indexed experts"""
+        if not query:
+            return {"experts": [], "total": 0, "query": query}
+        
+        timings: Dict[str, Any] = {}
+        experts = await self.expert_service.search_experts_async(
+            query, limit=limit, timings=timings, filters=filters
+        )
+        expert_dicts = [expert.dict() for expert in experts]
+        
+        return {
+            "experts": expert_dicts,
+            "total": len(expert_dicts),
+            "query": query,
+            "timings": timings
+        }
+    
     async def _google_custom_search(self, query: str, num_results: int) -> List[Dict]:
         """Use Google Custom Search API with improved parameters"""
         experts = []
@@ -467,19 +503,18 @@ class SearchService:
             "start": 1
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, params=params)
-                data = response.json()
-                
-                if "items" in data:
-                    for item in data["items"]:
-                        expert_data = self._extract_expert_from_result(item, "Google CSE")
-                        if expert_data:
-                            experts.append(expert_data)
-                
-            except Exception as e:
-                print(f"Error in Google Custom Search: {e}")
+        try:
+            response = await outbound_http.get(url, params=params)
+            data = response.json()
+            
+            if "items" in data:
+                for item in data["items"]:
+                    expert_data = self._extract_expert_from_result(item, "Google CSE")
+                    if expert_data:
+                        experts.append(expert_data)
+            
+        except Exception as e:
+            print(f"Error in Google Custom Search: {e}")
         
         return experts
 
@@ -0,0 +1,304 @@
+"""
+Single-file snapshot of the whole search state, for fast cold starts.
+
+A snapshot holds, per source collection, the normalized vectors, ids,
+metadata and documents, plus the BM25 inverted index and the precomputed
+similar-experts table. Layout:
+
+    b"EXPSNAP\\0" | uint32 format version | uint32 0 | uint64 header length
+    | 16-byte blake2b of the header | header JSON | 64-byte aligned sections
+
+The header lists every section (offset, dtype, shape) and a blake2b checksum
+of the section bytes. Loading maps the file and wraps sections as NumPy views,
+so restore cost barely depends on corpus size. Only the header is verified
+up front. The payload checksum, and a comparison against the primary store
+(Chroma or the built-in index), run on a background thread. Queries are
+served from the snapshot until that check hands over to the primary store.
+
+Create one with:  python data_processing/snapshot_search_state.py
+"""
+import os
+import json
+import time
+import struct
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.bm25_index import bm25_index
+from app.services.similar_experts import similar_experts_index
+from app.services.vector_index import EMBEDDING_DIM, NumpyVectorIndex
+
+SEARCH_SNAPSHOT_PATH = os.getenv("SEARCH_SNAPSHOT_PATH", "./search_snapshot.bin")
+SEARCH_SNAPSHOT_RESTORE = os.getenv("SEARCH_SNAPSHOT_RESTORE", "true").lower() == "true"
+
+MAGIC = b"EXPSNAP\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+SOURCES = ("linkedin", "scholar")
+_PREAMBLE = struct.Struct("<8sIIQ16s")
+
+class SnapshotError(Exception):
+    """The file is not a usable snapshot (wrong magic/version, corrupt header)"""
+
+class _Strings:
+    """UTF-8 strings packed as one byte blob plus offsets; decoded on access"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        data = self._blob.tobytes()
+        offsets = self._offsets.tolist()
+        return (data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(self)))
+
+def _pack_strings(values: Iterable[str]):
+    encoded = [str(value).encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def write_snapshot(path: str, collections: Dict[str, Any], bm25=bm25_index, similar=similar_experts_index) -> Dict[str, Any]:
+    """Serialize collections (Chroma or built-in), BM25 and similar-experts state into `path`"""
+    sections: Dict[str, Any] = {}
+    counts = {}
+    for source, collection in collections.items():
+        stored = collection.get(include=["embeddings", "metadatas", "documents"])
+        vectors = (np.asarray(stored["embeddings"], dtype=np.float32).reshape(len(stored["ids"]), -1)
+                   if stored["ids"] else np.zeros((0, EMBEDDING_DIM), dtype=np.float32))
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        sections[f"{source}/vectors"] = vectors
+        sections[f"{source}/ids"] = stored["ids"]
+        sections[f"{source}/metadatas"] = [json.dumps(m, default=str) for m in stored["metadatas"] or []]
+        sections[f"{source}/documents"] = [d or "" for d in stored["documents"] or []]
+        counts[source] = len(stored["ids"])
+    for group, state in (("bm25", bm25.export_state()), ("similar", similar.export_state())):
+        for name, value in state.items():
+            sections[f"{group}/{name}"] = value
+
+    # Strings become blob + offsets pairs; everything else is a raw array
+    arrays: Dict[str, np.ndarray] = {}
+    layout: Dict[str, Dict[str, Any]] = {}
+    for name, value in sections.items():
+        if isinstance(value, list) or (isinstance(value, np.ndarray) and value.dtype == object):
+            arrays[f"{name}.blob"], arrays[f"{name}.offsets"] = _pack_strings(value)
+            layout[name] = {"kind": "strings"}
+        else:
+            arrays[name] = np.ascontiguousarray(value)
+
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout.setdefault(name, {}).update(
+            {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        )
+        offset += array.nbytes
+    payload_hash = hashlib.blake2b(digest_size=16)
+    position = 0
+    for name, array in arrays.items():
+        payload_hash.update(b"\0" * (layout[name]["offset"] - position))
+        payload_hash.update(memoryview(array).cast("B") if array.nbytes else b"")
+        position = layout[name]["offset"] + array.nbytes
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.time(),
+        "counts": counts,
+        "sections": layout,
+        "payload_blake2b": payload_hash.hexdigest(),
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    preamble = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes),
+                              hashlib.blake2b(header_bytes, digest_size=16).digest())
+    data_start = -(-(len(preamble) + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp_path, "wb") as f:
+        f.write(preamble)
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b"\0" * (data_start + layout[name]["offset"] - f.tell()))
+            f.write(memoryview(array).cast("B") if array.nbytes else b"")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return {"path": path, "bytes": os.path.getsize(path), "counts": counts}
+
+class SearchSnapshot:
+    """A snapshot file mapped read-only; sections are views into the mapping"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            preamble = f.read(_PREAMBLE.size)
+            if len(preamble) < _PREAMBLE.size:
+                raise SnapshotError("file too short")
+            magic, version, _, header_length, header_digest = _PREAMBLE.unpack(preamble)
+            if magic != MAGIC:
+                raise SnapshotError("not a search snapshot")
+            if version != FORMAT_VERSION:
+                raise SnapshotError(f"format version {version}, expected {FORMAT_VERSION}")
+            header_bytes = f.read(header_length)
+        if hashlib.blake2b(header_bytes, digest_size=16).digest() != header_digest:
+            raise SnapshotError("header checksum mismatch")
+        self.header = json.loads(header_bytes)
+        self.data_start = -(-(_PREAMBLE.size + header_length) // ALIGNMENT) * ALIGNMENT
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        self.sources = [source for source in SOURCES if f"{source}/vectors" in self.header["sections"]]
+
+    def array(self, name: str) -> np.ndarray:
+        spec = self.header["sections"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = self.data_start + spec["offset"]
+        return self._map[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    def strings(self, name: str) -> _Strings:
+        return _Strings(self.array(f"{name}.blob"), self.array(f"{name}.offsets"))
+
+    def group(self, prefix: str) -> Dict[str, Any]:
+        """Every section under prefix/, keyed by the rest of its name"""
+        group = {}
+        for name, spec in self.header["sections"].items():
+            if not name.startswith(prefix + "/") or name.endswith((".blob", ".offsets")):
+                continue
+            key = name[len(prefix) + 1:]
+            group[key] = self.strings(name) if spec.get("kind") == "strings" else self.array(name)
+        return group
+
+    def verify_payload(self) -> bool:
+        digest = hashlib.blake2b(digest_size=16)
+        for start in range(self.data_start, len(self._map), 1 << 24):
+            digest.update(self._map[start:start + (1 << 24)])
+        return digest.hexdigest() == self.header["payload_blake2b"]
+
+class SnapshotCollection(NumpyVectorIndex):
+    """Read-only collection over one source's snapshot sections (exact search, filters included)"""
+
+    def __init__(self, snapshot: SearchSnapshot, source: str):
+        vectors = snapshot.array(f"{source}/vectors")
+        self.path = snapshot.path
+        self.name = f"{source}_experts"
+        self.dim = vectors.shape[1] if vectors.ndim == 2 and vectors.shape[1] else EMBEDDING_DIM
+        self.row_bytes = self.dim * 4
+        self.read_only = True
+        self._lock = threading.RLock()
+        self._vectors = vectors.reshape(-1, self.dim)
+        self._row_ids: List[Optional[str]] = list(snapshot.strings(f"{source}/ids"))
+        self._id_to_row = {id_: row for row, id_ in enumerate(self._row_ids)}
+        self._alive = np.ones(len(self._row_ids), dtype=bool)
+        self._metadatas = snapshot.strings(f"{source}/metadatas")
+        self._documents = snapshot.strings(f"{source}/documents")
+        self._filters = None
+
+    def refresh(self):
+        """Immutable: nothing to pick up"""
+
+    def _read_row_entries(self, rows: List[int]) -> List[Dict[str, Any]]:
+        return [{"metadata": json.loads(self._metadatas[row]), "document": self._documents[row] or None}
+                for row in rows]
+
+    def _filter_index(self):
+        with self._lock:
+            if self._filters is None:
+                from app.services.metadata_filter import MetadataFilterIndex
+                filters = MetadataFilterIndex()
+                for row, metadata in enumerate(self._metadatas):
+                    filters.add(row, json.loads(metadata))
+                self._filters = filters
+            return self._filters
+
+    def memory_stats(self) -> Dict[str, Any]:
+        stats = super().memory_stats()
+        stats["backend"] = "snapshot"
+        return stats
+
+def _content_hashes(collection) -> Dict[str, Optional[str]]:
+    stored = collection.get(include=["metadatas"])
+    return {id_: (metadata or {}).get("content_hash") for id_, metadata in zip(stored["ids"], stored["metadatas"])}
+
+class SearchStateRestorer:
+    """Installs a snapshot at startup, then verifies it and hands over to the primary store"""
+
+    def __init__(self, path: str = SEARCH_SNAPSHOT_PATH):
+        self.path = path
+        self.status: Dict[str, Any] = {"state": "not_restored"}
+
+    def restore(self, check_in_background: bool = True) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        from app.services.vector_search import vector_search_service
+        started = time.perf_counter()
+        try:
+            snapshot = SearchSnapshot(self.path)
+            collections = {source: SnapshotCollection(snapshot, source) for source in snapshot.sources}
+            bm25_index.load_state(snapshot.group("bm25"))
+            similar_experts_index.load_state(snapshot.group("similar"))
+        except Exception as e:
+            print(f"⚠️ Could not restore search snapshot {self.path}: {e}")
+            self.status = {"state": "failed", "error": str(e)}
+            return False
+        vector_search_service.install_collections(collections, backend="snapshot")
+        restore_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.status = {
+            "state": "serving_snapshot",
+            "restore_ms": restore_ms,
+            "created_at": snapshot.header["created_at"],
+            "counts": snapshot.header["counts"],
+        }
+        print(f"✅ Restored search state from {self.path} in {restore_ms} ms: {snapshot.header['counts']}")
+
+        if check_in_background:
+            threading.Thread(target=self.check_consistency, args=(snapshot,),
+                             name="snapshot-check", daemon=True).start()
+        return True
+
+    def check_consistency(self, snapshot: SearchSnapshot) -> Dict[str, Any]:
+        """Verify the payload checksum, diff against the primary store, then switch to the primary"""
+        from app.services.vector_search import VectorSearchService, vector_search_service
+        from app.utils.database import get_collection
+        started = time.perf_counter()
+        report: Dict[str, Any] = {"checksum_ok": snapshot.verify_payload(), "sources": {}}
+        primary = VectorSearchService()
+        try:
+            primary.init_collections()
+            consistent = report["checksum_ok"]
+            for source in SOURCES:
+                collection = getattr(primary, f"{source}_collection")
+                if collection is None:
+                    continue
+                expected = _content_hashes(collection)
+                restored = _content_hashes(get_collection(f"{source}_experts")) \
+                    if source in snapshot.sources else {}
+                changed = [id_ for id_, digest in expected.items() if id_ in restored and restored[id_] != digest]
+                missing = [id_ for id_ in expected if id_ not in restored]
+                extra = [id_ for id_ in restored if id_ not in expected]
+                report["sources"][source] = {"changed": len(changed), "missing": len(missing), "extra": len(extra)}
+                if changed or missing or extra:
+                    consistent = False
+                    similar_experts_index.mark_changed(source, changed)
+            if not consistent:
+                bm25_index.reset()  # rebuilt from the primary store on the next keyword search
+            vector_search_service.install_collections({
+                source: getattr(primary, f"{source}_collection") for source in SOURCES
+            }, backend=primary.backend)
+            report["consistent"] = consistent
+            self.status.update({"state": "primary", "consistency": report,
+                                "check_seconds": round(time.perf_counter() - started, 3)})
+            print(f"{'✅' if consistent else '⚠️'} Search snapshot check: {report}")
+        except Exception as e:
+            print(f"⚠️ Search snapshot consistency check failed, still serving the snapshot: {e}")
+            self.status.update({"state": "serving_snapshot", "consistency_error": str(e)})
+        return report
+
+# Global instance
+search_state_restorer = SearchStateRestorer()
@@ -0,0 +1,436 @@
+"""
+Precomputed k-nearest-neighbour table over all stored expert embeddings.
+
+A background thread keeps a top-K "similar experts" list per expert, so
+/api/matching/similar-experts answers with a dictionary lookup instead of a
+vector query. Similarities are computed as blocked matrix multiplies (a
+block of rows against a block of columns at a time, keeping a running top-K),
+so memory stays at O(block^2 + n*K) rather than O(n^2). After the first
+build only new or changed experts are recomputed: their own rows against
+everyone, and everyone else's rows against just them. The normalized vectors
+are kept in a memory-mapped file next to the table, so an incremental sync
+fetches embeddings for just the new and changed experts.
+
+Syncs build new arrays off to the side and swap them in under a short lock,
+so lookups and mark_changed() never wait for a rebuild.
+"""
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+SIMILAR_EXPERTS_ENABLED = os.getenv("SIMILAR_EXPERTS_ENABLED", "true").lower() == "true"
+SIMILAR_EXPERTS_K = int(os.getenv("SIMILAR_EXPERTS_K", "20"))
+SIMILAR_EXPERTS_PATH = os.getenv("SIMILAR_EXPERTS_PATH", "./similarity_graph/knn.npz")
+SIMILAR_EXPERTS_REFRESH_SECONDS = float(os.getenv("SIMILAR_EXPERTS_REFRESH_SECONDS", "300"))
+SIMILAR_EXPERTS_DEBOUNCE_SECONDS = float(os.getenv("SIMILAR_EXPERTS_DEBOUNCE_SECONDS", "2"))
+SIMILARITY_BLOCK_ROWS = 1024
+SIMILARITY_BLOCK_COLS = 16384
+REBUILD_DEAD_FRACTION = 0.2  # compact with a full rebuild past this share of removed experts
+
+Key = Tuple[str, str]  # (source, expert id)
+
+def blocked_top_k(
+    queries: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    column_mask: Optional[np.ndarray] = None,
+    self_columns: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k corpus columns by dot product for each query row, best first, as
+    (indices int32 [q, k], scores float32 [q, k]); missing slots are -1/-inf.
+    The corpus is streamed in column blocks, merging into a running top-k.
+    column_mask excludes columns; self_columns[i] excludes one column per row.
+    """
+    num_queries = len(queries)
+    best_idx = np.full((num_queries, k), -1, dtype=np.int32)
+    best = np.full((num_queries, k), -np.inf, dtype=np.float32)
+    rows = np.arange(num_queries)
+
+    for start in range(0, len(corpus), SIMILARITY_BLOCK_COLS):
+        block = corpus[start:start + SIMILARITY_BLOCK_COLS]
+        scores = queries @ block.T
+        if column_mask is not None:
+            scores[:, ~column_mask[start:start + len(block)]] = -np.inf
+        if self_columns is not None:
+            local = self_columns - start
+            inside = (local >= 0) & (local < len(block))
+            scores[rows[inside], local[inside]] = -np.inf
+
+        take = min(k, scores.shape[1])
+        part = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+        merged_scores = np.concatenate([best, np.take_along_axis(scores, part, axis=1)], axis=1)
+        merged_idx = np.concatenate([best_idx, (part + start).astype(np.int32)], axis=1)
+        top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best = np.take_along_axis(merged_scores, top, axis=1)
+        best_idx = np.take_along_axis(merged_idx, top, axis=1)
+
+    order = np.argsort(-best, axis=1, kind="stable")
+    best_idx = np.take_along_axis(best_idx, order, axis=1)
+    best = np.take_along_axis(best, order, axis=1)
+    best_idx[~np.isfinite(best)] = -1
+    return best_idx, best
+
+class SimilarExpertsIndex:
+    """
+    Top-K neighbour table keyed by (source, expert id), persisted to one .npz
+    file plus the experts' vectors in <name>.vectors.f32 (row i = key i).
+    """
+
+    def __init__(self, path: str = SIMILAR_EXPERTS_PATH, k: int = SIMILAR_EXPERTS_K):
+        self.path = path
+        self.vectors_path = os.path.splitext(path)[0] + ".vectors.f32"
+        self.k = k
+        self._lock = threading.RLock()  # published table state; held only briefly
+        self._sync_lock = threading.Lock()  # one sync (and the vectors file) at a time
+        self._changed_lock = threading.Lock()
+        self._keys: List[Key] = []
+        self._key_to_row: Dict[Key, int] = {}
+        self._id_to_row: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._neighbors = np.zeros((0, k), dtype=np.int32)
+        self._scores = np.zeros((0, k), dtype=np.float32)
+        self._vectors: Optional[np.ndarray] = None  # memmap aligned with _keys; only used by sync
+        self._changed: Set[Key] = set()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.built_at: Optional[float] = None
+        self.last_sync: Dict[str, float] = {}
+        self._load()
+
+    # -- persistence ---------------------------------------------------------
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            data = np.load(self.path)
+            if data["neighbors"].shape[1] != self.k:
+                print(f"⚠️ {self.path} was built with a different K, rebuilding")
+                return
+            keys = [tuple(key) for key in json.loads(str(data["keys"]))]
+            self._publish(keys, data["alive"].copy(), data["neighbors"].copy(), data["scores"].copy(),
+                          float(data["built_at"]))
+            if "dim" in data.files:
+                self._vectors = self._map_vectors(len(keys), int(data["dim"]))
+            print(f"✅ Loaded similar-experts table: {int(self._alive.sum())} experts, K={self.k}")
+        except Exception as e:
+            print(f"⚠️ Could not load similar-experts table: {e}")
+
+    def _map_vectors(self, rows: int, dim: int) -> Optional[np.ndarray]:
+        """The vectors file as a memmap, or None if it does not hold exactly rows x dim"""
+        try:
+            if not rows or not dim or os.path.getsize(self.vectors_path) != rows * dim * 4:
+                return None
+        except OSError:
+            return None
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(rows, dim))
+
+    def _write_vectors(self, rows: np.ndarray, vectors: np.ndarray, total_rows: int, rewrite: bool) -> np.ndarray:
+        """Write vectors at the given rows (growing the file to total_rows) and return the new map"""
+        dim = vectors.shape[1]
+        os.makedirs(os.path.dirname(self.vectors_path) or ".", exist_ok=True)
+        path = self.vectors_path + ".tmp" if rewrite else self.vectors_path
+        with open(path, "wb" if rewrite else "r+b") as f:
+            f.truncate(total_rows * dim * 4)
+        mapped = np.memmap(path, dtype=np.float32, mode="r+", shape=(total_rows, dim))
+        if len(rows):
+            mapped[rows] = vectors
+        mapped.flush()
+        if rewrite:
+            del mapped
+            os.replace(path, self.vectors_path)
+            mapped = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(total_rows, dim))
+        return mapped
+
+    def save(self):
+        with self._lock:
+            keys, alive, neighbors, scores = self._keys, self._alive, self._neighbors, self._scores
+            built_at = self.built_at
+        dim = self._vectors.shape[1] if self._vectors is not None else 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                keys=np.array(json.dumps(keys)),
+                alive=alive,
+                neighbors=neighbors,
+                scores=scores,
+                built_at=np.array(built_at or time.time()),
+                dim=np.array(dim),
+            )
+        os.replace(tmp_path, self.path)
+
+    def export_state(self) -> Dict[str, np.ndarray]:
+        """The table as flat arrays (for app/services/search_snapshot.py)"""
+        with self._lock:
+            return {
+                "keys": np.array(["\t".join(key) for key in self._keys], dtype=object),
+                "alive": self._alive.copy(),
+                "neighbors": self._neighbors.copy(),
+                "scores": self._scores.copy(),
+                "built_at": np.array([self.built_at or 0.0]),
+            }
+
+    def load_state(self, state: Dict[str, np.ndarray]):
+        if state["neighbors"].shape[1] != self.k:
+            print(f"⚠️ Snapshot similar-experts table has K={state['neighbors'].shape[1]}, not {self.k}; skipped")
+            return
+        with self._sync_lock:
+            self._publish(
+                [tuple(key.split("\t", 1)) for key in state["keys"]],
+                np.array(state["alive"], dtype=bool), np.array(state["neighbors"]), np.array(state["scores"]),
+                float(state["built_at"][0]) or None
+            )
+            # The vectors file is laid out for the local table; the next sync refetches them
+            self._vectors = None
+
+    def _publish(self, keys: List[Key], alive: np.ndarray, neighbors: np.ndarray, scores: np.ndarray,
+                 built_at: Optional[float]):
+        """Swap in a new table; the lookup maps are built before taking the lock"""
+        key_to_row = {key: row for row, key in enumerate(keys)}
+        id_to_row = {key[1]: row for row, key in enumerate(keys)}
+        with self._lock:
+            self._keys, self._key_to_row, self._id_to_row = keys, key_to_row, id_to_row
+            self._alive, self._neighbors, self._scores = alive, neighbors, scores
+            self.built_at = built_at
+
+    # -- lookups -------------------------------------------------------------
+
+    def get_similar(self, expert_id: str, limit: int = 5, source: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        """Up to `limit` (source, id, similarity) for an expert, most similar first: O(K)"""
+        with self._lock:
+            keys, alive, neighbors, scores = self._keys, self._alive, self._neighbors, self._scores
+            row = self._key_to_row.get((source, expert_id)) if source else self._id_to_row.get(expert_id)
+        if row is None or row >= len(neighbors) or not alive[row]:
+            return []
+        similar = []
+        for neighbor, score in zip(neighbors[row].tolist(), scores[row].tolist()):
+            if neighbor < 0 or not alive[neighbor]:
+                continue
+            similar.append(keys[neighbor] + (round(score, 6),))
+            if len(similar) == limit:
+                break
+        return similar
+
+    # -- building ------------------------------------------------------------
+
+    def mark_changed(self, source: str, ids: List[str]):
+        """Called after experts are written; the background job picks them up shortly"""
+        with self._changed_lock:
+            self._changed.update((source, id_) for id_ in ids)
+        self._wakeup.set()
+
+    def _compute_rows(self, rows: np.ndarray, vectors: np.ndarray, alive: np.ndarray,
+                      neighbors: np.ndarray, scores: np.ndarray):
+        for start in range(0, len(rows), SIMILARITY_BLOCK_ROWS):
+            block = rows[start:start + SIMILARITY_BLOCK_ROWS]
+            neighbors[block], scores[block] = blocked_top_k(
+                np.asarray(vectors[block]), vectors, self.k, column_mask=alive, self_columns=block
+            )
+
+    def _merge_new_columns(self, changed: np.ndarray, vectors: np.ndarray, alive: np.ndarray,
+                           neighbors: np.ndarray, scores: np.ndarray):
+        """Fold the changed experts into every other expert's existing top-K"""
+        is_changed = np.zeros(len(alive), dtype=bool)
+        is_changed[changed] = True
+        changed_vectors = np.asarray(vectors[changed])
+        others = np.flatnonzero(alive & ~is_changed)
+        for start in range(0, len(others), SIMILARITY_BLOCK_ROWS):
+            block = others[start:start + SIMILARITY_BLOCK_ROWS]
+            old_idx, old_scores = neighbors[block], scores[block].copy()
+            # Entries pointing at changed experts are stale; they come back via the new columns
+            stale = (old_idx >= 0) & is_changed[np.maximum(old_idx, 0)]
+            old_scores[stale] = -np.inf
+            new_local, new_scores = blocked_top_k(np.asarray(vectors[block]), changed_vectors, self.k)
+            new_idx = np.where(new_local >= 0, changed[np.maximum(new_local, 0)], -1).astype(np.int32)
+
+            merged_scores = np.concatenate([old_scores, new_scores], axis=1)
+            merged_idx = np.concatenate([old_idx, new_idx], axis=1)
+            top = np.argsort(-merged_scores, axis=1, kind="stable")[:, :self.k]
+            block_scores = np.take_along_axis(merged_scores, top, axis=1)
+            block_neighbors = np.take_along_axis(merged_idx, top, axis=1)
+            block_neighbors[~np.isfinite(block_scores)] = -1
+            scores[block], neighbors[block] = block_scores, block_neighbors
+
+    def sync(self, collections: Dict[str, object]) -> Dict[str, float]:
+        """Bring the table up to date with the collections; full rebuild on first run"""
+        started = time.perf_counter()
+        with self._sync_lock:
+            stats = self._sync(collections)
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        self.last_sync = stats
+        return stats
+
+    def _sync(self, collections: Dict[str, object]) -> Dict[str, float]:
+        current_keys = list_keys(collections)
+        with self._changed_lock:
+            changed_keys, self._changed = self._changed, set()
+        with self._lock:
+            keys, alive, built_at = self._keys, self._alive, self.built_at
+        dead_fraction = 1 - alive.mean() if len(alive) else 0.0
+        if built_at is None or not keys or dead_fraction > REBUILD_DEAD_FRACTION:
+            return self._full_build(collections)
+        stats = self._incremental_update(current_keys, changed_keys, collections)
+        if stats is None:
+            # Stored vectors no longer match the embedding model
+            return self._full_build(collections)
+        return stats
+
+    def _full_build(self, collections: Dict[str, object]) -> Dict[str, float]:
+        keys, vectors = fetch_embeddings(collections)
+        alive = np.ones(len(keys), dtype=bool)
+        neighbors = np.full((len(keys), self.k), -1, dtype=np.int32)
+        scores = np.full((len(keys), self.k), -np.inf, dtype=np.float32)
+        rows = np.arange(len(keys))
+        if len(keys):
+            vectors = self._write_vectors(rows, vectors, len(keys), rewrite=True)
+            self._compute_rows(rows, vectors, alive, neighbors, scores)
+        self._vectors = vectors
+        self._publish(keys, alive, neighbors, scores, time.time())
+        self.save()
+        return {"mode": "full", "experts": len(keys), "recomputed": len(keys), "removed": 0, "fetched": len(keys)}
+
+    def _incremental_update(self, current_keys: List[Key], changed_keys: Set[Key],
+                            collections: Dict[str, object]) -> Optional[Dict[str, float]]:
+        """
+        Recompute only new and changed experts, fetching just their embeddings
+        (every embedding once if the vectors file is missing, e.g. after a
+        snapshot restore). Works on copies and publishes them at the end.
+        """
+        with self._lock:
+            keys, key_to_row = self._keys, self._key_to_row
+            old_alive, neighbors, scores = self._alive, self._neighbors, self._scores
+        current = set(current_keys)
+        new_keys = [key for key in current_keys if key not in key_to_row]
+        if new_keys:
+            keys = keys + new_keys
+            key_to_row = {key: row for row, key in enumerate(keys)}
+        grow = len(new_keys)
+        was_alive = np.concatenate([old_alive, np.zeros(grow, dtype=bool)])
+        alive = np.array([key in current for key in keys], dtype=bool)
+        removed = int((was_alive & ~alive).sum())
+
+        reseed = self._vectors is None or len(self._vectors) != len(old_alive)
+        wanted = [key for key in keys if key in current and (not was_alive[key_to_row[key]] or key in changed_keys)]
+        fetched_keys, fetched = fetch_embeddings(collections, None if reseed else wanted)
+        if not reseed and len(fetched) and fetched.shape[1] != self._vectors.shape[1]:
+            return None
+        keep = [i for i, key in enumerate(fetched_keys) if key in key_to_row]
+        fetched_rows = np.array([key_to_row[fetched_keys[i]] for i in keep], dtype=np.int64)
+
+        # Experts whose embedding vanished before it could be fetched are left out
+        has_vector = np.ones(len(keys), dtype=bool) if not reseed else np.zeros(len(keys), dtype=bool)
+        if reseed:
+            has_vector[fetched_rows] = True
+        else:
+            fetched_set = set(fetched_keys)
+            has_vector[[key_to_row[key] for key in wanted if key not in fetched_set]] = False
+        alive &= has_vector
+        changed = np.array(sorted(key_to_row[key] for key in wanted if alive[key_to_row[key]]), dtype=np.int64)
+
+        if not len(changed) and not removed and not reseed:
+            return {"mode": "incremental", "experts": int(alive.sum()), "recomputed": 0, "removed": 0,
+                    "fetched": len(fetched_keys)}
+
+        if len(fetched) or grow:
+            dim = fetched.shape[1] if len(fetched) else self._vectors.shape[1]
+            self._vectors = self._write_vectors(
+                fetched_rows, fetched[keep] if len(fetched) else np.zeros((0, dim), dtype=np.float32),
+                len(keys), rewrite=reseed
+            )
+        neighbors = np.concatenate([neighbors, np.full((grow, self.k), -1, dtype=np.int32)])
+        scores = np.concatenate([scores, np.full((grow, self.k), -np.inf, dtype=np.float32)])
+        if len(changed):
+            self._compute_rows(changed, self._vectors, alive, neighbors, scores)
+            self._merge_new_columns(changed, self._vectors, alive, neighbors, scores)
+        self._publish(keys, alive, neighbors, scores, time.time())
+        self.save()
+        return {
+            "mode": "incremental",
+            "experts": int(alive.sum()),
+            "recomputed": int(len(changed)),
+            "removed": removed,
+            "fetched": len(fetched_keys),
+        }
+
+    # -- background job ------------------------------------------------------
+
+    def start_background_refresh(self, interval: float = SIMILAR_EXPERTS_REFRESH_SECONDS) -> threading.Thread:
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="similar-experts", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def _run(self, interval: float):
+        from app.services.vector_search import vector_search_service
+        from app.utils.database import get_collection
+        while True:
+            try:
+                vector_search_service.init_collections()
+                collections = {
+                    source: get_collection(f"{source}_experts") for source in ("linkedin", "scholar")
+                }
+                collections = {source: c for source, c in collections.items() if c is not None}
+                if collections:
+                    stats = self.sync(collections)
+                    if stats["recomputed"] or stats["removed"]:
+                        print(f"✅ Similar-experts table {stats['mode']} update: {stats}")
+            except Exception as e:
+                print(f"⚠️ Similar-experts refresh failed: {e}")
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            time.sleep(SIMILAR_EXPERTS_DEBOUNCE_SECONDS)  # let a burst of writes land first
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            experts, built_at = int(self._alive.sum()), self.built_at
+        return {
+            "experts": experts,
+            "k": self.k,
+            "built_at": built_at,
+            "pending_changes": len(self._changed),
+            "syncing": self._sync_lock.locked(),
+            "last_sync": self.last_sync,
+        }
+
+def list_keys(collections: Dict[str, object]) -> List[Key]:
+    """Every stored (source, id), without embeddings"""
+    return [
+        (source, id_) for source, collection in collections.items()
+        for id_ in collection.get(include=[])["ids"]
+    ]
+
+def fetch_embeddings(collections: Dict[str, object], keys: Optional[List[Key]] = None) -> Tuple[List[Key], np.ndarray]:
+    """Keys and unit-normalized stored embeddings: of the given keys, or of every expert"""
+    by_source: Dict[str, Optional[List[str]]] = {source: None for source in collections}
+    if keys is not None:
+        by_source = {source: [] for source in collections}
+        for source, id_ in keys:
+            if source in by_source:
+                by_source[source].append(id_)
+    fetched_keys, blocks = [], []
+    for source, ids in by_source.items():
+        if ids is not None and not ids:
+            continue
+        stored = collections[source].get(ids=ids, include=["embeddings"])
+        if not len(stored["ids"]):
+            continue
+        fetched_keys.extend((source, id_) for id_ in stored["ids"])
+        blocks.append(np.asarray(stored["embeddings"], dtype=np.float32))
+    if not blocks:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    vectors = np.concatenate(blocks)
+    vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    return fetched_keys, vectors
+
+# Global instance
+similar_experts_index = SimilarExpertsIndex()
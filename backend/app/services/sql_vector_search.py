@@ -0,0 +1,75 @@
+"""Nearest-expert queries served by the relational store (experts.embedding)"""
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import LargeBinary, select, text, type_coerce
+from sqlalchemy.orm import Session
+
+from app.models.db_models import ExpertDB
+from app.utils.vector_column import EMBEDDING_DIM, EXPERT_EMBEDDING_STORAGE, to_pgvector_literal
+
+SQL_SCAN_BATCH_ROWS = int(os.getenv("SQL_SCAN_BATCH_ROWS", "5000"))
+
+class SQLVectorSearch:
+    """
+    Cosine top-k over experts.embedding.
+
+    With pgvector the database ranks (ORDER BY embedding <=> query, using the
+    HNSW index from migration 003). With packed float32 bytea the rows are
+    streamed in batches, each batch's bytes joined and viewed as one matrix
+    with np.frombuffer, scored with a matmul and merged into a running top-k.
+    """
+
+    def __init__(self, storage: str = EXPERT_EMBEDDING_STORAGE, dim: int = EMBEDDING_DIM):
+        self.storage = storage
+        self.dim = dim
+
+    def query(self, db: Session, query_embedding, limit: int = 10) -> List[Tuple[float, str]]:
+        """(cosine distance, expert id) of the nearest experts, nearest first"""
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        if self.storage == "pgvector" and db.get_bind().dialect.name == "postgresql":
+            return self._query_pgvector(db, query, limit)
+        return self._query_scan(db, query, limit)
+
+    def _query_pgvector(self, db: Session, query: np.ndarray, limit: int) -> List[Tuple[float, str]]:
+        rows = db.execute(text(
+            "SELECT id, embedding <=> CAST(:query AS vector) AS distance FROM experts "
+            "WHERE embedding IS NOT NULL ORDER BY distance LIMIT :limit"
+        ), {"query": to_pgvector_literal(query), "limit": limit})
+        return [(float(distance), id_) for id_, distance in rows]
+
+    def _query_scan(self, db: Session, query: np.ndarray, limit: int) -> List[Tuple[float, str]]:
+        row_bytes = self.dim * 4
+        best_ids = np.zeros(0, dtype=object)
+        best_scores = np.zeros(0, dtype=np.float32)
+        # The raw bytes, not EmbeddingColumn's per-row arrays, so a batch is one buffer
+        result = db.execute(
+            select(ExpertDB.id, type_coerce(ExpertDB.embedding, LargeBinary))
+            .where(ExpertDB.embedding.isnot(None))
+            .execution_options(yield_per=SQL_SCAN_BATCH_ROWS)
+        )
+        for batch in result.partitions():
+            batch = [(id_, blob) for id_, blob in batch if len(blob) == row_bytes]
+            if not batch:
+                continue
+            matrix = np.frombuffer(b"".join(blob for _, blob in batch), dtype="<f4").reshape(-1, self.dim)
+            norms = np.linalg.norm(matrix, axis=1)
+            scores = (matrix @ query) / np.clip(norms, 1e-12, None)
+            best_ids = np.concatenate([best_ids, np.array([id_ for id_, _ in batch], dtype=object)])
+            best_scores = np.concatenate([best_scores, scores.astype(np.float32)])
+            if len(best_scores) > limit:
+                keep = np.argpartition(-best_scores, limit - 1)[:limit]
+                best_ids, best_scores = best_ids[keep], best_scores[keep]
+        order = np.argsort(-best_scores, kind="stable")
+        return [(float(1.0 - best_scores[i]), best_ids[i]) for i in order]
+
+    def save_embeddings(self, db: Session, embeddings: Dict[str, np.ndarray]):
+        """Write embeddings for existing expert rows (packed by EmbeddingColumn)"""
+        for expert in db.query(ExpertDB).filter(ExpertDB.id.in_(list(embeddings))):
+            expert.embedding = embeddings[expert.id]
+        db.commit()
+
+# Global instance
+sql_vector_search = SQLVectorSearch()
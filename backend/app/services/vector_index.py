@@ -0,0 +1,585 @@
+"""
+In-process vector indexes with a ChromaDB-compatible collection API.
+
+These classes answer the same add / upsert / get / delete / query / count
+calls ExpertService already makes on Chroma collections, so they can be
+dropped in behind VectorSearchService without touching callers. Distances are
+cosine distances (1 - cosine similarity).
+
+On-disk layout of one collection directory:
+    vectors.f32   append-only float32 rows (full precision, memory-mapped)
+    rows.jsonl    append-only log of upserts/deletes with ids, documents, metadata
+    quantizer.npz learned projection / int8 parameters (QuantizedVectorIndex)
+
+Only ids and byte offsets into rows.jsonl are kept in memory; documents and
+metadata are read back lazily for the rows a query actually returns. Every
+process (e.g. each uvicorn worker) maps the same files read-only, so the
+vectors live once in the OS page cache; writers append under a file lock and
+readers pick up new rows by replaying the tail of the log.
+"""
+import os
+import json
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.metadata_filter import (
+    FILTER_BRUTE_FORCE_FRACTION, FILTER_BRUTE_FORCE_ROWS, MetadataFilterIndex
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: safe for one writer process only
+    fcntl = None
+
+EMBEDDING_DIM = 384
+
+# chroma | numpy | hnsw; Chroma being unavailable also falls back to numpy
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "chroma").lower()
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "./vector_index")
+# Workers that only serve queries can map the index without write access
+VECTOR_INDEX_READ_ONLY = os.getenv("VECTOR_INDEX_READ_ONLY", "false").lower() == "true"
+
+# "" keeps full float32 in RAM; int8 | pca | pca_int8 store compact codes instead
+VECTOR_STORAGE_MODE = os.getenv("VECTOR_STORAGE_MODE", "").lower()
+VECTOR_PCA_DIMS = int(os.getenv("VECTOR_PCA_DIMS", "128"))
+VECTOR_QUANT_MIN_TRAIN = int(os.getenv("VECTOR_QUANT_MIN_TRAIN", "1000"))
+VECTOR_QUANT_SAMPLE_SIZE = int(os.getenv("VECTOR_QUANT_SAMPLE_SIZE", "20000"))
+VECTOR_RESCORE_FACTOR = int(os.getenv("VECTOR_RESCORE_FACTOR", "10"))
+
+QUANTIZATION_MODES = ("int8", "pca", "pca_int8")
+SCORE_BLOCK_ROWS = 65536  # rows scored per matmul block
+
+class VectorIndex:
+    """
+    The subset of the Chroma collection API the expert services rely on.
+
+    query() returns Chroma's shape: {"ids": [[...]], "distances": [[...]],
+    "metadatas": [[...]], "documents": [[...]]}, one inner list per query.
+    Indexes with supports_filters take parse_filters() output as `where`
+    (see app/services/metadata_filter.py) and apply it before the scan.
+    """
+
+    name: str
+    supports_filters = False
+
+    def add(self, ids: List[str], embeddings=None, metadatas=None, documents=None):
+        raise NotImplementedError
+
+    def upsert(self, ids: List[str], embeddings=None, metadatas=None, documents=None):
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]):
+        raise NotImplementedError
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def query(self, query_embeddings, n_results: int = 10, where=None,
+              include: Optional[List[str]] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+class NumpyVectorIndex(VectorIndex):
+    """Memory-mapped float32 matrix with exact top-k (one matmul + argpartition)"""
+
+    supports_filters = True
+
+    def __init__(self, path: str, name: Optional[str] = None, dim: int = EMBEDDING_DIM,
+                 read_only: bool = VECTOR_INDEX_READ_ONLY):
+        self.path = path
+        self.name = name or os.path.basename(os.path.normpath(path))
+        self.dim = dim
+        self.row_bytes = dim * 4
+        self.read_only = read_only
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.rows_path = os.path.join(path, "rows.jsonl")
+        self.lock_path = os.path.join(path, ".lock")
+        if not read_only:
+            os.makedirs(path, exist_ok=True)
+            open(self.vectors_path, "ab").close()
+            open(self.rows_path, "ab").close()
+
+        self._lock = threading.RLock()
+        self._id_to_row: Dict[str, int] = {}
+        self._row_ids: List[Optional[str]] = []
+        self._row_offsets = array("q")
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._log_offset = 0
+        self._filters: Optional[MetadataFilterIndex] = None  # built on the first filtered query
+        self.refresh()
+
+    # -- persistence ---------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize writers across threads and processes"""
+        with self._lock, open(self.lock_path, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Pick up rows appended since the last call, by this or another process"""
+        with self._lock:
+            try:
+                log_size = os.path.getsize(self.rows_path)
+            except OSError:
+                return
+            if log_size != self._log_offset:
+                self._replay_log()
+
+    def _replay_log(self):
+        rows = os.path.getsize(self.vectors_path) // self.row_bytes
+        previous_rows = len(self._vectors)
+        if rows > len(self._row_ids):
+            self._row_ids.extend([None] * (rows - len(self._row_ids)))
+            self._row_offsets.extend([-1] * (rows - len(self._row_offsets)))
+            self._alive = np.concatenate([self._alive, np.zeros(rows - len(self._alive), dtype=bool)])
+
+        removed = []
+        with open(self.rows_path, "rb") as f:
+            f.seek(self._log_offset)
+            offset = self._log_offset
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-append; pick it up next time
+                entry = json.loads(line)
+                if entry.get("op") == "delete":
+                    row = self._id_to_row.pop(entry["id"], None)
+                    if row is not None:
+                        self._alive[row] = False
+                        removed.append(row)
+                elif entry["row"] < rows:
+                    row = entry["row"]
+                    previous = self._id_to_row.get(entry["id"])
+                    if previous is not None:
+                        self._alive[previous] = False
+                        removed.append(previous)
+                    self._id_to_row[entry["id"]] = row
+                    self._row_ids[row] = entry["id"]
+                    self._row_offsets[row] = offset
+                    self._alive[row] = True
+                    if self._filters is not None:
+                        self._filters.add(row, entry.get("metadata"))
+                offset += len(line)
+            self._log_offset = offset
+
+        self._vectors = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            if rows else np.zeros((0, self.dim), dtype=np.float32)
+        )
+        if rows > previous_rows:
+            self._on_rows_mapped(previous_rows, rows)
+        if removed:
+            self._on_rows_removed(removed)
+
+    def _on_rows_mapped(self, start: int, stop: int):
+        """Hook for subclasses that keep derived per-row state"""
+
+    def _on_rows_removed(self, rows: List[int]):
+        """Hook for subclasses: rows deleted or superseded by an upsert"""
+
+    def _filter_index(self) -> MetadataFilterIndex:
+        """Index the metadata of every row logged so far, once; _replay_log keeps it current"""
+        with self._lock:
+            if self._filters is None:
+                filters = MetadataFilterIndex()
+                with open(self.rows_path, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        offset += len(line)
+                        if offset > self._log_offset:
+                            break  # later lines arrive through _replay_log
+                        entry = json.loads(line)
+                        if entry.get("op") != "delete":
+                            filters.add(entry["row"], entry.get("metadata"))
+                self._filters = filters
+            return self._filters
+
+    def _read_row_entries(self, rows: List[int]) -> List[Dict[str, Any]]:
+        """Log entries of the given rows, through one file handle, reading in file order"""
+        entries: List[Dict[str, Any]] = [{}] * len(rows)
+        if not rows:
+            return entries
+        with open(self.rows_path, "rb") as f:
+            for i in sorted(range(len(rows)), key=lambda i: self._row_offsets[rows[i]]):
+                f.seek(self._row_offsets[rows[i]])
+                entries[i] = json.loads(f.readline())
+        return entries
+
+    # -- writes --------------------------------------------------------------
+
+    @staticmethod
+    def _as_matrix(embeddings, dim: int) -> np.ndarray:
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1, dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.clip(norms, 1e-12, None)
+
+    def add(self, ids: List[str], embeddings=None, metadatas=None, documents=None):
+        self._write(ids, embeddings, metadatas, documents, overwrite=False)
+
+    def upsert(self, ids: List[str], embeddings=None, metadatas=None, documents=None):
+        self._write(ids, embeddings, metadatas, documents, overwrite=True)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError(f"Vector index {self.name} is opened read-only")
+
+    def _write(self, ids, embeddings, metadatas, documents, overwrite: bool):
+        self._check_writable()
+        if embeddings is None:
+            raise ValueError("embeddings are required")
+        matrix = self._as_matrix(embeddings, self.dim)
+        if len(matrix) != len(ids):
+            raise ValueError("ids and embeddings must have the same length")
+        metadatas = metadatas or [None] * len(ids)
+        documents = documents or [None] * len(ids)
+
+        with self._file_lock():
+            self.refresh()
+            if not overwrite:
+                existing = [id_ for id_ in ids if id_ in self._id_to_row]
+                if existing:
+                    raise ValueError(f"IDs already exist in {self.name}: {existing[:5]}")
+
+            # Vectors first, then the log lines that make them visible
+            with open(self.vectors_path, "ab") as f:
+                first_row = f.tell() // self.row_bytes
+                f.write(matrix.tobytes())
+            with open(self.rows_path, "ab") as f:
+                f.write(b"".join(
+                    (json.dumps({
+                        "op": "upsert", "id": id_, "row": first_row + i,
+                        "document": documents[i], "metadata": metadatas[i]
+                    }, default=str) + "\n").encode("utf-8")
+                    for i, id_ in enumerate(ids)
+                ))
+            self.refresh()
+
+    def delete(self, ids: List[str]):
+        self._check_writable()
+        with self._file_lock():
+            self.refresh()
+            with open(self.rows_path, "ab") as f:
+                f.write(b"".join(
+                    (json.dumps({"op": "delete", "id": id_}) + "\n").encode("utf-8")
+                    for id_ in ids if id_ in self._id_to_row
+                ))
+            self.refresh()
+
+    # -- reads ---------------------------------------------------------------
+
+    def count(self) -> int:
+        self.refresh()
+        return len(self._id_to_row)
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        self.refresh()
+        include = ["metadatas", "documents"] if include is None else include
+        rows = [self._id_to_row[id_] for id_ in (ids if ids is not None else list(self._id_to_row))
+                if id_ in self._id_to_row]
+        return self._format_rows(rows, include)
+
+    def _format_rows(self, rows: List[int], include: List[str]) -> Dict[str, Any]:
+        entries = self._read_row_entries(rows) if (
+            "metadatas" in include or "documents" in include) else [{}] * len(rows)
+        return {
+            "ids": [self._row_ids[row] for row in rows],
+            "metadatas": [entry.get("metadata") for entry in entries] if "metadatas" in include else None,
+            "documents": [entry.get("document") for entry in entries] if "documents" in include else None,
+            "embeddings": np.asarray(self._vectors[rows]) if "embeddings" in include else None,
+        }
+
+    def _top_k(self, scores: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+        """Rows of the k highest scores, best first"""
+        if len(rows) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[keep], scores[keep]
+        return rows[np.argsort(-scores, kind="stable")]
+
+    def _snapshot(self):
+        """
+        (vectors, alive) as of now. refresh() from another thread may swap in
+        a longer map mid-query, so a search slices only its own snapshot.
+        """
+        with self._lock:
+            vectors = self._vectors
+            return vectors, self._alive[:len(vectors)].copy()
+
+    def _search_many(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        """Exact search: one BLAS matmul per block of rows for all queries at once"""
+        vectors, alive = self._snapshot()
+        if mask is not None:
+            total = min(len(vectors), len(mask))
+            vectors, mask = vectors[:total], mask[:total]
+        else:
+            total, mask = len(vectors), alive
+        if not mask.any():
+            return [np.zeros(0, dtype=np.int64) for _ in queries]
+        scores = np.empty((total, len(queries)), dtype=np.float32)
+        for start in range(0, total, SCORE_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SCORE_BLOCK_ROWS])
+            scores[start:start + len(block)] = block @ queries.T
+        scores[~mask] = -np.inf
+
+        all_rows = np.arange(total)
+        k = min(k, int(mask.sum()))
+        return [self._top_k(scores[:, i], all_rows, k) for i in range(len(queries))]
+
+    def _search_rows(self, queries: np.ndarray, rows: np.ndarray, k: int) -> List[np.ndarray]:
+        """Exact search over just the given (sorted) rows"""
+        if not len(rows):
+            return [rows for _ in queries]
+        scores = np.asarray(self._vectors[rows]) @ queries.T
+        return [self._top_k(scores[:, i], rows, k) for i in range(len(queries))]
+
+    def _search_filtered(self, queries: np.ndarray, k: int, where: Dict[str, Any]) -> List[np.ndarray]:
+        """
+        Evaluate the filter first, then pick a plan: brute force over the
+        matching rows when they are few, otherwise the index's own search
+        restricted to them by mask.
+        """
+        vectors, alive = self._snapshot()
+        rows = self._filter_index().evaluate(where, alive)
+        live = int(alive.sum())
+        if len(rows) <= max(FILTER_BRUTE_FORCE_ROWS, FILTER_BRUTE_FORCE_FRACTION * live):
+            return self._search_rows(queries, rows, k)
+        mask = np.zeros(len(vectors), dtype=bool)
+        mask[rows] = True
+        return self._search_many(queries, k, mask)
+
+    def query(self, query_embeddings, n_results: int = 10, where=None,
+              include: Optional[List[str]] = None) -> Dict[str, Any]:
+        self.refresh()
+        include = include or ["metadatas", "documents", "distances"]
+        queries = self._as_matrix(query_embeddings, self.dim)
+        k = max(1, n_results)
+        found = self._search_filtered(queries, k, where) if where else self._search_many(queries, k)
+        result = {"ids": [], "distances": [], "metadatas": [], "documents": [], "embeddings": None}
+        for query, rows in zip(queries, found):
+            formatted = self._format_rows(list(rows), include)
+            result["ids"].append(formatted["ids"])
+            result["distances"].append((1.0 - self._vectors[rows] @ query).tolist())
+            result["metadatas"].append(formatted["metadatas"])
+            result["documents"].append(formatted["documents"])
+        return result
+
+    def memory_stats(self) -> Dict[str, Any]:
+        live = self.count()
+        return {
+            "backend": "numpy",
+            "vectors": live,
+            "bytes_per_vector": self.row_bytes,
+            "mapped_bytes": len(self._vectors) * self.row_bytes,
+        }
+
+class ScalarQuantizer:
+    """Per-dimension affine int8 quantization learned from a sample"""
+
+    def __init__(self, low: np.ndarray, scale: np.ndarray):
+        self.low = low.astype(np.float32)
+        self.scale = scale.astype(np.float32)
+
+    @classmethod
+    def fit(cls, sample: np.ndarray) -> "ScalarQuantizer":
+        # Clip the extreme 0.1% so a few outliers do not waste the 256 levels
+        low = np.percentile(sample, 0.1, axis=0)
+        high = np.percentile(sample, 99.9, axis=0)
+        return cls(low, np.maximum(high - low, 1e-6) / 255.0)
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        return (np.clip(np.rint((x - self.low) / self.scale), 0, 255) - 128).astype(np.int8)
+
+    def query_weights(self, q: np.ndarray) -> np.ndarray:
+        # decode(c) . q = c . (scale * q) + const(q), and the constant does not change ranking
+        return (self.scale * q).astype(np.float32)
+
+class PCAProjection:
+    """Linear projection onto the top principal components of a sample"""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)
+
+    @classmethod
+    def fit(cls, sample: np.ndarray, dims: int) -> "PCAProjection":
+        mean = sample.mean(axis=0)
+        _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+        return cls(mean, vt[:dims])
+
+    def project(self, x: np.ndarray) -> np.ndarray:
+        return (x - self.mean) @ self.components.T
+
+    def query_weights(self, q: np.ndarray) -> np.ndarray:
+        # (x - mean) . q ranks like x . q; project q without centering
+        return self.components @ q
+
+class QuantizedVectorIndex(NumpyVectorIndex):
+    """
+    Compact in-memory codes with full-precision rescoring.
+
+    Once VECTOR_QUANT_MIN_TRAIN rows exist, a PCA projection and/or int8
+    scalar quantizer is learned from a sample of stored vectors and every row
+    is kept in RAM only as its code (384 B for int8, VECTOR_PCA_DIMS * 4 B for
+    pca, VECTOR_PCA_DIMS B for pca_int8, vs. 1536 B for float32). Queries scan
+    the codes, then rescore the top n_results * VECTOR_RESCORE_FACTOR
+    candidates against the memory-mapped float32 rows, which stay on disk.
+    Until enough rows exist to train, search is exact.
+    """
+
+    def __init__(self, path: str, mode: str = "int8", name: Optional[str] = None,
+                 dim: int = EMBEDDING_DIM, pca_dims: int = VECTOR_PCA_DIMS,
+                 min_train: int = VECTOR_QUANT_MIN_TRAIN, rescore_factor: int = VECTOR_RESCORE_FACTOR,
+                 read_only: bool = VECTOR_INDEX_READ_ONLY):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        self.mode = mode
+        self.pca_dims = min(pca_dims, dim)
+        self.min_train = min_train
+        self.rescore_factor = max(1, rescore_factor)
+        self.projection: Optional[PCAProjection] = None
+        self.quantizer: Optional[ScalarQuantizer] = None
+        self._codes: Optional[np.ndarray] = None
+        self.quantizer_path = os.path.join(path, "quantizer.npz")
+        self._load_quantizer()
+        super().__init__(path, name=name, dim=dim, read_only=read_only)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._codes is not None
+
+    def _load_quantizer(self):
+        if not os.path.exists(self.quantizer_path):
+            return
+        params = np.load(self.quantizer_path)
+        if str(params["mode"]) != self.mode:
+            print(f"⚠️ {self.quantizer_path} holds {params['mode']} codes, retraining for {self.mode}")
+            return
+        if "pca_components" in params:
+            self.projection = PCAProjection(params["pca_mean"], params["pca_components"])
+        if "quant_low" in params:
+            self.quantizer = ScalarQuantizer(params["quant_low"], params["quant_scale"])
+
+    @property
+    def _has_params(self) -> bool:
+        return (self.projection is not None) == (self.mode in ("pca", "pca_int8")) and \
+               (self.quantizer is not None) == (self.mode in ("int8", "pca_int8"))
+
+    def _train(self):
+        live_rows = np.flatnonzero(self._alive[:len(self._vectors)])
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(live_rows, min(len(live_rows), VECTOR_QUANT_SAMPLE_SIZE), replace=False))
+        sample = np.asarray(self._vectors[sample_rows])
+
+        params = {"mode": np.array(self.mode)}
+        self.projection, self.quantizer = None, None
+        if self.mode in ("pca", "pca_int8"):
+            self.projection = PCAProjection.fit(sample, self.pca_dims)
+            sample = self.projection.project(sample)
+            params.update(pca_mean=self.projection.mean, pca_components=self.projection.components)
+        if self.mode in ("int8", "pca_int8"):
+            self.quantizer = ScalarQuantizer.fit(sample)
+            params.update(quant_low=self.quantizer.low, quant_scale=self.quantizer.scale)
+
+        if not self.read_only:
+            np.savez(self.quantizer_path, **params)
+        print(f"✅ {self.name}: trained {self.mode} codes on {len(sample_rows)} vectors")
+
+    def _on_rows_mapped(self, start: int, stop: int):
+        if self._codes is not None:
+            self._codes = np.concatenate([self._codes, self._encode_rows(start, stop)])
+            return
+        if not self._has_params:
+            if int(self._alive[:stop].sum()) < self.min_train:
+                return
+            self._train()
+        self._codes = self._encode_rows(0, stop)
+
+    def _encode(self, x: np.ndarray) -> np.ndarray:
+        if self.projection is not None:
+            x = self.projection.project(x).astype(np.float32)
+        if self.quantizer is not None:
+            x = self.quantizer.encode(x)
+        return x
+
+    def _encode_rows(self, start: int, stop: int) -> np.ndarray:
+        width = self.pca_dims if self.projection is not None else self.dim
+        dtype = np.int8 if self.quantizer is not None else np.float32
+        codes = np.empty((stop - start, width), dtype=dtype)
+        for block in range(start, stop, SCORE_BLOCK_ROWS):
+            end = min(block + SCORE_BLOCK_ROWS, stop)
+            codes[block - start:end - start] = self._encode(np.asarray(self._vectors[block:end]))
+        return codes
+
+    @property
+    def bytes_per_vector(self) -> int:
+        if self._codes is None:
+            return self.row_bytes
+        return self._codes.shape[1] * self._codes.itemsize
+
+    def _search_one(self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        # One snapshot of the codes, their parameters and the alive mask, which
+        # refresh() from another thread may replace mid-query
+        with self._lock:
+            codes, alive = self._codes, self._alive[:len(self._codes)].copy()
+            projection, quantizer = self.projection, self.quantizer
+        weights = query
+        if projection is not None:
+            weights = projection.query_weights(weights)
+        if quantizer is not None:
+            weights = quantizer.query_weights(weights)
+
+        # Approximate scores over the compact codes, a block at a time
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ weights
+        rows = np.flatnonzero((alive if mask is None else mask[:len(scores)]))
+        if not len(rows):
+            return rows
+        candidates = self._top_k(scores[rows], rows, k * self.rescore_factor)
+
+        # Exact rescoring from the full-precision rows on disk
+        candidates = np.sort(candidates)
+        return self._top_k(self._vectors[candidates] @ query, candidates, k)
+
+    def _search_many(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        if self._codes is None:
+            return super()._search_many(queries, k, mask)
+        return [self._search_one(query, k, mask) for query in queries]
+
+    def memory_stats(self) -> Dict[str, Any]:
+        live = self.count()
+        return {
+            "backend": "quantized",
+            "mode": self.mode,
+            "trained": self.is_trained,
+            "vectors": live,
+            "bytes_per_vector": self.bytes_per_vector,
+            "code_bytes": int(self._codes.nbytes) if self._codes is not None else 0,
+            "float32_bytes": live * self.row_bytes,
+        }
+
+def open_index(name: str, backend: str = VECTOR_INDEX_BACKEND, storage_mode: str = VECTOR_STORAGE_MODE,
+               index_dir: str = VECTOR_INDEX_DIR) -> VectorIndex:
+    """Open (or create) the built-in index for one collection"""
+    path = os.path.join(index_dir, name)
+    if storage_mode in QUANTIZATION_MODES:
+        return QuantizedVectorIndex(path, mode=storage_mode, name=name)
+    if backend == "hnsw":
+        from app.services.hnsw_index import HNSWVectorIndex
+        return HNSWVectorIndex(path, name=name)
+    if backend in ("numpy", "chroma"):
+        return NumpyVectorIndex(path, name=name)
+    raise ValueError(f"Unknown vector index backend: {backend}")
@@ -1,5 +1,8 @@
-"""Vector search service using ChromaDB"""
+"""Vector search service using ChromaDB or the built-in vector index"""
 import os
+from app.services.vector_index import (
+    QUANTIZATION_MODES, VECTOR_INDEX_BACKEND, VECTOR_STORAGE_MODE, open_index
+)
 
 try:
     import chromadb
@@ -7,23 +10,28 @@ try:
     CHROMADB_AVAILABLE = True
 except ImportError:
     CHROMADB_AVAILABLE = False
-    print("⚠️ ChromaDB not available - vector search will be disabled")
+    print("⚠️ ChromaDB not available - using the built-in vector index")
 
 class VectorSearchService:
     def __init__(self):
         self.client = None
         self.linkedin_collection = None
         self.scholar_collection = None
+        self.backend = None
         self._initialized = False
     
     def init_collections(self):
-        """Initialize ChromaDB collections"""
+        """Initialize ChromaDB collections, or the built-in index when configured or Chroma is missing"""
         if self._initialized:
             return
         
+        if VECTOR_INDEX_BACKEND != "chroma" or VECTOR_STORAGE_MODE in QUANTIZATION_MODES:
+            self._init_local_collections()
+            return
+        
         if not CHROMADB_AVAILABLE:
-            print("⚠️ ChromaDB not available - skipping vector search initialization")
-            self._initialized = True
+            print("⚠️ ChromaDB not available - falling back to the built-in vector index")
+            self._init_local_collections()
             return
         
         try:
@@ -38,27 +46,59 @@ class VectorSearchService:
                 self.linkedin_collection = self.client.get_collection("linkedin_experts")
                 print("✅ linkedin_experts collection already exists")
             except:
-                self.linkedin_collection = self.client.create_collection("linkedin_experts")
+                self.linkedin_collection = self.client.create_collection(
+                    "linkedin_experts", metadata={"hnsw:space": "cosine"}
+                )
                 print("✅ Created linkedin_experts collection")
             
             try:
                 self.scholar_collection = self.client.get_collection("scholar_experts")
                 print("✅ scholar_experts collection already exists")
             except:
-                self.scholar_collection = self.client.create_collection("scholar_experts")
+                self.scholar_collection = self.client.create_collection(
+                    "scholar_experts", metadata={"hnsw:space": "cosine"}
+                )
                 print("✅ Created scholar_experts collection")
             
+            self.backend = "chroma"
             self._initialized = True
             print("✅ ChromaDB vector search initialized successfully")
             
         except Exception as e:
             print(f"⚠️ Warning: Could not initialize ChromaDB: {e}")
-            # Continue without vector search in testing mode
-            if os.getenv("TESTING") == "true" or os.getenv("RAILWAY_ENVIRONMENT_NAME"):
-                print("🔧 Continuing without vector search (deployment mode)")
-                self._initialized = True
-            else:
+            print("🔧 Falling back to the built-in vector index")
+            self._init_local_collections()
+    
+    def _init_local_collections(self):
+        """Open the in-process memory-mapped indexes (see app/services/vector_index.py)"""
+        try:
+            self.linkedin_collection = open_index("linkedin_experts")
+            self.scholar_collection = open_index("scholar_experts")
+            self.backend = type(self.linkedin_collection).__name__
+            print(f"✅ {self.backend} vector search initialized: "
+                  f"{self.linkedin_collection.count()} linkedin, {self.scholar_collection.count()} scholar")
+        except Exception as e:
+            print(f"⚠️ Warning: Could not open the built-in vector index: {e}")
+            if not (os.getenv("TESTING") == "true" or os.getenv("RAILWAY_ENVIRONMENT_NAME")):
                 raise
+            print("🔧 Continuing without vector search (deployment mode)")
+        self._initialized = True
+    
+    def install_collections(self, collections, backend: str):
+        """Serve from already-open collections (e.g. a restored snapshot) instead of opening the store"""
+        self.linkedin_collection = collections.get("linkedin")
+        self.scholar_collection = collections.get("scholar")
+        self.backend = backend
+        self._initialized = True
+    
+    def save(self):
+        """Persist in-memory index state (HNSW graphs) so the next start loads instead of rebuilding"""
+        for collection in (self.linkedin_collection, self.scholar_collection):
+            if hasattr(collection, "save") and not getattr(collection, "read_only", True):
+                try:
+                    collection.save()
+                except Exception as e:
+                    print(f"⚠️ Failed to save vector index {collection.name}: {e}")
 
 # Global instance
 vector_search_service = VectorSearchService()
@@ -1,9 +1,20 @@
 import redis
 import json
 import os
-from typing import Optional, Dict, Any
+import time
+import asyncio
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 
+# Short socket timeouts: a slow or missing Redis must not stall a search
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+# After a Redis error, use the in-process cache for this long before retrying
+REDIS_RETRY_SECONDS = float(os.getenv("REDIS_RETRY_SECONDS", "30"))
+LOCAL_CACHE_ENTRIES = int(os.getenv("LOCAL_CACHE_ENTRIES", "1000"))
+
 class DateTimeEncoder(json.JSONEncoder):
     """Custom JSON encoder to handle datetime objects"""
     def default(self, obj):
@@ -13,26 +24,116 @@ class DateTimeEncoder(json.JSONEncoder):
 
 redis_client = redis.from_url(
     os.getenv("REDIS_URL", "redis://redis:6379"),
-    decode_responses=True
+    decode_responses=True,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_TIMEOUT
 )
 
+# Fallback while Redis is unreachable: key -> (expires_at, payload)
+_local_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_local_lock = threading.Lock()
+_redis_down_until = 0.0
+
+def _redis_available() -> bool:
+    return time.monotonic() >= _redis_down_until
+
+def _redis_failed(e: Exception):
+    global _redis_down_until
+    if _redis_available():
+        print(f"Cache error: {e}; using the in-process cache for {REDIS_RETRY_SECONDS:.0f}s")
+    _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+def _local_set(key: str, payload: str, ttl: int):
+    with _local_lock:
+        _local_cache[key] = (time.monotonic() + ttl, payload)
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > LOCAL_CACHE_ENTRIES:
+            _local_cache.popitem(last=False)
+
+def _local_get(key: str) -> Optional[str]:
+    with _local_lock:
+        entry = _local_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _local_cache[key]
+            return None
+        return entry[1]
+
+# The redis client is synchronous: the async helpers below run its calls on a
+# worker thread so a slow Redis (up to REDIS_SOCKET_TIMEOUT) never blocks the event loop
+
 async def cache_result(key: str, data: Dict[Any, Any], ttl: int = 3600):
     """Cache search results"""
     try:
-        redis_client.setex(
-            key,
-            ttl,
-            json.dumps(data, cls=DateTimeEncoder)
-        )
+        payload = json.dumps(data, cls=DateTimeEncoder)
     except Exception as e:
         print(f"Cache error: {e}")
+        return
+    if _redis_available():
+        try:
+            await asyncio.to_thread(redis_client.setex, key, ttl, payload)
+            return
+        except Exception as e:
+            _redis_failed(e)
+    _local_set(key, payload, ttl)
 
 async def get_cached_result(key: str) -> Optional[Dict]:
     """Get cached result"""
+    data = None
+    if _redis_available():
+        try:
+            data = await asyncio.to_thread(redis_client.get, key)
+        except Exception as e:
+            _redis_failed(e)
+            data = _local_get(key)
+    else:
+        data = _local_get(key)
     try:
-        data = redis_client.get(key)
         if data:
             return json.loads(data)
     except Exception as e:
         print(f"Cache retrieval error: {e}")
-    return None
\ No newline at end of file
+    return None
+
+# Deletes the lock only if it still holds our token (it may have expired and been retaken)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+async def try_acquire_lock(name: str, ttl_seconds: float) -> Tuple[bool, Optional[str]]:
+    """
+    (acquired, token) for a Redis lock that expires after ttl_seconds.
+    While Redis is unavailable every caller acquires (with no token).
+    """
+    if not _redis_available():
+        return True, None
+    token = uuid.uuid4().hex
+    try:
+        if await asyncio.to_thread(redis_client.set, name, token, nx=True, px=int(ttl_seconds * 1000)):
+            return True, token
+        return False, None
+    except Exception as e:
+        _redis_failed(e)
+        return True, None
+
+async def release_lock(name: str, token: Optional[str]):
+    if token is None or not _redis_available():
+        return
+    try:
+        await asyncio.to_thread(redis_client.eval, _RELEASE_LOCK_SCRIPT, 1, name, token)
+    except Exception as e:
+        _redis_failed(e)
+
+async def is_locked(name: str) -> bool:
+    """Whether someone holds the lock; False when Redis is unavailable"""
+    if not _redis_available():
+        return False
+    try:
+        return bool(await asyncio.to_thread(redis_client.exists, name))
+    except Exception as e:
+        _redis_failed(e)
+        return False
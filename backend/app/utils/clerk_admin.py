@@ -1,7 +1,9 @@
-import httpx
 import os
+from datetime import datetime
 from typing import Optional, Dict, Any
 
+from app.utils.http_client import outbound_http
+
 CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY")
 CLERK_API_URL = "https://api.clerk.com/v1"
 
@@ -23,14 +25,13 @@ async def update_user_metadata(user_id: str, public_metadata: Dict[str, Any], pr
     if private_metadata:
         data["private_metadata"] = private_metadata
     
-    async with httpx.AsyncClient() as client:
-        response = await client.patch(
-            f"{CLERK_API_URL}/users/{user_id}",
-            headers=headers,
-            json=data
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await outbound_http.patch(
+        f"{CLERK_API_URL}/users/{user_id}",
+        headers=headers,
+        json=data
+    )
+    response.raise_for_status()
+    return response.json()
 
 async def grant_user_access(user_id: str):
     """
@@ -65,22 +66,21 @@ async def get_waitlist_users(limit: int = 100, offset: int = 0):
         "Authorization": f"Bearer {CLERK_SECRET_KEY}",
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{CLERK_API_URL}/users",
-            headers=headers,
-            params={
-                "limit": limit,
-                "offset": offset
-            }
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        # Filter for waitlist users
-        waitlist_users = [
-            user for user in data
-            if user.get("public_metadata", {}).get("waitlistStatus") == "pending"
-        ]
-        
-        return waitlist_users
\ No newline at end of file
+    response = await outbound_http.get(
+        f"{CLERK_API_URL}/users",
+        headers=headers,
+        params={
+            "limit": limit,
+            "offset": offset
+        }
+    )
+    response.raise_for_status()
+    data = response.json()
+    
+    # Filter for waitlist users
+    waitlist_users = [
+        user for user in data
+        if user.get("public_metadata", {}).get("waitlistStatus") == "pending"
+    ]
+    
+    return waitlist_users
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""Async micro-batching of embedding requests inside the API process"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
+
+from app.utils.singleflight import SingleFlight
+
+# How long the first request of a batch may wait for company, and the batch cap
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "3"))
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+EMBEDDING_BATCH_WORKERS = int(os.getenv("EMBEDDING_BATCH_WORKERS", "1"))
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embed() calls into generate_embeddings_array() batches.
+
+    Requests queue up on the event loop; a single worker task waits at most
+    max_wait_ms after the oldest request (or until max_batch_size requests
+    are queued) and runs the batch on a worker thread, so the event loop is
+    never blocked by the model. Up to `workers` batches run at once; while
+    they are all busy, new requests keep filling the next batch.
+    """
+
+    def __init__(
+        self,
+        generator=None,
+        max_wait_ms: float = EMBEDDING_BATCH_MAX_WAIT_MS,
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        workers: int = EMBEDDING_BATCH_WORKERS
+    ):
+        self._generator = generator
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="embedding-batcher"
+        )
+
+        # (text, future, enqueued_at) tuples, bound to the loop the worker runs on
+        self._pending = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running = set()  # batches in flight, referenced until done
+        self._loop = None
+        self._flights = SingleFlight("embedding")
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=1000)
+        self._wait_ms = deque(maxlen=1000)
+        self._compute_ms = deque(maxlen=1000)
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from app.utils.embeddings import embedding_generator
+            self._generator = embedding_generator
+        return self._generator
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._pending = deque()
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.workers)
+            self._running = set()
+            self._worker = loop.create_task(self._run())
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one text as a float32 [384] array, sharing a model call with concurrent requests"""
+        # Identical texts already queued or running share that request's (read-only) row
+        return await self._flights.do(text, lambda: self._embed(text))
+
+    async def _embed(self, text: str) -> np.ndarray:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+        with self._stats_lock:
+            self._requests += 1
+            self._max_queue_depth = max(self._max_queue_depth, len(self._pending))
+        self._wakeup.set()
+        return await future
+
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        return np.stack(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            # Wait for a free worker first; requests arriving meanwhile join this batch
+            await self._slots.acquire()
+
+            # Hold the batch open until it is full or the oldest request's wait expires
+            deadline = loop.time() + max(
+                0.0, self.max_wait - (time.perf_counter() - self._pending[0][2])
+            )
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [
+                self._pending.popleft()
+                for _ in range(min(self.max_batch_size, len(self._pending)))
+            ]
+            task = loop.create_task(self._process(batch, loop))
+            self._running.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        self._slots.release()
+
+    async def _process(self, batch: list, loop):
+        started = time.perf_counter()
+        texts = [text for text, _, _ in batch]
+        try:
+            embeddings = await loop.run_in_executor(
+                self._executor, self.generator.generate_embeddings_array, texts
+            )
+            error = None
+        except Exception as e:
+            print(f"⚠️ Embedding batch of {len(texts)} failed: {e}")
+            embeddings, error = None, e
+        finished = time.perf_counter()
+
+        for i, (_, future, _) in enumerate(batch):
+            if future.done():  # caller went away
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(embeddings[i])  # row view of the batch array
+
+        with self._stats_lock:
+            self._batches += 1
+            self._errors += 1 if error is not None else 0
+            self._batch_sizes.append(len(batch))
+            self._compute_ms.append((finished - started) * 1000)
+            self._wait_ms.extend((started - enqueued) * 1000 for _, _, enqueued in batch)
+
+    def get_stats(self) -> dict:
+        """Queue depth, batch size and wait time over the most recent batches"""
+        with self._stats_lock:
+            batch_sizes = list(self._batch_sizes)
+            wait_ms = sorted(self._wait_ms)
+            compute_ms = sorted(self._compute_ms)
+            stats = {
+                "requests": self._requests,
+                "batches": self._batches,
+                "errors": self._errors,
+                "queue_depth": len(self._pending),
+                "batches_running": len(self._running),
+                "max_queue_depth": self._max_queue_depth,
+            }
+
+        def summary(values: list) -> dict:
+            if not values:
+                return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+            return {
+                "mean": round(sum(values) / len(values), 3),
+                "p50": round(values[len(values) // 2], 3),
+                "p95": round(values[min(int(0.95 * len(values)), len(values) - 1)], 3),
+                "max": round(values[-1], 3),
+            }
+
+        stats.update({
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch_size": self.max_batch_size,
+            "workers": self.workers,
+            "batch_size": {
+                "mean": round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else 0.0,
+                "max": max(batch_sizes) if batch_sizes else 0,
+            },
+            "wait_ms": summary(wait_ms),
+            "compute_ms": summary(compute_ms),
+        })
+        return stats
+
+# Global instance
+embedding_batcher = EmbeddingBatcher()
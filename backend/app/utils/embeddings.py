@@ -1,98 +1,829 @@
 import os
+import re
 import hashlib
 import json
-from typing import List, Union
+import platform
+import threading
+import time
+import importlib.util
+from contextlib import contextmanager
+from collections import deque, OrderedDict
+from typing import List, Union, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Try to import sentence_transformers, fallback to simple embeddings
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
+# Detect sentence_transformers without importing it - importing pulls in torch,
+# which we only want to pay for when the torch backend is actually selected
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if SENTENCE_TRANSFORMERS_AVAILABLE:
     print("✅ SentenceTransformers available")
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+else:
     print("⚠️ SentenceTransformers not available, using fallback embeddings")
 
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: the cache still works, but only for one process
+    fcntl = None
+
+# The fast WordPiece tokenizer is shared by the ONNX and OpenVINO backends
+try:
+    from tokenizers import BertWordPieceTokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = TOKENIZERS_AVAILABLE
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    import openvino as ov
+    OPENVINO_AVAILABLE = TOKENIZERS_AVAILABLE
+except ImportError:
+    OPENVINO_AVAILABLE = False
+
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
 MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "./models")
+MODEL_DIR = os.path.join(MODEL_CACHE_DIR, f"sentence-transformers_{EMBEDDING_MODEL}")
+
+# auto | onnx | openvino | torch | simple - "auto" prefers ONNX, then torch, then the fallback
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "auto").lower()
+
+# Force a specific file from MODEL_DIR/onnx instead of detecting it from the CPU
+ONNX_MODEL_VARIANT = os.getenv("ONNX_MODEL_VARIANT", "")
+ONNX_NUM_THREADS = int(os.getenv("ONNX_NUM_THREADS", "0"))  # 0 = let ORT decide
+ONNX_MAX_SEQ_LENGTH = 256  # same as SentenceTransformer's max_seq_length for this model
+
+# OpenVINO IR under MODEL_DIR/openvino; the int8 IR is used when it is present
+OPENVINO_MODEL_VARIANT = os.getenv("OPENVINO_MODEL_VARIANT", "")
+OPENVINO_DEVICE = os.getenv("OPENVINO_DEVICE", "CPU")
+OPENVINO_NUM_REQUESTS = int(os.getenv("OPENVINO_NUM_REQUESTS", "0"))  # 0 = device optimal
+
+# Persistent embedding cache shared by every process on the host; by default in the
+# user's cache directory rather than wherever the process happens to be started
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "expert-finder", "embeddings"
+))
+EMBEDDING_CACHE_HOT_ENTRIES = int(os.getenv("EMBEDDING_CACHE_HOT_ENTRIES", "100000"))
+
+# Expected agreement with the SentenceTransformer (torch) outputs, as the minimum
+# cosine similarity between the two vectors for the same text. The fp32 graphs
+# are numerically identical up to float rounding; the int8 graphs trade a little
+# accuracy for speed.
+ONNX_PARITY_TOLERANCE = {
+    "fp32": 0.9999,
+    "int8": 0.98,
+}
+
+def _detect_cpu_flags() -> set:
+    """Read the CPU feature flags of the host (Linux only, empty elsewhere)"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+def _is_model_file(path: str) -> bool:
+    """Check a model file exists and is not an un-fetched git-lfs pointer"""
+    try:
+        if os.path.getsize(path) < 1024:
+            with open(path, "rb") as f:
+                return not f.read(64).startswith(b"version https://git-lfs")
+        return True
+    except OSError:
+        return False
+
+def select_onnx_variant(onnx_dir: str) -> Optional[str]:
+    """Pick the fastest ONNX export in onnx_dir that this CPU can run"""
+    if ONNX_MODEL_VARIANT:
+        path = os.path.join(onnx_dir, ONNX_MODEL_VARIANT)
+        return path if _is_model_file(path) else None
+
+    candidates = []
+    machine = platform.machine().lower()
+    if machine in ("arm64", "aarch64"):
+        candidates.append("model_qint8_arm64.onnx")
+    else:
+        flags = _detect_cpu_flags()
+        if "avx512_vnni" in flags or "avx512vnni" in flags:
+            candidates.append("model_qint8_avx512_vnni.onnx")
+        if "avx512f" in flags and "avx512bw" in flags:
+            candidates.append("model_qint8_avx512.onnx")
+        if "avx2" in flags:
+            candidates.append("model_quint8_avx2.onnx")
+
+    # fp32 graphs run everywhere; O4 is fp16 and only pays off on GPU
+    candidates.extend(["model_O2.onnx", "model_O1.onnx", "model.onnx"])
+
+    for name in candidates:
+        path = os.path.join(onnx_dir, name)
+        if _is_model_file(path):
+            return path
+    return None
+
+def _load_wordpiece_tokenizer(model_dir: str) -> "BertWordPieceTokenizer":
+    """MiniLM uses the uncased BERT WordPiece vocabulary"""
+    vocab_path = os.path.join(model_dir, "vocab.txt")
+    if not os.path.exists(vocab_path):
+        raise FileNotFoundError(f"Tokenizer vocabulary not found: {vocab_path}")
+    tokenizer = BertWordPieceTokenizer(vocab_path, lowercase=True)
+    tokenizer.enable_truncation(max_length=ONNX_MAX_SEQ_LENGTH)
+    tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+    return tokenizer
+
+def _tokenize_batch(tokenizer, texts: List[str], input_names: set) -> dict:
+    """Tokenize texts into the int64 feed dict the exported graphs expect"""
+    encodings = tokenizer.encode_batch(texts)
+    feeds = {
+        "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+        "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+    }
+    return {name: value for name, value in feeds.items() if name in input_names}
+
+def _mean_pool_normalize(token_embeddings: "np.ndarray", attention_mask: "np.ndarray") -> "np.ndarray":
+    """Mean pooling over real (non-padding) tokens, then SentenceTransformer's Normalize()"""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled = summed / counts
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+class OnnxEmbeddingEngine:
+    """all-MiniLM-L6-v2 on ONNX Runtime (CPU), with tokenization and pooling done here"""
+
+    def __init__(self, model_dir: str = MODEL_DIR, model_path: Optional[str] = None):
+        model_path = model_path or select_onnx_variant(os.path.join(model_dir, "onnx"))
+        if not model_path:
+            raise FileNotFoundError(f"No usable ONNX model found in {model_dir}/onnx")
+
+        self.model_path = model_path
+        self.variant = os.path.basename(model_path)
+        self.precision = "int8" if "int8" in self.variant else "fp32"
+        self.tolerance = ONNX_PARITY_TOLERANCE[self.precision]
+
+        self.tokenizer = _load_wordpiece_tokenizer(model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_NUM_THREADS > 0:
+            options.intra_op_num_threads = ONNX_NUM_THREADS
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: List[str]) -> "np.ndarray":
+        """Encode texts into L2-normalized float32 vectors of shape [n, 384]"""
+        if not texts:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+        feeds = _tokenize_batch(self.tokenizer, texts, self.input_names)
+        token_embeddings = self.session.run(None, feeds)[0]
+        return _mean_pool_normalize(token_embeddings, feeds["attention_mask"])
+
+class OpenVINOEmbeddingEngine:
+    """all-MiniLM-L6-v2 compiled once with OpenVINO, served from an async infer-request pool"""
+
+    def __init__(self, model_dir: str = MODEL_DIR, model_path: Optional[str] = None):
+        openvino_dir = os.path.join(model_dir, "openvino")
+        if not model_path:
+            candidates = [OPENVINO_MODEL_VARIANT] if OPENVINO_MODEL_VARIANT else [
+                "openvino_model_qint8_quantized.xml", "openvino_model.xml"
+            ]
+            for name in candidates:
+                path = os.path.join(openvino_dir, name)
+                # The weights live next to the .xml and are what git-lfs may not have fetched
+                if _is_model_file(path) and _is_model_file(path[:-4] + ".bin"):
+                    model_path = path
+                    break
+        if not model_path:
+            raise FileNotFoundError(f"No usable OpenVINO IR found in {openvino_dir}")
+
+        self.model_path = model_path
+        self.variant = os.path.basename(model_path)
+        self.precision = "int8" if "int8" in self.variant else "fp32"
+        self.tolerance = ONNX_PARITY_TOLERANCE[self.precision]
+        self.tokenizer = _load_wordpiece_tokenizer(model_dir)
+
+        core = ov.Core()
+        self.compiled_model = core.compile_model(
+            core.read_model(model_path),
+            OPENVINO_DEVICE,
+            {"PERFORMANCE_HINT": "THROUGHPUT"}
+        )
+        self.input_names = {i.get_any_name() for i in self.compiled_model.inputs}
+
+        # One pool of infer requests shared by every caller thread
+        self.infer_queue = ov.AsyncInferQueue(self.compiled_model, OPENVINO_NUM_REQUESTS)
+        self.infer_queue.set_callback(self._on_complete)
+        self._submit_lock = threading.Lock()
+
+    @staticmethod
+    def _on_complete(request, userdata):
+        result, done = userdata
+        # The request is recycled for the next caller, so copy its output out
+        result["output"] = request.get_output_tensor(0).data.copy()
+        done.set()
+
+    def encode(self, texts: List[str]) -> "np.ndarray":
+        """Encode texts into L2-normalized float32 vectors of shape [n, 384]"""
+        if not texts:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+        feeds = _tokenize_batch(self.tokenizer, texts, self.input_names)
+        result, done = {}, threading.Event()
+        # start_async blocks until a request is idle; inference itself runs in parallel
+        with self._submit_lock:
+            self.infer_queue.start_async(feeds, (result, done))
+        done.wait()
+        return _mean_pool_normalize(result["output"], feeds["attention_mask"])
+
+class EmbeddingCache:
+    """
+    Content-addressed, append-only embedding cache backed by memory-mapped files.
+
+    vectors.f32 holds float32 rows and is only ever appended to. index.bin is an
+    open-addressing hash table (key -> row) that lives in a shared mapping, so
+    every process on the host sees new entries as soon as they are written, and
+    a hit is a read-only view into the page cache rather than a copy. Keys are
+    blake2b(model id + normalized text), so switching model or ONNX variant
+    never returns stale vectors. A bounded LRU of recently used keys sits in
+    front of the on-disk table.
+    """
+
+    INDEX_MAGIC = b"EMBIDX01"
+    HEADER_DTYPE = [("magic", "S8"), ("dim", "<u4"), ("pad", "<u4"), ("capacity", "<u8"), ("count", "<u8")]
+    HEADER_BYTES = 32
+    SLOT_DTYPE = [("k0", "<u8"), ("k1", "<u8"), ("row", "<i8")]  # row is stored +1; 0 = empty
+    MAX_LOAD = 0.7
+
+    def __init__(
+        self,
+        model_id: str,
+        cache_dir: str = EMBEDDING_CACHE_DIR,
+        dim: int = EMBEDDING_DIM,
+        hot_entries: int = EMBEDDING_CACHE_HOT_ENTRIES,
+        initial_capacity: int = 1 << 16
+    ):
+        self.model_id = model_id
+        self.dim = dim
+        self.row_bytes = dim * 4
+        self.hot_entries = hot_entries
+        os.makedirs(cache_dir, exist_ok=True)
+        self.vectors_path = os.path.join(cache_dir, f"vectors_{dim}.f32")
+        self.index_path = os.path.join(cache_dir, f"index_{dim}.bin")
+        self.lock_path = os.path.join(cache_dir, f"cache_{dim}.lock")
+
+        self._lock = threading.RLock()
+        self._hot = OrderedDict()
+        self._vectors = None
+        self._slots = None
+        self._header = None
+        self._index_inode = None
+
+        self.hits = 0
+        self.hot_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        with self._file_lock():
+            if not os.path.exists(self.index_path):
+                self._write_empty_index(self.index_path, initial_capacity)
+            open(self.vectors_path, "ab").close()
+        self._map_index()
+        self._map_vectors()
+
+    # -- files ---------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize writers across threads and processes"""
+        with self._lock, open(self.lock_path, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _write_empty_index(self, path: str, capacity: int):
+        header = np.zeros(1, dtype=self.HEADER_DTYPE)
+        header["magic"], header["dim"], header["capacity"] = self.INDEX_MAGIC, self.dim, capacity
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header.tobytes())
+            f.truncate(self.HEADER_BYTES + capacity * np.dtype(self.SLOT_DTYPE).itemsize)
+        os.replace(tmp_path, path)
+
+    def _map_index(self):
+        mapped = np.memmap(self.index_path, dtype=np.uint8, mode="r+")
+        self._header = mapped[:self.HEADER_BYTES].view(self.HEADER_DTYPE)
+        if self._header["magic"][0] != self.INDEX_MAGIC or int(self._header["dim"][0]) != self.dim:
+            raise ValueError(f"{self.index_path} is not an embedding index for dim={self.dim}")
+        self._slots = mapped[self.HEADER_BYTES:].view(self.SLOT_DTYPE)
+        self._index_inode = os.stat(self.index_path).st_ino
+
+    def _map_vectors(self):
+        rows = os.path.getsize(self.vectors_path) // self.row_bytes
+        self._vectors = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            if rows else np.zeros((0, self.dim), dtype=np.float32)
+        )
+
+    def _refresh_if_rebuilt(self):
+        """Another process may have grown the index into a new file"""
+        try:
+            if os.stat(self.index_path).st_ino != self._index_inode:
+                self._map_index()
+        except OSError:
+            pass
+
+    # -- hashing -------------------------------------------------------------
+
+    def key_for(self, text: str) -> bytes:
+        normalized = " ".join((text or "").split())
+        return hashlib.blake2b(
+            f"{self.model_id}\x00{normalized}".encode("utf-8"), digest_size=16
+        ).digest()
+
+    def _probe(self, key: bytes) -> tuple:
+        """Return (slot position, row or None) for key in the mapped table"""
+        k0 = int.from_bytes(key[:8], "little")
+        k1 = int.from_bytes(key[8:], "little")
+        mask = len(self._slots) - 1
+        pos = k0 & mask
+        while True:
+            slot = self._slots[pos]
+            row = int(slot["row"])
+            if row == 0:
+                return pos, None
+            if int(slot["k0"]) == k0 and int(slot["k1"]) == k1:
+                return pos, row - 1
+            pos = (pos + 1) & mask
+
+    # -- lookups -------------------------------------------------------------
+
+    def _row_vector(self, row: int) -> "np.ndarray":
+        if row >= len(self._vectors):
+            self._map_vectors()
+        return self._vectors[row]
+
+    def get(self, text: str) -> Optional["np.ndarray"]:
+        """Read-only float32 view of the cached vector, or None"""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[Optional["np.ndarray"]]:
+        results = []
+        with self._lock:
+            for text in texts:
+                key = self.key_for(text)
+                row = self._hot.get(key)
+                if row is not None:
+                    self._hot.move_to_end(key)
+                    self.hot_hits += 1
+                else:
+                    row = self._probe(key)[1]
+                    if row is None:
+                        self._refresh_if_rebuilt()
+                        row = self._probe(key)[1]
+                    if row is not None:
+                        self._remember(key, row)
+                if row is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    results.append(self._row_vector(row))
+        return results
+
+    def _remember(self, key: bytes, row: int):
+        self._hot[key] = row
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_entries:
+            self._hot.popitem(last=False)
+
+    # -- writes --------------------------------------------------------------
+
+    def put_many(self, texts: List[str], vectors) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._file_lock():
+            self._refresh_if_rebuilt()
+            new_keys, new_rows = [], []
+            seen = set()
+            for text, vector in zip(texts, vectors):
+                key = self.key_for(text)
+                if key in seen or self._probe(key)[1] is not None:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+            if not new_keys:
+                return
+
+            # Vectors first, so a visible index slot always points at written data
+            with open(self.vectors_path, "ab") as f:
+                first_row = f.tell() // self.row_bytes
+                f.write(np.stack(new_rows).tobytes())
+                f.flush()
+
+            if int(self._header["count"][0]) + len(new_keys) > self.MAX_LOAD * len(self._slots):
+                self._grow(int(self._header["count"][0]) + len(new_keys))
+
+            for offset, key in enumerate(new_keys):
+                pos, _ = self._probe(key)
+                self._slots[pos]["k0"] = int.from_bytes(key[:8], "little")
+                self._slots[pos]["k1"] = int.from_bytes(key[8:], "little")
+                self._slots[pos]["row"] = first_row + offset + 1
+                self._remember(key, first_row + offset)
+            self._header["count"] += len(new_keys)
+            self.writes += len(new_keys)
+
+    def _grow(self, needed: int):
+        """Rehash into a larger table file and atomically swap it in"""
+        capacity = len(self._slots)
+        while needed > self.MAX_LOAD * capacity:
+            capacity *= 2
+        tmp_path = self.index_path + ".grow"
+        self._write_empty_index(tmp_path, capacity)
+        mapped = np.memmap(tmp_path, dtype=np.uint8, mode="r+")
+        new_slots = mapped[self.HEADER_BYTES:].view(self.SLOT_DTYPE)
+
+        occupied = self._slots[self._slots["row"] != 0]
+        mask = capacity - 1
+        for slot in occupied:
+            pos = int(slot["k0"]) & mask
+            while new_slots[pos]["row"] != 0:
+                pos = (pos + 1) & mask
+            new_slots[pos] = slot
+        mapped[:self.HEADER_BYTES].view(self.HEADER_DTYPE)["count"] = len(occupied)
+        mapped.flush()
+        del new_slots, mapped
+        os.replace(tmp_path, self.index_path)
+        self._map_index()
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "model_id": self.model_id,
+            "entries": int(self._header["count"][0]),
+            "hot_entries": len(self._hot),
+            "hot_capacity": self.hot_entries,
+            "hits": self.hits,
+            "hot_hits": self.hot_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "vectors_bytes": os.path.getsize(self.vectors_path),
+        }
+
+_WORD_RE = re.compile(r"\w+")
+
+def _splitmix64(x: "np.ndarray") -> "np.ndarray":
+    """Vectorized 64-bit finalizer; spreads structured hashes over all bits"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+class HashedNgramEmbeddingGenerator:
+    """
+    Fallback embedder: signed feature hashing of word and character n-grams.
+
+    The whole batch is joined into one byte buffer and every n-gram hash is
+    computed with NumPy from rolling polynomial prefix hashes, so there is no
+    per-character Python loop. Hashes are deterministic across processes
+    (unlike hash()), which keeps vectors stable in the shared embedding cache.
+    """
+
+    variant = "hashed-ngram-v1"
+    CHAR_NGRAMS = (3, 4)
+    WORD_WEIGHT = 1.0
+    BIGRAM_WEIGHT = 0.5
+    CHAR_WEIGHT = 0.25
+
+    _PRIME = 0x100000001B3  # FNV-1 64-bit prime (odd, so invertible mod 2**64)
+    _PRIME_INVERSE = pow(_PRIME, -1, 1 << 64)
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        print("🔧 Using hashed n-gram embeddings (fallback)")
+
+    def _features(self, buf: "np.ndarray", doc: "np.ndarray"):
+        """Yield (doc ids, hashes, weight) for each feature family in the batch"""
+        length = len(buf)
+        with np.errstate(over="ignore"):
+            powers = np.empty(length + 1, dtype=np.uint64)
+            powers[0] = 1
+            powers[1:] = self._PRIME
+            powers = np.cumprod(powers)
+            inverse = np.empty(length + 1, dtype=np.uint64)
+            inverse[0] = 1
+            inverse[1:] = self._PRIME_INVERSE
+            inverse = np.cumprod(inverse)
+            prefix = np.zeros(length + 1, dtype=np.uint64)
+            np.cumsum(buf.astype(np.uint64) * powers[:-1], out=prefix[1:])
+
+            def segment_hash(starts, ends, salt):
+                h = (prefix[ends] - prefix[starts]) * inverse[starts]
+                return _splitmix64(h + (ends - starts).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + np.uint64(salt))
+
+            # Words are the space-separated runs of the normalized buffer
+            is_word = (buf != 32) & (buf != 10)
+            edges = np.diff(np.concatenate(([False], is_word, [False])).astype(np.int8))
+            starts = np.flatnonzero(edges == 1)
+            ends = np.flatnonzero(edges == -1)
+            word_docs = doc[starts]
+            word_hashes = segment_hash(starts, ends, 1)
+            yield word_docs, word_hashes, self.WORD_WEIGHT
+
+            same_doc = word_docs[1:] == word_docs[:-1]
+            bigrams = _splitmix64(word_hashes[:-1][same_doc] * np.uint64(31) + word_hashes[1:][same_doc] + np.uint64(2))
+            yield word_docs[:-1][same_doc], bigrams, self.BIGRAM_WEIGHT
+
+            # Character n-grams include the surrounding spaces as word boundaries
+            for n in self.CHAR_NGRAMS:
+                if length < n:
+                    continue
+                starts = np.arange(length - n + 1)
+                valid = doc[starts] == doc[starts + n - 1]
+                valid &= buf[starts] != 10
+                starts = starts[valid]
+                yield doc[starts], segment_hash(starts, starts + n, 16 + n), self.CHAR_WEIGHT
+
+    def encode(self, texts: List[str]) -> "np.ndarray":
+        """Encode texts into L2-normalized float32 vectors of shape [n, dim]"""
+        count = len(texts)
+        if count == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        # " tok tok \n tok \n ..." - one buffer, newline-separated documents
+        joined = "\n".join(
+            " " + " ".join(_WORD_RE.findall((text or "").lower())) + " " for text in texts
+        )
+        buf = np.frombuffer(joined.encode("utf-8"), dtype=np.uint8)
+        doc = np.cumsum(buf == 10)
+
+        indices, values = [], []
+        for docs, hashes, weight in self._features(buf, doc):
+            buckets = (hashes % np.uint64(self.dim)).astype(np.int64)
+            signs = np.where((hashes >> np.uint64(63)) == 1, -weight, weight)
+            indices.append(docs * self.dim + buckets)
+            values.append(signs)
+
+        vectors = np.bincount(
+            np.concatenate(indices),
+            weights=np.concatenate(values),
+            minlength=count * self.dim
+        ).reshape(count, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.clip(norms, 1e-12, None)).astype(np.float32)
 
-class SimpleEmbeddingGenerator:
-    """Fallback embedding generator using simple text features"""
-    
-    def __init__(self):
-        print("🔧 Using simple text-based embeddings (fallback)")
-    
-    def _text_to_vector(self, text: str, dim: int = 384) -> List[float]:
-        """Convert text to a simple feature vector"""
-        if not text:
-            return [0.0] * dim
-            
-        # Normalize text
-        text = text.lower().strip()
-        
-        # Simple features
-        features = []
-        
-        # Length features
-        features.append(len(text) / 1000.0)  # Text length
-        features.append(len(text.split()) / 100.0)  # Word count
-        
-        # Character frequency features (first 26 for a-z)
-        char_counts = [0] * 26
-        for char in text:
-            if 'a' <= char <= 'z':
-                char_counts[ord(char) - ord('a')] += 1
-        
-        # Normalize character counts
-        total_chars = sum(char_counts) or 1
-        char_freqs = [count / total_chars for count in char_counts]
-        features.extend(char_freqs)
-        
-        # Hash-based features for remaining dimensions
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        for i in range(dim - len(features)):
-            hash_val = int(text_hash[i % len(text_hash)], 16) / 15.0
-            features.append(hash_val)
-        
-        return features[:dim]
-    
     def generate_embedding(self, text: str) -> List[float]:
-        return self._text_to_vector(text)
-    
+        return self.encode([text])[0].tolist()
+
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        return [self._text_to_vector(text) for text in texts]
+        return self.encode(texts).tolist()
 
 class EmbeddingGenerator:
-    def __init__(self):
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
+    def __init__(self, backend: str = EMBEDDING_BACKEND):
+        self.backend = "simple"
+        self.use_transformers = False
+
+        # Per-call latency of generate_embedding(s), for comparing backends on one box
+        self._latency_lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=1000)
+        self._calls = 0
+        self._texts = 0
+
+        if backend == "openvino" and self._load_openvino():
+            pass
+        elif backend in ("auto", "onnx", "openvino") and self._load_onnx():
+            pass
+        elif backend in ("auto", "onnx", "openvino", "torch") and self._load_sentence_transformer():
+            pass
+        else:
+            self.model = HashedNgramEmbeddingGenerator()
+
+        self.cache = self._open_cache()
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the exact vectors this generator produces"""
+        variant = getattr(self.model, "variant", "")
+        return f"{EMBEDDING_MODEL}:{self.backend}:{variant}"
+
+    def _open_cache(self) -> Optional[EmbeddingCache]:
+        if not EMBEDDING_CACHE_ENABLED:
+            return None
+        try:
+            cache = EmbeddingCache(self.model_id)
+            print(f"✅ Embedding cache opened: {EMBEDDING_CACHE_DIR} ({cache.get_stats()['entries']} vectors)")
+            return cache
+        except Exception as e:
+            print(f"⚠️ Embedding cache disabled: {e}")
+            return None
+
+    def _load_onnx(self) -> bool:
+        if not ONNXRUNTIME_AVAILABLE:
+            print("⚠️ onnxruntime/tokenizers not available, skipping ONNX backend")
+            return False
+        try:
+            self.model = OnnxEmbeddingEngine()
+            self.backend = "onnx"
+            print(f"✅ ONNX Runtime embeddings loaded: {self.model.variant}")
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to load ONNX embeddings: {e}")
+            return False
+
+    def _load_openvino(self) -> bool:
+        if not OPENVINO_AVAILABLE:
+            print("⚠️ openvino/tokenizers not available, skipping OpenVINO backend")
+            return False
+        try:
+            self.model = OpenVINOEmbeddingEngine()
+            self.backend = "openvino"
+            print(f"✅ OpenVINO embeddings compiled: {self.model.variant} on {OPENVINO_DEVICE}")
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to load OpenVINO embeddings: {e}")
+            return False
+
+    def _load_sentence_transformer(self) -> bool:
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            return False
+        try:
+            from sentence_transformers import SentenceTransformer
+            os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+            self.model = SentenceTransformer(
+                EMBEDDING_MODEL,
+                cache_folder=MODEL_CACHE_DIR
+            )
+            self.use_transformers = True
+            self.backend = "torch"
+            print(f"✅ SentenceTransformer loaded: {EMBEDDING_MODEL}")
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to load SentenceTransformer: {e}")
+            return False
+
+    def _record_latency(self, started: float, num_texts: int):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._latency_lock:
+            self._latencies_ms.append(elapsed_ms)
+            self._calls += 1
+            self._texts += num_texts
+
+    def get_stats(self) -> dict:
+        """Latency summary over the most recent calls"""
+        with self._latency_lock:
+            latencies = sorted(self._latencies_ms)
+            calls, texts = self._calls, self._texts
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(int(p * len(latencies)), len(latencies) - 1)], 3)
+
+        return {
+            "backend": self.backend,
+            "variant": getattr(self.model, "variant", EMBEDDING_MODEL if self.use_transformers else None),
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "calls": calls,
+            "texts": texts,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1], 3) if latencies else 0.0,
+                "window": len(latencies),
+            },
+        }
+
+    def _encode(self, texts: List[str]) -> "np.ndarray":
+        # Every backend's encode() returns an [n, 384] array for a list of texts
+        return np.ascontiguousarray(self.model.encode(texts), dtype=np.float32)
+
+    def _encode_cached(self, texts: List[str]) -> "np.ndarray":
+        """Serve what the cache has and only run the model on the misses"""
+        cached = self.cache.get_many(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if not missing and len(texts) == 1:
+            # Read-only view straight into the memory-mapped cache file, no copy
+            return cached[0][None, :]
+
+        embeddings = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                embeddings[i] = vector
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self._encode(missing_texts)
             try:
-                os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
-                self.model = SentenceTransformer(
-                    EMBEDDING_MODEL,
-                    cache_folder=MODEL_CACHE_DIR
-                )
-                self.use_transformers = True
-                print(f"✅ SentenceTransformer loaded: {EMBEDDING_MODEL}")
+                self.cache.put_many(missing_texts, computed)
             except Exception as e:
-                print(f"⚠️ Failed to load SentenceTransformer: {e}")
-                self.model = SimpleEmbeddingGenerator()
-                self.use_transformers = False
+                print(f"⚠️ Failed to write embedding cache: {e}")
+            embeddings[missing] = computed
+        return embeddings
+
+    def generate_embeddings_array(self, texts: List[str]) -> "np.ndarray":
+        """Contiguous float32 array of shape [n, 384]; may be a read-only view"""
+        started = time.perf_counter()
+        if self.cache is not None:
+            embeddings = self._encode_cached(texts)
         else:
-            self.model = SimpleEmbeddingGenerator()
-            self.use_transformers = False
-    
+            embeddings = self._encode(texts)
+        self._record_latency(started, len(texts))
+        return embeddings
+
+    def generate_embedding_array(self, text: str) -> "np.ndarray":
+        """float32 array of shape [384]; may be a read-only view"""
+        return self.generate_embeddings_array([text])[0]
+
     def generate_embedding(self, text: str) -> List[float]:
-        if self.use_transformers:
-            return self.model.encode(text).tolist()
-        else:
-            return self.model.generate_embedding(text)
-    
+        return self.generate_embedding_array(text).tolist()
+
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        if self.use_transformers:
-            return self.model.encode(texts).tolist()
-        else:
-            return self.model.generate_embeddings(texts)
+        return self.generate_embeddings_array(texts).tolist()
+
+class LazyEmbeddingGenerator:
+    """
+    Stand-in for EmbeddingGenerator that defers loading the model until first use.
+
+    Importing this module stays cheap (tests, tooling, every uvicorn worker
+    spawn); the model is built on the first attribute access, or ahead of time
+    by warm_up_in_background() from the app's startup hook.
+    """
+
+    def __init__(self, backend: str = EMBEDDING_BACKEND):
+        self._backend = backend
+        self._generator: Optional[EmbeddingGenerator] = None
+        self._lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self.load_seconds: Optional[float] = None
+        self.load_error: Optional[str] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._generator is not None
+
+    def load(self) -> EmbeddingGenerator:
+        """Build the generator once; concurrent callers wait for the same load"""
+        if self._generator is None:
+            with self._lock:
+                if self._generator is None:
+                    started = time.perf_counter()
+                    generator = EmbeddingGenerator(self._backend)
+                    # One tiny forward pass so kernels/graphs are initialized before traffic
+                    generator._encode(["warm up"])
+                    self.load_seconds = round(time.perf_counter() - started, 3)
+                    self._generator = generator
+        return self._generator
+
+    def warm_up_in_background(self) -> Optional[threading.Thread]:
+        """Load the model on a daemon thread so startup does not wait for it"""
+        if self.is_loaded or self._warmup_thread is not None:
+            return self._warmup_thread
+        self._warmup_thread = threading.Thread(
+            target=self._warm_up, name="embedding-warmup", daemon=True
+        )
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def _warm_up(self):
+        try:
+            generator = self.load()
+            print(f"✅ Embedding model warmed up ({generator.backend}) in {self.load_seconds}s")
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"⚠️ Embedding warm-up failed: {e}")
+
+    def get_stats(self) -> dict:
+        if not self.is_loaded:
+            return {"loaded": False, "load_error": self.load_error}
+        stats = self._generator.get_stats()
+        stats.update({"loaded": True, "load_seconds": self.load_seconds})
+        return stats
+
+    def __getattr__(self, name):
+        # Only reached for attributes not defined on the handle itself
+        return getattr(self.load(), name)
 
-embedding_generator = EmbeddingGenerator()
+embedding_generator = LazyEmbeddingGenerator()
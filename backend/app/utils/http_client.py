@@ -0,0 +1,156 @@
+"""
+Application-scoped outbound HTTP client.
+
+One httpx.AsyncClient is shared by every outbound call (Google CSE, the
+GitHub API, Clerk) instead of a fresh client per request. The client keeps
+connections alive in a pool keyed by origin (scheme, host, port), so each
+API host gets its own reusable connections and TCP + TLS setup is paid once
+per connection instead of once per call. HTTP/2 is used when the h2 package
+is installed. main.py opens the client at startup and closes it at shutdown.
+"""
+import os
+import time
+import asyncio
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401 (enables httpx's HTTP/2 support)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true" and HTTP2_AVAILABLE
+
+class OutboundHTTPClient:
+    """
+    Shared pooled AsyncClient with per-host request metrics.
+
+    The client belongs to the event loop that created it; a call from a
+    different loop (a script using asyncio.run, a test) gets a client of its
+    own, and the old one is dropped, so connections never cross loops.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._clients_created = 0
+
+    def _create_client(self) -> httpx.AsyncClient:
+        self._clients_created += 1
+        return httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_POOL_TIMEOUT
+            ),
+            follow_redirects=True,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = self._create_client()
+            self._loop = loop
+        return self._client
+
+    async def start(self):
+        """Open the pool (called at app startup)"""
+        self.client
+        print(f"🌐 Outbound HTTP pool ready (HTTP/2: {HTTP2_ENABLED}, max connections: {HTTP_MAX_CONNECTIONS})")
+
+    async def close(self):
+        """Close every pooled connection (called at app shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    def _host_stats(self, url: str) -> Dict[str, float]:
+        host = urlsplit(str(url)).hostname or "unknown"
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = {"requests": 0, "in_flight": 0, "errors": 0, "total_seconds": 0.0}
+        return stats
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request through the shared pool; the body is read before returning"""
+        stats = self._host_stats(url)
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        start = time.perf_counter()
+        try:
+            return await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+            stats["total_seconds"] += time.perf_counter() - start
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    def _pool_connections(self) -> Dict[str, Dict[str, int]]:
+        """Open connections per origin, read from httpcore's pool (best effort)"""
+        pools: Dict[str, Dict[str, int]] = {}
+        try:
+            connections = self._client._transport._pool.connections
+        except AttributeError:
+            return pools
+        for connection in connections:
+            origin = getattr(connection, "_origin", None)
+            host = origin.host.decode() if origin is not None else "unknown"
+            pool = pools.setdefault(host, {"connections": 0, "idle": 0, "active": 0})
+            pool["connections"] += 1
+            if connection.is_idle():
+                pool["idle"] += 1
+            elif not connection.is_closed():
+                pool["active"] += 1
+        return pools
+
+    def get_stats(self) -> Dict[str, Any]:
+        pools = self._pool_connections() if self._client is not None and not self._client.is_closed else {}
+        open_connections = sum(pool["connections"] for pool in pools.values())
+        hosts = {}
+        for host, stats in self._hosts.items():
+            hosts[host] = {
+                "requests": int(stats["requests"]),
+                "in_flight": int(stats["in_flight"]),
+                "errors": int(stats["errors"]),
+                "avg_ms": round(1000 * stats["total_seconds"] / stats["requests"], 1) if stats["requests"] else 0.0,
+                **pools.get(host, {"connections": 0, "idle": 0, "active": 0}),
+            }
+        return {
+            "http2": HTTP2_ENABLED,
+            "open": self._client is not None and not self._client.is_closed,
+            "clients_created": self._clients_created,
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "open_connections": open_connections,
+            "pool_utilization": round(open_connections / HTTP_MAX_CONNECTIONS, 3) if HTTP_MAX_CONNECTIONS else 0.0,
+            "hosts": hosts,
+        }
+
+# Global instance
+outbound_http = OutboundHTTPClient()
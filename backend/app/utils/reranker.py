@@ -0,0 +1,175 @@
+"""Cross-encoder reranking of vector search candidates on ONNX Runtime (CPU)"""
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional
+import numpy as np
+
+from app.utils.embeddings import (
+    MODEL_CACHE_DIR, ONNX_NUM_THREADS, ONNXRUNTIME_AVAILABLE,
+    _is_model_file, _load_wordpiece_tokenizer, _tokenize_batch, select_onnx_variant
+)
+
+if ONNXRUNTIME_AVAILABLE:
+    import onnxruntime as ort
+
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL_DIR = os.getenv(
+    "RERANK_MODEL_DIR", os.path.join(MODEL_CACHE_DIR, "cross-encoder_ms-marco-MiniLM-L-6-v2")
+)
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "30"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))
+
+class CrossEncoderReranker:
+    """
+    Scores (query, expert text) pairs with a small cross-encoder in one batched
+    forward pass.
+
+    rerank() never blocks past its time budget: the model runs on a worker
+    thread, and if it has not finished in time the ONNX run is terminated and
+    None is returned so the caller keeps its existing order. The model is
+    loaded by warm_up_in_background() at startup; until it is ready rerank()
+    falls back immediately rather than loading inside a request.
+    """
+
+    def __init__(self, model_dir: str = RERANK_MODEL_DIR, enabled: bool = RERANK_ENABLED,
+                 top_n: int = RERANK_TOP_N, budget_ms: float = RERANK_BUDGET_MS):
+        self.model_dir = model_dir
+        self.enabled = enabled
+        self.top_n = max(1, top_n)
+        self.budget_ms = budget_ms
+        self.session = None
+        self.tokenizer = None
+        self.variant = None
+        self.load_error: Optional[str] = None
+        self._load_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+
+        self._stats_lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=1000)
+        self._requests = 0
+        self._reranked = 0
+        self._fallbacks = {"timeout": 0, "error": 0, "unavailable": 0, "loading": 0}
+
+    def _load(self) -> bool:
+        with self._load_lock:
+            if self.session is not None:
+                return True
+            if self.load_error is not None:
+                return False
+            try:
+                if not ONNXRUNTIME_AVAILABLE:
+                    raise RuntimeError("onnxruntime/tokenizers not available")
+                model_path = select_onnx_variant(os.path.join(self.model_dir, "onnx"))
+                if model_path is None:
+                    model_path = os.path.join(self.model_dir, "model.onnx")
+                    if not _is_model_file(model_path):
+                        raise FileNotFoundError(f"No usable ONNX cross-encoder in {self.model_dir}")
+
+                options = ort.SessionOptions()
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                if ONNX_NUM_THREADS > 0:
+                    options.intra_op_num_threads = ONNX_NUM_THREADS
+                self.tokenizer = _load_wordpiece_tokenizer(self.model_dir)
+                self.session = ort.InferenceSession(
+                    model_path, sess_options=options, providers=["CPUExecutionProvider"]
+                )
+                self.input_names = {i.name for i in self.session.get_inputs()}
+                self.variant = os.path.basename(model_path)
+                print(f"✅ Cross-encoder reranker loaded: {RERANK_MODEL} ({self.variant})")
+                return True
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"⚠️ Cross-encoder reranking disabled: {e}")
+                return False
+
+    def warm_up_in_background(self) -> Optional[threading.Thread]:
+        """Load the model on a daemon thread so neither startup nor a search waits for it"""
+        with self._load_lock:
+            if self.session is not None or self.load_error is not None or self._warmup_thread is not None:
+                return self._warmup_thread
+            self._warmup_thread = threading.Thread(target=self._load, name="reranker-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def score(self, query: str, documents: List[str], run_options=None) -> np.ndarray:
+        """Relevance logits for each (query, document) pair, as float32 [n]"""
+        if not documents:
+            return np.zeros(0, dtype=np.float32)
+        feeds = _tokenize_batch(self.tokenizer, [(query, doc) for doc in documents], self.input_names)
+        logits = self.session.run(None, feeds, run_options)[0]
+        return np.asarray(logits, dtype=np.float32).reshape(len(documents), -1)[:, 0]
+
+    def _record(self, started: float, outcome: str):
+        with self._stats_lock:
+            self._requests += 1
+            if outcome == "reranked":
+                self._reranked += 1
+                self._latencies_ms.append((time.perf_counter() - started) * 1000)
+            else:
+                self._fallbacks[outcome] += 1
+
+    def rerank(self, query: str, documents: List[str], budget_ms: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Indices of documents from most to least relevant, or None when the
+        reranker is unavailable, fails, or exceeds the budget.
+        """
+        started = time.perf_counter()
+        if self.session is None:
+            # Never load inside the budget: start (or keep) the background load and fall back
+            self._record(started, "unavailable" if self.load_error is not None else "loading")
+            if self.load_error is None:
+                self.warm_up_in_background()
+            return None
+
+        run_options = ort.RunOptions()
+        future = self._executor.submit(self.score, query, documents, run_options)
+        budget = (budget_ms if budget_ms is not None else self.budget_ms) / 1000.0
+        try:
+            scores = future.result(timeout=max(0.0, budget - (time.perf_counter() - started)))
+        except FutureTimeoutError:
+            run_options.terminate = True  # stop the forward pass so it frees the worker
+            future.cancel()
+            self._record(started, "timeout")
+            return None
+        except Exception as e:
+            print(f"⚠️ Reranking failed, keeping vector order: {e}")
+            self._record(started, "error")
+            return None
+
+        self._record(started, "reranked")
+        return np.argsort(-scores, kind="stable")
+
+    def get_stats(self) -> dict:
+        """How often reranking ran, how often it fell back, and its latency"""
+        with self._stats_lock:
+            latencies = sorted(self._latencies_ms)
+            requests, reranked = self._requests, self._reranked
+            fallbacks = dict(self._fallbacks)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(int(p * len(latencies)), len(latencies) - 1)], 3)
+
+        return {
+            "enabled": self.enabled,
+            "model": RERANK_MODEL,
+            "variant": self.variant,
+            "loaded": self.session is not None,
+            "load_error": self.load_error,
+            "top_n": self.top_n,
+            "budget_ms": self.budget_ms,
+            "requests": requests,
+            "reranked": reranked,
+            "fallbacks": fallbacks,
+            "fallback_ratio": round(sum(fallbacks.values()) / requests, 4) if requests else 0.0,
+            "latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)},
+        }
+
+# Global instance
+reranker = CrossEncoderReranker()
@@ -0,0 +1,112 @@
+"""
+Request coalescing ("singleflight") for expensive calls.
+
+SingleFlight: concurrent in-process calls with the same key await one task
+and share its result. The task is shielded, so a caller that goes away (a
+client disconnect) does not cancel the work for everyone else. Results are
+shared objects; callers must not mutate them.
+
+RedisSingleFlight: across workers, one worker per key takes a Redis lock
+and computes while the others poll load() (e.g. the search result cache)
+for what it stored. When Redis is unavailable every worker computes alone.
+"""
+import os
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+from app.utils.cache import is_locked, release_lock, try_acquire_lock
+
+SINGLEFLIGHT_REDIS_ENABLED = os.getenv("SINGLEFLIGHT_REDIS_ENABLED", "false").lower() == "true"
+# The lock outlives a crashed owner by at most this long
+SINGLEFLIGHT_LOCK_SECONDS = float(os.getenv("SINGLEFLIGHT_LOCK_SECONDS", "30"))
+# How long another worker waits for the owner before computing itself
+SINGLEFLIGHT_WAIT_SECONDS = float(os.getenv("SINGLEFLIGHT_WAIT_SECONDS", "15"))
+SINGLEFLIGHT_POLL_SECONDS = float(os.getenv("SINGLEFLIGHT_POLL_SECONDS", "0.05"))
+
+T = TypeVar("T")
+
+_registry: List["SingleFlight"] = []
+
+class SingleFlight:
+    """One in-flight task per key; concurrent callers of do() share it"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"calls": 0, "executions": 0, "shared": 0}
+        _registry.append(self)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller went away
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        self._stats["calls"] += 1
+        task = self._calls.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self._stats["shared"] += 1
+        else:
+            self._stats["executions"] += 1
+            task = loop.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["in_flight"] = len(self._calls)
+        stats["shared_ratio"] = round(stats["shared"] / stats["calls"], 3) if stats["calls"] else 0.0
+        return stats
+
+class RedisSingleFlight:
+    """One worker per key computes; the others wait for its stored result"""
+
+    def __init__(self, lock_seconds: float = SINGLEFLIGHT_LOCK_SECONDS,
+                 wait_seconds: float = SINGLEFLIGHT_WAIT_SECONDS,
+                 poll_seconds: float = SINGLEFLIGHT_POLL_SECONDS):
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+        self._stats = {"owned": 0, "waited": 0, "shared": 0, "fallbacks": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]],
+                 load: Callable[[], Awaitable[Optional[T]]]) -> T:
+        """fn() must store its result where load() finds it before returning"""
+        lock = f"singleflight:{key}"
+        acquired, token = await try_acquire_lock(lock, self.lock_seconds)
+        if acquired:
+            self._stats["owned"] += 1
+            try:
+                return await fn()
+            finally:
+                await release_lock(lock, token)
+
+        self._stats["waited"] += 1
+        deadline = time.monotonic() + self.wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_seconds)
+            # Check the lock first: a result stored just before release is still seen
+            released = not await is_locked(lock)
+            result = await load()
+            if result is not None:
+                self._stats["shared"] += 1
+                return result
+            if released:
+                # The owner finished without storing anything (error, empty result)
+                break
+        self._stats["fallbacks"] += 1
+        return await fn()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats, enabled=SINGLEFLIGHT_REDIS_ENABLED)
+
+def get_all_stats() -> Dict[str, Any]:
+    """Stats of every SingleFlight in the process, by name"""
+    return {flight.name: flight.get_stats() for flight in _registry}
+
+# Global instance
+redis_singleflight = RedisSingleFlight()
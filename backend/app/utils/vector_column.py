@@ -0,0 +1,77 @@
+"""SQLAlchemy column type for expert embeddings: packed float32 bytea, or pgvector"""
+import os
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.types import LargeBinary, TypeDecorator, UserDefinedType
+
+EMBEDDING_DIM = 384
+
+# bytea | pgvector; must match what alembic revision 003 created for experts.embedding
+EXPERT_EMBEDDING_STORAGE = os.getenv("EXPERT_EMBEDDING_STORAGE", "bytea").lower()
+
+def pack_embedding(embedding) -> Optional[bytes]:
+    """Little-endian float32 bytes (dim * 4 of them) for an embedding"""
+    if embedding is None:
+        return None
+    return np.ascontiguousarray(embedding, dtype="<f4").tobytes()
+
+def unpack_embedding(data) -> Optional[np.ndarray]:
+    """Read-only float32 view over stored bytes: no parsing and no copy"""
+    if data is None:
+        return None
+    return np.frombuffer(data, dtype="<f4")
+
+def to_pgvector_literal(embedding) -> str:
+    return "[" + ",".join(map(repr, np.asarray(embedding, dtype=np.float32).tolist())) + "]"
+
+def from_pgvector_literal(text: str) -> np.ndarray:
+    return np.array(text.strip("[]").split(","), dtype=np.float32)
+
+class PGVector(UserDefinedType):
+    """pgvector's vector(n) column, spoken as its text format (no pgvector package needed)"""
+    cache_ok = True
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def get_col_spec(self, **kw) -> str:
+        return f"vector({self.dim})"
+
+class EmbeddingColumn(TypeDecorator):
+    """
+    Embedding stored as packed float32 bytea (any database), or as pgvector
+    on Postgres when EXPERT_EMBEDDING_STORAGE=pgvector. Values bind from any
+    array-like and load as float32 NumPy arrays.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dim: int = EMBEDDING_DIM, storage: str = EXPERT_EMBEDDING_STORAGE):
+        super().__init__()
+        self.dim = dim
+        self.storage = storage
+
+    def _uses_pgvector(self, dialect) -> bool:
+        return self.storage == "pgvector" and dialect.name == "postgresql"
+
+    def load_dialect_impl(self, dialect):
+        if self._uses_pgvector(dialect):
+            return dialect.type_descriptor(PGVector(self.dim))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if len(value) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-d embedding, got {len(value)}")
+        if self._uses_pgvector(dialect):
+            return to_pgvector_literal(value)
+        return pack_embedding(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return from_pgvector_literal(value)
+        return unpack_embedding(value)
@@ -0,0 +1,66 @@
+"""
+Allocations per query: list-of-floats embeddings vs. the float32 array path.
+
+"before" mimics the old flow: generate_embedding() boxes 384 Python floats,
+and the vector store converts the list back into an array. "after" uses
+generate_embedding_array() and hands the array straight through. Both read
+from a warm embedding cache, so only conversion overhead is measured.
+
+Usage (from backend/):
+    python benchmarks/bench_embedding_allocations.py [--queries 2000]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("EMBEDDING_CACHE_DIR", tempfile.mkdtemp(prefix="embedding_cache_"))
+
+import numpy as np
+from app.utils.embeddings import EmbeddingGenerator
+
+def before(generator: EmbeddingGenerator, query: str) -> np.ndarray:
+    embedding = generator.generate_embedding(query)
+    return np.asarray([embedding], dtype=np.float32)  # what the vector store did with it
+
+def after(generator: EmbeddingGenerator, query: str) -> np.ndarray:
+    return generator.generate_embedding_array(query)[None, :]
+
+def measure(name: str, path, generator: EmbeddingGenerator, queries):
+    for query in queries:  # warm caches and code paths
+        path(generator, query)
+
+    # Peak bytes allocated while serving one query: the boxed floats and list
+    # of the old path show up here even though they are freed right after
+    peaks = []
+    for query in queries[:200]:
+        tracemalloc.start()
+        result = path(generator, query)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del result
+
+    start = time.perf_counter()
+    for query in queries:
+        path(generator, query)
+    per_query_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    print(
+        f"{name:<8} {np.mean(peaks) / 1024:>7.1f} KiB allocated/query   {per_query_us:>8.1f} us/query"
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    generator = EmbeddingGenerator()
+    queries = [f"machine learning expert {i}" for i in range(args.queries)]
+    print(f"backend={generator.backend}, {len(queries)} distinct queries")
+    measure("before", before, generator, queries)
+    measure("after", after, generator, queries)
+
+if __name__ == "__main__":
+    main()
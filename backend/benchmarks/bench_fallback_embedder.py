@@ -0,0 +1,118 @@
+"""
+Benchmark the fallback embedders on a synthetic expert corpus.
+
+Compares the previous character-count/MD5 fallback with the hashed n-gram
+embedder on encode throughput and on retrieval recall: each query is built
+from part of one expert's profile (a couple of skills plus a title word, in
+random order) and counts as a hit when that expert ranks in the top k.
+
+Usage (from backend/):
+    python benchmarks/bench_fallback_embedder.py [--experts 5000] [--queries 500]
+"""
+import sys
+import os
+import time
+import random
+import hashlib
+import argparse
+from typing import List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.embeddings import HashedNgramEmbeddingGenerator
+
+FIRST_NAMES = ["Jane", "John", "Sarah", "Michael", "Emily", "Wei", "Priya", "Carlos", "Fatima", "Olga",
+               "Kenji", "Amara", "Lucas", "Ines", "Noah", "Maya", "Omar", "Lena", "Ravi", "Sofia"]
+LAST_NAMES = ["Smith", "Doe", "Johnson", "Chen", "Rodriguez", "Patel", "Kim", "Nguyen", "Garcia", "Muller",
+              "Rossi", "Okafor", "Tanaka", "Silva", "Cohen", "Novak", "Haddad", "Larsen", "Singh", "Moreau"]
+TITLES = ["Senior AI Researcher", "Professor of Computer Science", "Data Science Lead", "Staff Engineer",
+          "Principal Consultant", "Geospatial Engineer", "Security Architect", "Quantitative Analyst",
+          "Product Designer", "DevOps Manager", "Research Scientist", "Founder and CTO"]
+ORGS = ["Tech University", "Stanford University", "Big Tech Corp", "MIT", "Geospatial Tech Inc",
+        "Quant Capital", "CloudWorks", "BioAI Labs", "Fintech Partners", "Robotics Institute"]
+CITIES = ["San Francisco, CA", "Palo Alto, CA", "Seattle, WA", "Cambridge, MA", "Austin, TX",
+          "New York, NY", "London, UK", "Berlin, Germany", "Toronto, Canada", "Singapore"]
+SKILLS = ["Machine Learning", "Deep Learning", "NLP", "Computer Vision", "PyTorch", "TensorFlow",
+          "Python", "Go", "Rust", "Kubernetes", "Docker", "Terraform", "AWS", "GCP", "Azure",
+          "Distributed Systems", "Cloud Computing", "Data Engineering", "Spark", "Kafka",
+          "PostgreSQL", "MongoDB", "Redis", "GraphQL", "React", "TypeScript", "Blockchain",
+          "Solidity", "Cybersecurity", "Penetration Testing", "Reinforcement Learning",
+          "Time Series", "Algorithmic Trading", "Portfolio Optimization", "Statistics",
+          "Bayesian Inference", "GIS", "Remote Sensing", "Robotics", "Embedded Systems",
+          "Computational Biology", "Drug Discovery", "AI Ethics", "Recommender Systems",
+          "Search Ranking", "Information Retrieval", "Speech Recognition", "UX Research"]
+BIO_TEMPLATES = [
+    "Leading researcher in {a} and {b} with a focus on production systems",
+    "Specializing in {a}, {b} and large scale {c}",
+    "Expert in {a} who has shipped {b} products for a decade",
+    "Works on applied {a} and {b} problems in industry",
+]
+
+class LegacySimpleEmbeddingGenerator:
+    """The fallback embedder as it was before the hashed n-gram replacement"""
+
+    def _text_to_vector(self, text: str, dim: int = 384) -> List[float]:
+        if not text:
+            return [0.0] * dim
+        text = text.lower().strip()
+        features = [len(text) / 1000.0, len(text.split()) / 100.0]
+        char_counts = [0] * 26
+        for char in text:
+            if 'a' <= char <= 'z':
+                char_counts[ord(char) - ord('a')] += 1
+        total_chars = sum(char_counts) or 1
+        features.extend(count / total_chars for count in char_counts)
+        text_hash = hashlib.md5(text.encode()).hexdigest()
+        for i in range(dim - len(features)):
+            features.append(int(text_hash[i % len(text_hash)], 16) / 15.0)
+        return features[:dim]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.array([self._text_to_vector(text) for text in texts], dtype=np.float32)
+
+def build_corpus(num_experts: int, num_queries: int, seed: int = 7):
+    rng = random.Random(seed)
+    experts, queries, targets = [], [], []
+    for i in range(num_experts):
+        skills = rng.sample(SKILLS, 5)
+        title = rng.choice(TITLES)
+        bio = rng.choice(BIO_TEMPLATES).format(a=skills[0], b=skills[1], c=skills[2])
+        experts.append(" ".join([
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", title, rng.choice(ORGS),
+            bio, " ".join(skills), rng.choice(CITIES)
+        ]))
+        if len(queries) < num_queries:
+            parts = rng.sample(skills, 3) + [rng.choice(title.split())]
+            rng.shuffle(parts)
+            queries.append(" ".join(parts).lower())
+            targets.append(i)
+    return experts, queries, np.array(targets)
+
+def evaluate(name: str, encode, experts: List[str], queries: List[str], targets: np.ndarray, k: int):
+    start = time.perf_counter()
+    doc_vectors = encode(experts)
+    encode_seconds = time.perf_counter() - start
+    query_vectors = encode(queries)
+
+    def normalize(x):
+        return x / np.clip(np.linalg.norm(x, axis=1, keepdims=True), 1e-12, None)
+
+    scores = normalize(query_vectors) @ normalize(doc_vectors).T
+    top_k = np.argpartition(-scores, k, axis=1)[:, :k]
+    recall = float(np.mean([target in row for target, row in zip(targets, top_k)]))
+    print(f"{name:<24} {len(experts) / encode_seconds:>12,.0f} texts/s   recall@{k} {recall:.3f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--experts", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    experts, queries, targets = build_corpus(args.experts, args.queries)
+    print(f"{args.experts} experts, {len(queries)} queries")
+    evaluate("legacy char/md5", LegacySimpleEmbeddingGenerator().encode, experts, queries, targets, args.k)
+    evaluate("hashed n-gram", HashedNgramEmbeddingGenerator().encode, experts, queries, targets, args.k)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Recall@k and query latency of the HNSW backend against exact search.
+
+Builds an HNSWVectorIndex over the synthetic expert corpus (hashed n-gram
+embeddings, or an .npy matrix via --vectors), then sweeps ef_search and
+compares each query's top k with the exact NumpyVectorIndex answer. Also
+reports build rate and the cold-start time of reloading the saved graph.
+
+Usage (from backend/):
+    python benchmarks/bench_hnsw.py [--experts 20000] [--ef 16 32 64 128] [--implementation numpy]
+"""
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.services.hnsw_index import HNSWVectorIndex
+from app.services.vector_index import NumpyVectorIndex
+from app.utils.embeddings import HashedNgramEmbeddingGenerator
+from benchmarks.bench_fallback_embedder import build_corpus
+
+def run_queries(index, queries: np.ndarray, k: int):
+    found, timings = [], []
+    for query in queries:
+        started = time.perf_counter()
+        result = index.query(query[None, :], n_results=k, include=[])
+        timings.append((time.perf_counter() - started) * 1000)
+        found.append(result["ids"][0])
+    return found, np.array(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--experts", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--M", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=100)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--implementation", default="auto", help="auto | hnswlib | numpy")
+    parser.add_argument("--vectors", help=".npy float32 matrix to use instead of the synthetic corpus")
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+        queries = queries + rng.normal(0, 0.02, queries.shape).astype(np.float32)
+    else:
+        experts, query_texts, _ = build_corpus(args.experts, args.queries)
+        embedder = HashedNgramEmbeddingGenerator()
+        vectors, queries = embedder.encode(experts), embedder.encode(query_texts)
+    ids = [str(i) for i in range(len(vectors))]
+
+    exact_dir = tempfile.mkdtemp(prefix="bench_exact_")
+    hnsw_dir = tempfile.mkdtemp(prefix="bench_hnsw_")
+    try:
+        exact = NumpyVectorIndex(exact_dir, dim=vectors.shape[1])
+        exact.add(ids, embeddings=vectors)
+        expected, exact_ms = run_queries(exact, queries, args.k)
+        print(f"{len(vectors)} vectors, {len(queries)} queries")
+        print(f"exact            p50 {np.percentile(exact_ms, 50):7.2f} ms  p95 {np.percentile(exact_ms, 95):7.2f} ms")
+
+        started = time.perf_counter()
+        index = HNSWVectorIndex(hnsw_dir, dim=vectors.shape[1], M=args.M,
+                                ef_construction=args.ef_construction, implementation=args.implementation)
+        for start in range(0, len(ids), 1000):
+            index.add(ids[start:start + 1000], embeddings=vectors[start:start + 1000])
+        index.save()
+        build_seconds = time.perf_counter() - started
+        print(f"hnsw build       {index.implementation}, M={args.M}, ef_construction={args.ef_construction}: "
+              f"{len(ids) / build_seconds:,.0f} inserts/s")
+
+        for ef in args.ef:
+            index.ef_search = ef
+            found, timings = run_queries(index, queries, args.k)
+            recall = np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)])
+            print(f"hnsw ef={ef:<4}     p50 {np.percentile(timings, 50):7.2f} ms  p95 {np.percentile(timings, 95):7.2f} ms"
+                  f"  recall@{args.k} {recall:.3f}")
+
+        started = time.perf_counter()
+        reloaded = HNSWVectorIndex(hnsw_dir, dim=vectors.shape[1], implementation=args.implementation)
+        print(f"cold start       {(time.perf_counter() - started) * 1000:.0f} ms to load "
+              f"{reloaded.graph_size} graph nodes from {os.path.basename(reloaded.graph_path)}")
+    finally:
+        shutil.rmtree(exact_dir, ignore_errors=True)
+        shutil.rmtree(hnsw_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Recall@10 vs. memory for the quantized vector storage modes.
+
+Each mode stores the synthetic expert corpus in a QuantizedVectorIndex and is
+compared with exact float32 search: recall@k is the overlap between the
+index's top k and the exact top k, with and without full-precision rescoring.
+
+Embeddings come from the hashed n-gram embedder by default; pass --vectors
+with an .npy matrix (e.g. real MiniLM embeddings) to benchmark those instead.
+
+Usage (from backend/):
+    python benchmarks/bench_quantization.py [--experts 20000] [--queries 300]
+"""
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.services.vector_index import QUANTIZATION_MODES, QuantizedVectorIndex
+from app.utils.embeddings import HashedNgramEmbeddingGenerator
+from benchmarks.bench_fallback_embedder import build_corpus
+
+def recall_at_k(found, exact) -> float:
+    return float(np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, exact)]))
+
+def run_mode(mode: str, vectors: np.ndarray, queries: np.ndarray, exact, k: int, args):
+    path = tempfile.mkdtemp(prefix=f"bench_{mode}_")
+    try:
+        index = QuantizedVectorIndex(path, mode=mode, dim=vectors.shape[1], pca_dims=args.pca_dims,
+                                     min_train=len(vectors), rescore_factor=args.rescore_factor)
+        ids = [str(i) for i in range(len(vectors))]
+        for start in range(0, len(ids), 5000):
+            index.add(ids[start:start + 5000], embeddings=vectors[start:start + 5000])
+
+        results = {}
+        for label, factor in (("codes only", 1), ("rescored", args.rescore_factor)):
+            index.rescore_factor = factor
+            started = time.perf_counter()
+            found = [
+                [int(id_) for id_ in index.query(query[None, :], n_results=k, include=[])["ids"][0]]
+                for query in queries
+            ]
+            ms = (time.perf_counter() - started) / len(queries) * 1000
+            results[label] = (recall_at_k(found, exact), ms)
+
+        stats = index.memory_stats()
+        ratio = stats["float32_bytes"] / max(stats["code_bytes"], 1)
+        for label, (recall, ms) in results.items():
+            print(f"{mode:<9} {label:<11} {stats['bytes_per_vector']:>5} B/vec  {ratio:>5.1f}x smaller  "
+                  f"recall@{k} {recall:.3f}  {ms:6.2f} ms/query")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--experts", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--pca-dims", type=int, default=128)
+    parser.add_argument("--rescore-factor", type=int, default=10)
+    parser.add_argument("--vectors", help=".npy float32 matrix to use instead of the synthetic corpus")
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+        queries = queries + rng.normal(0, 0.02, queries.shape).astype(np.float32)
+    else:
+        experts, query_texts, _ = build_corpus(args.experts, args.queries)
+        embedder = HashedNgramEmbeddingGenerator()
+        vectors, queries = embedder.encode(experts), embedder.encode(query_texts)
+
+    vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    queries /= np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+    scores = queries @ vectors.T
+    exact = np.argsort(-scores, axis=1)[:, :args.k]
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, "
+          f"float32 = {vectors.shape[1] * 4} B/vec")
+    for mode in QUANTIZATION_MODES:
+        run_mode(mode, vectors, queries, exact, args.k, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark web-result classification: the per-keyword scans SearchService
+used to run against the precompiled single-pass ResultClassifier.
+
+Each synthetic result gets an article/ad check, a profile check and skill
+extraction from its snippet, as in SearchService._extract_expert_from_result.
+Also reports how often the two disagree (mostly the legacy substring matches
+such as "go" in "google" or "r" in "for").
+
+Usage (from backend/):
+    python benchmarks/bench_result_classifier.py [--results 100000]
+"""
+import sys
+import os
+import re
+import time
+import random
+import argparse
+from typing import Dict, List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.result_classifier import (
+    ARTICLE_SNIPPET_KEYWORDS, ARTICLE_TITLE_KEYWORDS, ARTICLE_URL_FRAGMENTS, PROFESSIONAL_INDICATORS,
+    PROFILE_URL_FRAGMENTS, SKILL_KEYWORDS, ResultClassifier, skill_display_name
+)
+
+NAMES = ["Jane Doe", "John Smith", "Wei Chen", "Priya Patel", "Carlos Garcia", "Amara Okafor", "Lena Novak"]
+TITLES = ["Senior Software Engineer", "Research Scientist", "Data Science Lead", "Founder and CTO",
+          "Professor of Computer Science", "Security Architect", "Product Designer"]
+URLS = ["https://www.linkedin.com/in/{slug}", "https://github.com/{slug}", "https://twitter.com/{slug}",
+        "https://scholar.google.com/citations?user={slug}", "https://{slug}.dev/resume",
+        "https://medium.com/@{slug}/how-i-learned", "https://www.forbes.com/sites/{slug}/2024/",
+        "https://example.com/blog/{slug}", "https://www.reddit.com/r/programming/{slug}"]
+FILLER = ["working on", "for the last decade", "at a growing startup", "across several teams",
+          "focused on production systems", "with a background in", "and open source", "in Seattle, WA"]
+ARTICLE_TITLES = ["How to hire a {skill} expert", "10 best {skill} consultants", "What is {skill}?",
+                  "The ultimate guide to {skill}"]
+
+class LegacyClassifier:
+    """SearchService's classification as it was before ResultClassifier"""
+
+    def __init__(self):
+        self.article_patterns = [re.escape(fragment) for fragment in ARTICLE_URL_FRAGMENTS]
+        self.expert_patterns = [re.escape(fragment) for fragment in PROFILE_URL_FRAGMENTS]
+
+    def is_article_or_ad(self, url: str, title: str, snippet: str) -> bool:
+        url_lower, title_lower, snippet_lower = url.lower(), title.lower(), snippet.lower()
+        for pattern in self.article_patterns:
+            if re.search(pattern, url_lower):
+                return True
+        for keyword in list(ARTICLE_TITLE_KEYWORDS):
+            if keyword in title_lower:
+                return True
+        if re.search(r'\d+\s+(best|top|great|amazing|essential)', title_lower):
+            return True
+        for pattern in list(ARTICLE_SNIPPET_KEYWORDS):
+            if pattern in snippet_lower:
+                return True
+        return False
+
+    def is_expert_profile(self, url: str, title: str, snippet: str) -> bool:
+        url_lower = url.lower()
+        for pattern in self.expert_patterns:
+            if re.search(pattern, url_lower):
+                return True
+        if re.match(r'^[A-Z][a-z]+\s+[A-Z][a-z]+', title):
+            title_and_snippet = (title + ' ' + snippet).lower()
+            for indicator in list(PROFESSIONAL_INDICATORS):
+                if indicator in title_and_snippet:
+                    return True
+        return False
+
+    def extract_skills(self, text: str) -> List[str]:
+        text_lower = text.lower()
+        skills = [skill_display_name(skill) for skill in list(SKILL_KEYWORDS) if skill in text_lower]
+        return list(set(skills))[:15]
+
+def build_results(count: int, seed: int = 11) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    results = []
+    for i in range(count):
+        skills = rng.sample(SKILL_KEYWORDS, 4)
+        name = rng.choice(NAMES)
+        if rng.random() < 0.2:
+            title = rng.choice(ARTICLE_TITLES).format(skill=skills[0])
+        else:
+            title = f"{name} - {rng.choice(TITLES)} - LinkedIn"
+        words = skills + rng.sample(FILLER, 3)
+        rng.shuffle(words)
+        results.append({
+            "url": rng.choice(URLS).format(slug=name.lower().replace(" ", "-") + str(i)),
+            "title": title,
+            "snippet": f"{name} is a {rng.choice(TITLES).lower()} " + " ".join(words) + ".",
+        })
+    return results
+
+def run_legacy(legacy: LegacyClassifier, results: List[Dict[str, str]]):
+    out = []
+    for r in results:
+        article = legacy.is_article_or_ad(r["url"], r["title"], r["snippet"])
+        profile = False if article else legacy.is_expert_profile(r["url"], r["title"], r["snippet"])
+        out.append((article, profile, set(legacy.extract_skills(r["snippet"])) if not article else set()))
+    return out
+
+def run_single_pass(classifier: ResultClassifier, results: List[Dict[str, str]]):
+    out = []
+    for r in results:
+        c = classifier.classify(r["url"], r["title"], r["snippet"])
+        out.append((c.is_article, c.is_profile, set(c.skills)))
+    return out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=100000)
+    args = parser.parse_args()
+
+    results = build_results(args.results)
+    legacy, classifier = LegacyClassifier(), ResultClassifier()
+
+    start = time.perf_counter()
+    legacy_out = run_legacy(legacy, results)
+    legacy_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    new_out = run_single_pass(classifier, results)
+    new_seconds = time.perf_counter() - start
+
+    print(f"{args.results:,} results")
+    print(f"{'legacy per-keyword scans':<26} {args.results / legacy_seconds:>12,.0f} results/s")
+    print(f"{'single-pass classifier':<26} {args.results / new_seconds:>12,.0f} results/s"
+          f"   ({legacy_seconds / new_seconds:.1f}x)")
+
+    article_diff = sum(a[0] != b[0] for a, b in zip(legacy_out, new_out))
+    profile_diff = sum(a[1] != b[1] for a, b in zip(legacy_out, new_out))
+    extra = sum(len(a[2] - b[2]) for a, b in zip(legacy_out, new_out))
+    missing = sum(len(b[2] - a[2]) for a, b in zip(legacy_out, new_out))
+    print(f"article flag differs on {article_diff}, profile flag on {profile_diff}")
+    print(f"skills only legacy found (substring false positives): {extra}; only single-pass found: {missing}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Query latency of the built-in vector index backends as the corpus grows.
+
+Random unit vectors are appended to a fresh index at each size, then single
+queries are timed (after a warm-up pass so the mapped file is in page cache).
+
+Usage (from backend/):
+    python benchmarks/bench_vector_index.py [--sizes 10000 100000 300000] [--queries 200]
+"""
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.services.vector_index import EMBEDDING_DIM, NumpyVectorIndex
+
+def random_unit_vectors(n: int, rng) -> np.ndarray:
+    vectors = rng.standard_normal((n, EMBEDDING_DIM), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def time_queries(index, queries: np.ndarray, k: int) -> np.ndarray:
+    for query in queries[:20]:
+        index.query(query[None, :], n_results=k, include=[])
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.query(query[None, :], n_results=k, include=[])
+        timings.append((time.perf_counter() - started) * 1000)
+    return np.array(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 300000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = random_unit_vectors(args.queries, rng)
+    path = tempfile.mkdtemp(prefix="bench_vector_index_")
+    try:
+        index = NumpyVectorIndex(path)
+        for size in sorted(args.sizes):
+            missing = size - index.count()
+            for start in range(0, missing, 50000):
+                batch = min(50000, missing - start)
+                index.add([f"e{index.count() + i}" for i in range(batch)],
+                          embeddings=random_unit_vectors(batch, rng))
+            timings = time_queries(index, queries, args.k)
+            print(f"numpy exact  {size:>9,} vectors   p50 {np.percentile(timings, 50):7.2f} ms   "
+                  f"p95 {np.percentile(timings, 95):7.2f} ms   p99 {np.percentile(timings, 99):7.2f} ms")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
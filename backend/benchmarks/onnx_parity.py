@@ -0,0 +1,82 @@
+"""
+Compare ONNX Runtime / OpenVINO embeddings against SentenceTransformer (torch) outputs.
+
+Usage (from backend/):
+    python benchmarks/onnx_parity.py [--variant model_quint8_avx2.onnx] [--openvino]
+
+Prints the minimum cosine similarity / max absolute difference per variant,
+the parity tolerance it is held to, and the encode latency of both paths.
+"""
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.utils.embeddings import (
+    EMBEDDING_MODEL, MODEL_CACHE_DIR, MODEL_DIR, OnnxEmbeddingEngine,
+    OpenVINOEmbeddingEngine, _is_model_file
+)
+
+SAMPLE_TEXTS = [
+    "machine learning",
+    "Dr. Jane Smith Senior AI Researcher Tech University Leading researcher in NLP",
+    "distributed systems and cloud computing expert, Kubernetes, Go",
+    "stock prediction with deep learning",
+    "geospatial analysis remote sensing GIS python",
+    "Andrew Ng",
+    "",
+]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variant", action="append", help="ONNX file(s) under onnx/ to check")
+    parser.add_argument("--openvino", action="store_true", help="also check the OpenVINO IRs")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    reference_model = SentenceTransformer(EMBEDDING_MODEL, cache_folder=MODEL_CACHE_DIR)
+    start = time.perf_counter()
+    reference = reference_model.encode(SAMPLE_TEXTS, convert_to_numpy=True)
+    torch_ms = (time.perf_counter() - start) * 1000
+    print(f"torch: {torch_ms:.1f} ms for {len(SAMPLE_TEXTS)} texts")
+
+    onnx_dir = os.path.join(MODEL_DIR, "onnx")
+    variants = args.variant or sorted(
+        name for name in os.listdir(onnx_dir)
+        if name.endswith(".onnx") and _is_model_file(os.path.join(onnx_dir, name))
+    )
+
+    engines = [(OnnxEmbeddingEngine, os.path.join(onnx_dir, name)) for name in variants]
+    if args.openvino:
+        openvino_dir = os.path.join(MODEL_DIR, "openvino")
+        engines += [
+            (OpenVINOEmbeddingEngine, os.path.join(openvino_dir, name))
+            for name in ("openvino_model.xml", "openvino_model_qint8_quantized.xml")
+        ]
+
+    for engine_class, path in engines:
+        name = os.path.basename(path)
+        try:
+            engine = engine_class(model_path=path)
+        except Exception as e:
+            print(f"{name}: skipped ({e})")
+            continue
+        engine.encode(SAMPLE_TEXTS[:1])  # warm-up
+        start = time.perf_counter()
+        vectors = engine.encode(SAMPLE_TEXTS)
+        onnx_ms = (time.perf_counter() - start) * 1000
+
+        cosine = (vectors * reference).sum(axis=1) / (
+            np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1) + 1e-12
+        )
+        max_abs = float(np.abs(vectors - reference).max())
+        status = "OK" if cosine.min() >= engine.tolerance else "FAIL"
+        print(
+            f"{name}: min cosine {cosine.min():.5f} (tolerance {engine.tolerance}), "
+            f"max |diff| {max_abs:.2e}, {onnx_ms:.1f} ms [{status}]"
+        )
+
+if __name__ == "__main__":
+    main()
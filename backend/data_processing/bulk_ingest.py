@@ -0,0 +1,219 @@
+"""
+Bulk expert ingestion: stream experts from JSONL/CSV, embed them on a process
+pool and write them to the vector store in large chunks.
+
+Usage (from backend/):
+    python -m data_processing.bulk_ingest experts.jsonl --source linkedin --workers 4
+
+Progress is checkpointed after every chunk that reaches the vector store, so
+re-running the same command after an interruption resumes where it stopped
+(use --restart to ignore the checkpoint).
+"""
+import sys
+import os
+import csv
+import json
+import time
+import uuid
+import argparse
+import multiprocessing as mp
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.models.expert import Expert
+from app.services.expert_service import ExpertService
+from app.services.vector_search import vector_search_service
+from app.utils.embeddings import EMBEDDING_BACKEND, EmbeddingGenerator
+
+# Set in each pool worker (or inherited from the parent when forking)
+_worker_generator: Optional[EmbeddingGenerator] = None
+
+def _init_worker(backend: str):
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = EmbeddingGenerator(backend)
+
+def _encode_shard(texts: List[str]) -> np.ndarray:
+    # Arrays pickle as one buffer, far cheaper to ship back than lists of floats
+    return _worker_generator.generate_embeddings_array(texts)
+
+def iter_expert_records(path: str) -> Iterator[Dict]:
+    """Stream expert dicts from a .jsonl or .csv file"""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                record = {key: value for key, value in row.items() if value not in (None, "")}
+                if isinstance(record.get("skills"), str):
+                    separator = ";" if ";" in record["skills"] else "|"
+                    record["skills"] = [s.strip() for s in record["skills"].split(separator) if s.strip()]
+                yield record
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+def record_to_expert(record: Dict) -> Expert:
+    record = dict(record)
+    # Stable ids make re-runs and resumes overwrite rather than duplicate
+    record.setdefault("id", str(uuid.uuid5(uuid.NAMESPACE_URL, json.dumps(record, sort_keys=True, default=str))))
+    now = datetime.utcnow()
+    record.setdefault("created_at", now)
+    record.setdefault("updated_at", now)
+    return Expert(**record)
+
+class Checkpoint:
+    """Number of input records already written to the vector store"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, input_path: str) -> int:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get("input") != os.path.abspath(input_path):
+            return 0
+        return int(data.get("records_done", 0))
+
+    def save(self, input_path: str, records_done: int):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "input": os.path.abspath(input_path),
+                "records_done": records_done,
+                "updated_at": datetime.utcnow().isoformat()
+            }, f)
+        os.replace(tmp_path, self.path)
+
+def _create_pool(workers: int, backend: str):
+    """
+    Model weights are shared copy-on-write with forked workers where that is
+    safe (torch, which is loaded but not yet run in the parent). ONNX Runtime
+    and OpenVINO sessions are not fork-safe, so those workers are spawned and
+    load their own (small, int8) model with one intra-op thread each.
+    """
+    global _worker_generator
+    parent = EmbeddingGenerator(backend)
+    if parent.backend in ("torch", "simple") and "fork" in mp.get_all_start_methods():
+        _worker_generator = parent
+        context = mp.get_context("fork")
+    else:
+        os.environ.setdefault("ONNX_NUM_THREADS", "1")
+        os.environ.setdefault("OPENVINO_NUM_REQUESTS", "1")
+        context = mp.get_context("spawn")
+    print(f"🔧 Embedding with {workers} {context.get_start_method()}ed worker(s), backend={parent.backend}")
+    return context.Pool(workers, initializer=_init_worker, initargs=(parent.backend,))
+
+def embed_chunk(pool, texts: List[str], batch_size: int) -> np.ndarray:
+    """Embed texts sorted by length (less padding per batch), returned in input order"""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    shards = [
+        [texts[i] for i in order[start:start + batch_size]]
+        for start in range(0, len(order), batch_size)
+    ]
+    sorted_vectors = np.concatenate(pool.map(_encode_shard, shards)) if shards else np.zeros((0, 0))
+    vectors = np.empty_like(sorted_vectors)
+    vectors[order] = sorted_vectors
+    return vectors
+
+def ingest(
+    path: str,
+    source: str = "linkedin",
+    workers: int = os.cpu_count() or 1,
+    batch_size: int = 64,
+    chunk_size: int = 2048,
+    checkpoint_path: Optional[str] = None,
+    restart: bool = False,
+    backend: str = EMBEDDING_BACKEND
+) -> Dict:
+    vector_search_service.init_collections()
+    expert_service = ExpertService()
+    checkpoint = Checkpoint(checkpoint_path or f"{path}.checkpoint.json")
+    skip = 0 if restart else checkpoint.load(path)
+    if skip:
+        print(f"↪️ Resuming after {skip} already-ingested records")
+
+    records = islice(iter_expert_records(path), skip, None)
+    done, written, unchanged, failed = skip, 0, 0, 0
+    started = time.perf_counter()
+
+    with _create_pool(workers, backend) as pool:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+
+            experts_by_source: Dict[str, List[Expert]] = {}
+            for record in chunk:
+                try:
+                    expert = record_to_expert(record)
+                except Exception as e:
+                    failed += 1
+                    print(f"⚠️ Skipping invalid record: {e}")
+                    continue
+                experts_by_source.setdefault(record.get("source", source), []).append(expert)
+
+            for expert_source, experts in experts_by_source.items():
+                rows = expert_service.add_experts(
+                    experts,
+                    source=expert_source,
+                    chunk_size=len(experts),
+                    embed=lambda texts: embed_chunk(pool, texts, batch_size)
+                )
+                errors = [row["error"] for row in rows if row["status"] == "failed"]
+                if errors:
+                    # Stop before checkpointing so a re-run retries this chunk
+                    raise RuntimeError(f"Failed to write {len(errors)} {expert_source} experts: {errors[0]}")
+                unchanged += sum(row["status"] == "unchanged" for row in rows)
+                written += len(rows) - sum(row["status"] == "unchanged" for row in rows)
+
+            done += len(chunk)
+            checkpoint.save(path, done)
+            elapsed = time.perf_counter() - started
+            print(f"📥 {done} records ({written} written, {unchanged} unchanged this run) - "
+                  f"{written / elapsed:,.1f} docs/sec")
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "records_done": done,
+        "written": written,
+        "unchanged": unchanged,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "docs_per_sec": round(written / elapsed, 1) if elapsed else 0.0
+    }
+    print(f"✅ Bulk ingest complete: {summary}")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load experts into the vector store")
+    parser.add_argument("path", help="experts .jsonl or .csv file")
+    parser.add_argument("--source", default="linkedin", help="collection for records without a 'source' field")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=64, help="texts per model call")
+    parser.add_argument("--chunk-size", type=int, default=2048, help="records per vector store write / checkpoint")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <path>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--backend", default=EMBEDDING_BACKEND, help="embedding backend")
+    args = parser.parse_args()
+
+    ingest(
+        args.path,
+        source=args.source,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+        backend=args.backend
+    )
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,25 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.models.expert import Expert
-from app.services.expert_service import expert_service
+from app.services.expert_service import ExpertService
+from app.services.vector_search import vector_search_service
+from datetime import datetime
 import uuid
 
+def sample_id(name: str) -> str:
+    """Stable ids, so re-running the generator updates instead of duplicating"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"sample-expert/{name}"))
+
 def generate_sample_data():
     """Generate sample expert data for testing"""
+    now = datetime.utcnow()
     
     sample_experts = [
         Expert(
-            id=str(uuid.uuid4()),
+            id=sample_id("Dr. Jane Smith"),
             name="Dr. Jane Smith",
+            created_at=now,
+            updated_at=now,
             title="Senior AI Researcher",
             organization="Tech University",
             location="San Francisco, CA",
@@ -25,8 +34,10 @@ def generate_sample_data():
             source="linkedin"
         ),
         Expert(
-            id=str(uuid.uuid4()),
+            id=sample_id("Prof. John Doe"),
             name="Prof. John Doe",
+            created_at=now,
+            updated_at=now,
             title="Professor of Computer Science",
             organization="Stanford University",
             location="Palo Alto, CA",
@@ -39,8 +50,10 @@ def generate_sample_data():
             source="scholar"
         ),
         Expert(
-            id=str(uuid.uuid4()),
+            id=sample_id("Sarah Johnson"),
             name="Sarah Johnson",
+            created_at=now,
+            updated_at=now,
             title="Data Science Lead",
             organization="Big Tech Corp",
             location="Seattle, WA",
@@ -53,8 +66,10 @@ def generate_sample_data():
             source="linkedin"
         ),
         Expert(
-            id=str(uuid.uuid4()),
+            id=sample_id("Dr. Michael Chen"),
             name="Dr. Michael Chen",
+            created_at=now,
+            updated_at=now,
             title="AI Ethics Researcher",
             organization="MIT",
             location="Cambridge, MA",
@@ -67,8 +82,10 @@ def generate_sample_data():
             source="scholar"
         ),
         Expert(
-            id=str(uuid.uuid4()),
+            id=sample_id("Emily Rodriguez"),
             name="Emily Rodriguez",
+            created_at=now,
+            updated_at=now,
             title="Geospatial AI Engineer",
             organization="Geospatial Tech Inc",
             location="Austin, TX",
@@ -82,12 +99,20 @@ def generate_sample_data():
         )
     ]
     
+    vector_search_service.init_collections()
+    expert_service = ExpertService()
+    names = {expert.id: expert.name for expert in sample_experts}
+    
+    # One batched embed + upsert per source instead of one round trip per expert
+    experts_by_source = {}
     for expert in sample_experts:
-        try:
-            expert_service.add_expert(expert, source=expert.source)
-            print(f"Added expert: {expert.name}")
-        except Exception as e:
-            print(f"Error adding expert {expert.name}: {e}")
+        experts_by_source.setdefault(expert.source, []).append(expert)
+    for source, experts in experts_by_source.items():
+        for row in expert_service.add_experts(experts, source=source):
+            if row["status"] == "failed":
+                print(f"Error adding expert {names[row['id']]}: {row['error']}")
+            else:
+                print(f"{row['status'].capitalize()} expert: {names[row['id']]}")
 
 if __name__ == "__main__":
     generate_sample_data()
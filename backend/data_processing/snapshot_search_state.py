@@ -0,0 +1,43 @@
+"""
+Write the search state (vectors, ids, metadata, BM25 postings and the
+similar-experts table) to one snapshot file that new API instances restore
+at startup instead of rebuilding (see app/services/search_snapshot.py).
+
+Usage (from backend/):
+    python -m data_processing.snapshot_search_state [--output search_snapshot.bin]
+"""
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.expert_service import ExpertService
+from app.services.search_snapshot import SEARCH_SNAPSHOT_PATH, write_snapshot
+from app.services.similar_experts import similar_experts_index
+from app.services.vector_search import vector_search_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot the search state into a single file")
+    parser.add_argument("--output", default=SEARCH_SNAPSHOT_PATH)
+    parser.add_argument("--skip-similar", action="store_true", help="don't refresh the similar-experts table first")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    vector_search_service.init_collections()
+    collections = {
+        source: collection for source, collection in (
+            ("linkedin", vector_search_service.linkedin_collection),
+            ("scholar", vector_search_service.scholar_collection),
+        ) if collection is not None
+    }
+    ExpertService()._load_keyword_index(collections)
+    if not args.skip_similar:
+        print(f"🔗 Similar-experts table: {similar_experts_index.sync(collections)}")
+
+    result = write_snapshot(args.output, collections)
+    print(f"✅ Wrote {result['path']}: {result['bytes'] / 1e6:.1f} MB, {result['counts']} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# Tests must not read or write the persistent embedding cache: hits from earlier
+# runs would hide embedder changes, and it would land in the working directory
+os.environ["EMBEDDING_CACHE"] = "false"
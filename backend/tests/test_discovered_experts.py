@@ -0,0 +1,81 @@
+import asyncio
+from app.services import search_service as search_module
+from app.services.discovered_experts import DiscoveredExpertIndexer, canonical_profile_url
+from app.services.search_service import SearchService
+from app.services.vector_index import NumpyVectorIndex
+
+def test_canonical_profile_url_collapses_variants():
+    assert canonical_profile_url("https://uk.linkedin.com/in/Jane-Doe/?trk=abc") == "https://linkedin.com/in/jane-doe"
+    assert canonical_profile_url("www.linkedin.com/in/jane-doe/details/experience") == "https://linkedin.com/in/jane-doe"
+    assert canonical_profile_url("https://x.com/JaneDoe/status/1") == "https://twitter.com/janedoe"
+    assert canonical_profile_url("https://scholar.google.com/citations?hl=en&user=AbC") == \
+        "https://scholar.google.com/citations?user=AbC"
+
+def test_discovered_profiles_are_stored_once_and_served_locally(tmp_path, monkeypatch):
+    service = SearchService()
+    service.expert_service._linkedin_collection = NumpyVectorIndex(str(tmp_path / "linkedin"))
+    service.expert_service._scholar_collection = NumpyVectorIndex(str(tmp_path / "scholar"))
+    indexer = DiscoveredExpertIndexer(expert_service=service.expert_service, flush_seconds=0.01)
+    result = {
+        "name": "Jane Doe", "title": "Machine learning engineer", "profile_type": "linkedin",
+        "skills": ["Python", "Machine Learning"], "bio": "Machine learning engineer building python ML systems",
+        "is_verified_profile": True,
+    }
+    web_results = [
+        dict(result, profile_url="https://www.linkedin.com/in/jane-doe/"),
+        dict(result, profile_url="https://de.linkedin.com/in/Jane-Doe?trk=x"),
+        dict(result, name=None, profile_url="https://example.com/article"),
+    ]
+    assert indexer.enqueue(web_results) == 2
+    indexer.join()
+    assert service.expert_service.linkedin_collection.count() == 1
+    assert indexer.get_stats()["added"] == 1
+
+    monkeypatch.setattr(search_module, "LOCAL_MIN_SIMILARITY", 0.1)
+    local = asyncio.run(service._search_local("python machine learning engineer", "all", 1, 0))
+    assert local["answered_from"] == "local_index"
+    assert local["experts"][0]["profile_url"] == "https://linkedin.com/in/jane-doe"
+    assert asyncio.run(service._search_local("python machine learning engineer", "github", 1, 0)) is None
+
+class L2Collection:
+    """A Chroma collection created without hnsw:space, which returns squared L2 distances"""
+    metadata = None
+
+    def __init__(self, vectors, metadatas):
+        self.vectors = vectors
+        self.metadatas = metadatas
+
+    def query(self, query_embeddings, n_results, include=None, where=None):
+        distances = ((self.vectors - query_embeddings[0]) ** 2).sum(axis=1)
+        order = distances.argsort()[:n_results]
+        return {
+            "ids": [[self.metadatas[i]["id"] for i in order]],
+            "distances": [[float(distances[i]) for i in order]],
+            "metadatas": [[self.metadatas[i] for i in order]],
+        }
+
+def test_local_threshold_uses_cosine_similarity_on_l2_collections(monkeypatch):
+    import numpy as np
+    from app.services import expert_service as expert_module
+    monkeypatch.setattr(expert_module, "HYBRID_BM25_WEIGHT", 0.0)
+    query = np.array([1.0, 0.0], dtype=np.float32)
+
+    async def embed(text):
+        return query
+
+    monkeypatch.setattr(expert_module.embedding_batcher, "embed", embed)
+    service = SearchService()
+    # cos 0.7 clears the 0.55 cutoff; cos 0.5 doesn't (squared L2 distances 0.6 and 1.0)
+    vectors = np.array([[0.7, np.sqrt(1 - 0.49)], [0.5, np.sqrt(1 - 0.25)]], dtype=np.float32)
+    metadatas = [
+        {"id": id_, "name": id_, "linkedin_url": f"https://linkedin.com/in/{id_}",
+         "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00"}
+        for id_ in ("close", "far")
+    ]
+    service.expert_service._linkedin_collection = L2Collection(vectors, metadatas)
+    service.expert_service._scholar_collection = None
+
+    local = asyncio.run(service._search_local("anything", "all", 1, 0))
+    assert [expert["id"] for expert in local["experts"]] == ["close"]
+    assert local["experts"][0]["match_score"] == 70
+    assert asyncio.run(service._search_local("anything", "all", 2, 0)) is None
@@ -0,0 +1,54 @@
+import asyncio
+import numpy as np
+from app.utils.embedding_batcher import EmbeddingBatcher
+
+class RecordingGenerator:
+    def __init__(self):
+        self.calls = []
+
+    def generate_embeddings_array(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+def test_concurrent_requests_are_batched():
+    generator = RecordingGenerator()
+    batcher = EmbeddingBatcher(generator, max_wait_ms=20, max_batch_size=4)
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed("x" * i) for i in range(10)))
+
+    results = asyncio.run(run())
+    assert [result.tolist() for result in results] == [[float(i)] for i in range(10)]
+    assert [len(call) for call in generator.calls] == [4, 4, 2]
+
+    stats = batcher.get_stats()
+    assert stats["requests"] == 10
+    assert stats["batches"] == 3
+    assert stats["batch_size"]["max"] == 4
+
+def test_batches_run_concurrently_up_to_workers():
+    import threading
+    import time
+
+    class SlowGenerator:
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.running = self.max_running = 0
+
+        def generate_embeddings_array(self, texts):
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(0.05)
+            with self.lock:
+                self.running -= 1
+            return np.zeros((len(texts), 1), dtype=np.float32)
+
+    generator = SlowGenerator()
+    batcher = EmbeddingBatcher(generator, max_wait_ms=1, max_batch_size=2, workers=2)
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed(f"text {i}") for i in range(8)))
+
+    assert len(asyncio.run(run())) == 8
+    assert generator.max_running == 2
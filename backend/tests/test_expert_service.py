@@ -0,0 +1,52 @@
+from datetime import datetime
+import numpy as np
+from app.models.expert import Expert
+from app.services.expert_service import ExpertService
+from app.services.vector_index import NumpyVectorIndex
+
+def make_expert(id_, **fields):
+    now = datetime.utcnow()
+    return Expert(id=id_, name=fields.pop("name", f"Expert {id_}"), created_at=now, updated_at=now, **fields)
+
+def test_add_experts_batches_and_skips_unchanged(tmp_path):
+    service = ExpertService()
+    service._linkedin_collection = NumpyVectorIndex(str(tmp_path), dim=8)
+    embed_calls = []
+
+    def embed(texts):
+        embed_calls.append(len(texts))
+        return np.random.default_rng(len(embed_calls)).normal(size=(len(texts), 8)).astype(np.float32)
+
+    experts = [make_expert(str(i), skills=["Python", "Go"]) for i in range(5)]
+    rows = service.add_experts(experts, source="linkedin", chunk_size=2, embed=embed)
+    assert [row["status"] for row in rows] == ["added"] * 5
+    assert embed_calls == [2, 2, 1]
+
+    experts[3] = make_expert("3", skills=["Rust"])
+    rows = service.add_experts(experts, source="linkedin", embed=embed)
+    assert [row["status"] for row in rows] == ["unchanged"] * 3 + ["updated", "unchanged"]
+    assert embed_calls[-1] == 1
+
+    stored = service._linkedin_collection.get(ids=["3"])["metadatas"][0]
+    assert service._expert_from_metadata(stored, "linkedin").skills == ["Rust"]
+    assert service._linkedin_collection.count() == 5
+
+def test_hybrid_search_keeps_the_fused_order(tmp_path, monkeypatch):
+    from app.services import expert_service
+    from app.services.bm25_index import BM25Index
+    monkeypatch.setattr(expert_service, "bm25_index", BM25Index())
+    monkeypatch.setattr(expert_service, "HYBRID_CANDIDATES", 3)
+    monkeypatch.setattr(expert_service, "HYBRID_BM25_WEIGHT", 2.0)
+    service = ExpertService()
+    service._linkedin_collection = NumpyVectorIndex(str(tmp_path), dim=8)
+
+    query = np.eye(8, dtype=np.float32)[0]
+    experts = [make_expert(str(i), skills=["Statistics"], experience_years=20, education_level="PhD")
+               for i in range(5)]
+    # Far from the query embedding and low credibility, but the only exact keyword match
+    experts.append(make_expert("torch", name="Ada Torch", skills=["PyTorch"]))
+    vectors = np.array([query + 0.1 * i for i in range(5)] + [np.eye(8, dtype=np.float32)[7]])
+    service.add_experts(experts, source="linkedin", embed=lambda texts: vectors[:len(texts)])
+
+    results = service._search_by_embedding(query, "linkedin", limit=3, query="pytorch")
+    assert [expert.id for expert in results] == ["torch", "0", "1"]
@@ -0,0 +1,49 @@
+import numpy as np
+from app.services.federated_search import FederatedQueryExecutor
+
+class FakeCollection:
+    def __init__(self, distances, fail=False):
+        self.distances = distances
+        self.fail = fail
+
+    def query(self, query_embeddings, n_results, include=None):
+        if self.fail:
+            raise RuntimeError("collection offline")
+        distances = self.distances[:n_results]
+        return {
+            "ids": [[f"id-{d}" for d in distances]],
+            "distances": [distances],
+            "metadatas": [[{"name": f"expert-{d}"} for d in distances]],
+        }
+
+def test_hits_are_merged_by_distance_across_sources():
+    executor = FederatedQueryExecutor(max_workers=2)
+    collections = {
+        "linkedin": FakeCollection([0.1, 0.4, 0.5, 0.9]),
+        "scholar": FakeCollection([0.2, 0.3, 0.8]),
+        "broken": FakeCollection([], fail=True),
+    }
+    hits, timings = executor.query(collections, np.zeros((1, 4), dtype=np.float32), n_results=4)
+
+    assert [(distance, source) for distance, source, _, _ in hits] == [
+        (0.1, "linkedin"), (0.2, "scholar"), (0.3, "scholar"), (0.4, "linkedin")
+    ]
+    assert timings["sources"]["linkedin"]["hits"] == 4
+    assert timings["sources"]["broken"]["error"] == "collection offline"
+
+def test_bm25_exact_terms_and_rrf_fusion():
+    from app.services.bm25_index import BM25Index
+    from app.services.federated_search import reciprocal_rank_fusion
+
+    index = BM25Index()
+    index.add("scholar", ["ng", "lecun"], ["Andrew Ng Stanford Machine Learning", "Yann LeCun Deep Learning"])
+    index.add("linkedin", ["dev"], ["Backend engineer PyTorch C++ node.js"])
+    assert [id_ for _, _, id_ in index.search("andrew ng", 5)] == ["ng"]
+    assert [id_ for _, _, id_ in index.search("c++ pytorch", 5)] == ["dev"]
+    assert index.search("learning", 5, sources=["linkedin"]) == []
+
+    index.add("scholar", ["ng"], ["Andrew Ng Coursera"])  # replaces the old document
+    assert [id_ for _, _, id_ in index.search("machine", 5)] == []
+
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], [1.0, 1.0], limit=2, k=60)
+    assert [key for key, _ in fused] == ["c", "a"]
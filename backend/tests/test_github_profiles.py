@@ -0,0 +1,69 @@
+import asyncio
+import time
+import httpx
+from app.services import search_service as search_module
+from app.services.github_profiles import GitHubProfileCache
+from app.services.search_service import SearchService
+
+class FakeGitHub:
+    """Answers /users/<name>; "ghost" is missing, everyone else has ETag "v1" """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, url, headers=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        username = url.rsplit("/", 1)[-1]
+        self.requests.append((username, (headers or {}).get("If-None-Match")))
+        if username == "ghost":
+            return httpx.Response(404)
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"login": username, "bio": f"{username} bio"}, headers={"ETag": '"v1"'})
+
+def make_service(monkeypatch, github, cache):
+    monkeypatch.setattr(search_module, "outbound_http", github)
+    service = SearchService()
+    service._profile_cache = cache
+    return service
+
+def test_profiles_are_cached_revalidated_with_etags_and_missing_users_remembered(monkeypatch):
+    github = FakeGitHub()
+    cache = GitHubProfileCache(ttl=60, missing_ttl=60)
+    service = make_service(monkeypatch, github, cache)
+
+    async def run():
+        first = await service._extract_github_profile("octo")
+        assert await service._extract_github_profile("octo") == first
+        assert await service._extract_github_profile("ghost") is None
+        assert await service._extract_github_profile("ghost") is None
+        # Expire the entry: the refetch is conditional and the 304 keeps the profile
+        cache._entries["octo"].expires_at = time.monotonic() - 1
+        assert await service._extract_github_profile("octo") == first
+        return first
+
+    assert asyncio.run(run())["bio"] == "octo bio"
+    assert github.requests == [("octo", None), ("ghost", None), ("octo", '"v1"')]
+    stats = cache.get_stats()
+    assert (stats["revalidated"], stats["missing"], stats["negative_hits"]) == (1, 1, 1)
+
+def test_enrichment_runs_concurrently_under_the_limit(monkeypatch):
+    github = FakeGitHub(delay=0.05)
+    monkeypatch.setattr(search_module, "GITHUB_ENRICH_CONCURRENCY", 3)
+    service = make_service(monkeypatch, github, GitHubProfileCache())
+    experts = [{"profile_type": "github", "username": f"user{i}"} for i in range(9)]
+    experts.append({"profile_type": "linkedin", "username": "not-github"})
+
+    start = time.perf_counter()
+    asyncio.run(service._enrich_with_github(experts))
+
+    assert time.perf_counter() - start < 0.4
+    assert github.max_in_flight == 3
+    assert [expert.get("bio") for expert in experts[:9]] == [f"user{i} bio" for i in range(9)]
+    assert "bio" not in experts[9]
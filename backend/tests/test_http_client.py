@@ -0,0 +1,39 @@
+import asyncio
+import httpx
+from app.utils.http_client import OutboundHTTPClient
+
+def make_client(handler, created=None):
+    def create():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        if created is not None:
+            created.append(client)
+        return client
+
+    outbound = OutboundHTTPClient()
+    outbound._create_client = create
+    return outbound
+
+def test_requests_share_one_client_and_are_counted_per_host():
+    outbound = make_client(lambda request: httpx.Response(200 if request.url.host == "api.github.com" else 503))
+
+    async def run():
+        await outbound.start()
+        client = outbound.client
+        codes = [(await outbound.get(f"https://api.github.com/users/{i}")).status_code for i in range(3)]
+        codes.append((await outbound.get("https://www.googleapis.com/customsearch/v1")).status_code)
+        assert outbound.client is client
+        await outbound.close()
+        return codes
+
+    assert asyncio.run(run()) == [200, 200, 200, 503]
+    hosts = outbound.get_stats()["hosts"]
+    assert hosts["api.github.com"]["requests"] == 3
+    assert hosts["www.googleapis.com"]["requests"] == 1
+    assert all(stats["in_flight"] == 0 for stats in hosts.values())
+
+def test_a_new_event_loop_gets_its_own_client():
+    created = []
+    outbound = make_client(lambda request: httpx.Response(200), created)
+    asyncio.run(outbound.get("https://api.clerk.com/v1/users"))
+    asyncio.run(outbound.get("https://api.clerk.com/v1/users"))
+    assert len(created) == 2
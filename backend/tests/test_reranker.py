@@ -0,0 +1,52 @@
+import time
+import numpy as np
+import pytest
+from app.utils.reranker import CrossEncoderReranker
+
+pytest.importorskip("onnxruntime")
+
+class StubEncoding:
+    ids = attention_mask = type_ids = [0]
+
+class StubTokenizer:
+    def encode_batch(self, pairs):
+        return [StubEncoding() for _ in pairs]
+
+class StubSession:
+    """Returns fixed scores after a delay, stopping early if the run is terminated"""
+
+    def __init__(self, scores, delay: float = 0.0):
+        self.scores = scores
+        self.delay = delay
+
+    def run(self, outputs, feeds, run_options=None):
+        deadline = time.perf_counter() + self.delay
+        while time.perf_counter() < deadline:
+            if run_options is not None and run_options.terminate:
+                raise RuntimeError("terminated")
+            time.sleep(0.005)
+        return [np.array(self.scores, dtype=np.float32)[:, None]]
+
+def loaded_reranker(session: StubSession) -> CrossEncoderReranker:
+    reranker = CrossEncoderReranker(model_dir="/nonexistent", enabled=True, budget_ms=50)
+    reranker.tokenizer, reranker.session, reranker.input_names = StubTokenizer(), session, set()
+    return reranker
+
+def test_rerank_within_budget_and_fallback_past_it():
+    documents = ["a", "b", "c"]
+    assert loaded_reranker(StubSession([0.1, 0.9, 0.5])).rerank("q", documents).tolist() == [1, 2, 0]
+
+    reranker = loaded_reranker(StubSession([0.1, 0.9, 0.5], delay=1.0))
+    started = time.perf_counter()
+    assert reranker.rerank("q", documents) is None  # caller keeps its original order
+    assert time.perf_counter() - started < 0.3
+    assert reranker.get_stats()["fallbacks"]["timeout"] == 1
+
+def test_unloaded_reranker_falls_back_without_loading_in_the_request():
+    reranker = CrossEncoderReranker(model_dir="/nonexistent", enabled=True, budget_ms=50)
+    assert reranker.rerank("q", ["a", "b"]) is None
+    assert reranker.get_stats()["fallbacks"]["loading"] == 1
+    reranker._warmup_thread.join(5)
+    assert reranker.load_error is not None
+    assert reranker.rerank("q", ["a", "b"]) is None
+    assert reranker.get_stats()["fallbacks"]["unavailable"] == 1
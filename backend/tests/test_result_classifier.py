@@ -0,0 +1,33 @@
+import re
+from app.services.result_classifier import ResultClassifier, trie_pattern
+
+def test_trie_pattern_prefers_the_longest_keyword():
+    pattern = re.compile(trie_pattern(["go", "golang", "google cloud"], whole_words=["go", "golang"]))
+    assert pattern.match("golang").group(0) == "golang"
+    assert pattern.match("google cloud").group(0) == "google cloud"
+    assert pattern.match("go fast").group(0) == "go"
+    assert pattern.match("google") is None
+
+def test_skills_match_whole_words_only():
+    classifier = ResultClassifier()
+    skills = classifier.extract_skills(
+        "Go and R developer at Google, R&D lead for the golang team; Google Cloud, C++, C#, Node.js, said"
+    )
+    assert skills == ["Go", "R", "Golang", "Google Cloud", "Cloud", "C++", "C#", "Node.js"]
+    assert classifier.extract_skills("Former director of a large organization") == []
+
+def test_classify_flags_articles_and_profiles():
+    classifier = ResultClassifier()
+    profile = classifier.classify(
+        "https://www.linkedin.com/in/jane-doe", "Jane Doe - Senior Engineer - LinkedIn",
+        "Machine learning and Kubernetes expert based in Seattle"
+    )
+    assert not profile.is_article and profile.is_profile
+    assert profile.skills == ["Machine Learning", "Kubernetes"]
+
+    assert classifier.classify("https://medium.com/@jane/x", "Jane Doe", "").is_article
+    assert classifier.classify("https://example.com", "10 best ML consultants", "").is_article
+    assert classifier.classify("https://example.com", "Jane Doe", "Read more about her work").is_article
+    # A name-like title needs a professional indicator to count as a profile
+    assert classifier.classify("https://example.com/x", "Jane Doe", "Director of AI").is_profile
+    assert not classifier.classify("https://example.com/x", "Jane Doe", "Loves hiking").is_profile
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from app.services import search_cache as cache_module
+from app.services.search_cache import SearchResultCache, search_cache_key
+
+def use_memory_store(monkeypatch):
+    store = {}
+
+    async def cache_result(key, data, ttl=3600):
+        store[key] = data
+
+    async def get_cached_result(key):
+        return store.get(key)
+
+    monkeypatch.setattr(cache_module, "cache_result", cache_result)
+    monkeypatch.setattr(cache_module, "get_cached_result", get_cached_result)
+    return store
+
+def test_near_identical_queries_share_a_key():
+    assert search_cache_key("Find Python experts in Berlin", "all", 10, 0) == \
+        search_cache_key("  berlin   python, python ", "ALL", 10, 0)
+    assert search_cache_key("python berlin", "all", 10, 0) != search_cache_key("python berlin", "all", 10, 10)
+    assert search_cache_key("python", "all", 10, 0, {"location": "Berlin"}) != search_cache_key("python", "all", 10, 0)
+
+def test_stale_entries_are_served_while_one_refresh_runs(monkeypatch):
+    store = use_memory_store(monkeypatch)
+    cache = SearchResultCache(fresh_seconds=60, stale_seconds=600)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"experts": [{"name": f"v{len(calls)}"}]}
+
+    async def run():
+        first = await cache.get_or_compute("k", compute)
+        fresh = await cache.get_or_compute("k", compute)
+        store["k"]["cached_at"] = time.time() - 120
+        stale = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(3)))
+        await asyncio.gather(*cache._refreshing.values())
+        refreshed = await cache.get_or_compute("k", compute)
+        return first, fresh, stale, refreshed
+
+    first, fresh, stale, refreshed = asyncio.run(run())
+    assert first["experts"][0]["name"] == "v1" and fresh["cache"] == "fresh"
+    assert all(result["cache"] == "stale" and result["experts"][0]["name"] == "v1" for result in stale)
+    assert refreshed["cache"] == "fresh" and refreshed["experts"][0]["name"] == "v2"
+    assert len(calls) == 2
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["stale_hits"], stats["refreshes"]) == (1, 3, 1)
+    assert stats["hit_ratio"] == round(5 / 6, 3)
+
+def test_slow_redis_does_not_block_the_event_loop(monkeypatch):
+    from app.utils import cache
+
+    class SlowRedis:
+        def get(self, key):
+            time.sleep(0.2)
+            return None
+
+    monkeypatch.setattr(cache, "redis_client", SlowRedis())
+    monkeypatch.setattr(cache, "_redis_down_until", 0.0)
+
+    async def run():
+        ticks = []
+
+        async def tick():
+            for _ in range(10):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(tick(), cache.get_cached_result("k"))
+        return max(b - a for a, b in zip(ticks, ticks[1:]))
+
+    assert asyncio.run(run()) < 0.1
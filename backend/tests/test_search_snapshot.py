@@ -0,0 +1,50 @@
+import pytest
+from app.services.bm25_index import BM25Index
+from app.services.metadata_filter import parse_filters
+from app.services.search_snapshot import SearchSnapshot, SnapshotCollection, SnapshotError, write_snapshot
+from app.services.similar_experts import SimilarExpertsIndex
+from app.services.vector_index import NumpyVectorIndex
+from tests.test_vector_index import random_vectors
+
+def test_snapshot_round_trip_and_checksums(tmp_path):
+    vectors = random_vectors(120)
+    ids = [f"e{i}" for i in range(120)]
+    texts = [f"expert {i} python" if i % 2 else f"expert {i} rust" for i in range(120)]
+    collection = NumpyVectorIndex(str(tmp_path / "linkedin"), dim=32)
+    collection.add(ids, embeddings=vectors, documents=texts,
+                   metadatas=[{"name": id_, "rating": float(i % 5)} for i, id_ in enumerate(ids)])
+    collection.delete(["e3"])
+    bm25 = BM25Index()
+    bm25.add("linkedin", ids, texts)
+    similar = SimilarExpertsIndex(str(tmp_path / "knn.npz"), k=4)
+    similar.sync({"linkedin": collection})
+    path = str(tmp_path / "snapshot.bin")
+    assert write_snapshot(path, {"linkedin": collection}, bm25, similar)["counts"] == {"linkedin": 119}
+
+    snapshot = SearchSnapshot(path)
+    assert snapshot.verify_payload()
+    restored = SnapshotCollection(snapshot, "linkedin")
+    where = parse_filters({"min_rating": 3})
+    for kwargs in ({}, {"where": where}):
+        expected = collection.query(vectors[:2], n_results=5, **kwargs)
+        assert restored.query(vectors[:2], n_results=5, **kwargs)["ids"] == expected["ids"]
+    assert restored.get(ids=["e7"])["metadatas"] == [{"name": "e7", "rating": 2.0}]
+
+    restored_bm25 = BM25Index()
+    restored_bm25.load_state(snapshot.group("bm25"))
+    assert restored_bm25.search("rust", 5) == bm25.search("rust", 5)
+    restored_bm25.add("linkedin", ["e1"], ["now rust"])  # postings copied on first write
+    assert ("linkedin", "e1") in [(s, i) for _, s, i in restored_bm25.search("rust", 200)]
+    restored_similar = SimilarExpertsIndex(str(tmp_path / "other.npz"), k=4)
+    restored_similar.load_state(snapshot.group("similar"))
+    assert restored_similar.get_similar("e10", 4) == similar.get_similar("e10", 4)
+
+    with open(path, "r+b") as f:
+        f.seek(-10, 2)
+        f.write(b"corrupted!")
+    assert not SearchSnapshot(path).verify_payload()
+    with open(path, "r+b") as f:
+        f.seek(60)
+        f.write(b"x")
+    with pytest.raises(SnapshotError):
+        SearchSnapshot(path)
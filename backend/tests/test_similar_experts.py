@@ -0,0 +1,56 @@
+import numpy as np
+from app.services import similar_experts
+from app.services.similar_experts import SimilarExpertsIndex
+from app.services.vector_index import NumpyVectorIndex
+from tests.test_vector_index import random_vectors
+
+def exact_neighbors(vectors, row, k):
+    scores = vectors @ vectors[row]
+    scores[row] = -np.inf
+    return list(np.argsort(-scores, kind="stable")[:k])
+
+def test_incremental_updates_match_brute_force(tmp_path, monkeypatch):
+    # Small blocks so the blocked merge paths are exercised
+    monkeypatch.setattr(similar_experts, "SIMILARITY_BLOCK_ROWS", 64)
+    monkeypatch.setattr(similar_experts, "SIMILARITY_BLOCK_COLS", 50)
+    vectors = random_vectors(400)
+    collection = NumpyVectorIndex(str(tmp_path / "index"), dim=32)
+    collection.add([f"e{i}" for i in range(300)], embeddings=vectors[:300])
+    table = SimilarExpertsIndex(str(tmp_path / "knn.npz"), k=5)
+    assert table.sync({"linkedin": collection})["mode"] == "full"
+
+    collection.add([f"e{i}" for i in range(300, 400)], embeddings=vectors[300:])
+    collection.upsert(["e3"], embeddings=vectors[250][None, :] + 0.01)
+    collection.delete(["e10"])
+    table.mark_changed("linkedin", ["e3"])
+    stats = table.sync({"linkedin": collection})
+    assert stats["mode"] == "incremental" and stats["recomputed"] == 101
+    assert stats["fetched"] == 101  # only the new and changed experts' embeddings
+
+    current = vectors.copy()
+    current[3] = vectors[250] + 0.01
+    current /= np.linalg.norm(current, axis=1, keepdims=True)
+    current[10] = 0  # deleted
+    reloaded = SimilarExpertsIndex(str(tmp_path / "knn.npz"), k=5)
+    for row in (0, 3, 250, 399):
+        found = [id_ for _, id_, _ in reloaded.get_similar(f"e{row}", limit=5)]
+        assert found == [f"e{i}" for i in exact_neighbors(current, row, 5)]
+    assert reloaded.get_similar("e10") == []
+
+def test_reloaded_table_updates_incrementally_from_stored_vectors(tmp_path):
+    vectors = random_vectors(201)
+    collection = NumpyVectorIndex(str(tmp_path / "index"), dim=32)
+    collection.add([f"e{i}" for i in range(200)], embeddings=vectors[:200])
+    SimilarExpertsIndex(str(tmp_path / "knn.npz"), k=5).sync({"linkedin": collection})
+
+    reloaded = SimilarExpertsIndex(str(tmp_path / "knn.npz"), k=5)
+    collection.add(["e200"], embeddings=vectors[200:])
+    stats = reloaded.sync({"linkedin": collection})
+    assert (stats["mode"], stats["fetched"], stats["recomputed"]) == ("incremental", 1, 1)
+    found = [id_ for _, id_, _ in reloaded.get_similar("e200", limit=5)]
+    assert found == [f"e{i}" for i in exact_neighbors(vectors, 200, 5)]
+
+    # Lookups and writes do not wait for a sync in progress
+    with reloaded._sync_lock:
+        reloaded.mark_changed("linkedin", ["e1"])
+        assert len(reloaded.get_similar("e1", limit=3)) == 3
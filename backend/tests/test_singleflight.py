@@ -0,0 +1,81 @@
+import asyncio
+from app.utils import singleflight as singleflight_module
+from app.utils.singleflight import RedisSingleFlight, SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight("test")
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.02)
+        return {"key": key}
+
+    async def run():
+        results = await asyncio.gather(
+            *(flights.do("python", lambda: compute("python")) for _ in range(5)),
+            flights.do("rust", lambda: compute("rust")),
+        )
+        # Finished flights are forgotten, so a later call runs again
+        later = await flights.do("python", lambda: compute("python"))
+        return results, later
+
+    results, later = asyncio.run(run())
+    assert calls == ["python", "rust", "python"]
+    assert all(result is results[0] for result in results[:5])
+    assert later == {"key": "python"}
+    stats = flights.get_stats()
+    assert (stats["calls"], stats["executions"], stats["shared"], stats["in_flight"]) == (7, 3, 4, 0)
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_call():
+    flights = SingleFlight("test-cancel")
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("k", compute))
+        second = asyncio.ensure_future(flights.do("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == 42
+
+def test_redis_waiters_pick_up_the_owners_result(monkeypatch):
+    locks, store = {}, {}
+
+    async def try_acquire_lock(name, ttl):
+        if name in locks:
+            return False, None
+        locks[name] = "token"
+        return True, "token"
+
+    async def release_lock(name, token):
+        locks.pop(name, None)
+
+    async def is_locked(name):
+        return name in locks
+
+    monkeypatch.setattr(singleflight_module, "try_acquire_lock", try_acquire_lock)
+    monkeypatch.setattr(singleflight_module, "release_lock", release_lock)
+    monkeypatch.setattr(singleflight_module, "is_locked", is_locked)
+    flights = RedisSingleFlight(poll_seconds=0.005)
+    calls = []
+
+    async def compute_and_store():
+        calls.append(1)
+        await asyncio.sleep(0.03)
+        store["k"] = "result"
+        return "result"
+
+    async def load():
+        return store.get("k")
+
+    async def run():
+        return await asyncio.gather(*(flights.do("k", compute_and_store, load) for _ in range(3)))
+
+    assert asyncio.run(run()) == ["result"] * 3
+    assert len(calls) == 1
+    assert flights.get_stats()["shared"] == 2
@@ -0,0 +1,50 @@
+from datetime import datetime
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.models.db_models import ExpertDB
+from app.services.sql_vector_search import SQLVectorSearch, sql_vector_search
+from tests.test_vector_index import random_vectors
+
+def test_packed_embeddings_round_trip_and_scan(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'experts.db'}")
+    ExpertDB.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    vectors = random_vectors(50, dim=384)
+    db.add_all([ExpertDB(id=f"e{i:02d}", name=f"Expert {i}", embedding=vectors[i]) for i in range(50)])
+    db.add(ExpertDB(id="no-embedding", name="Nobody"))
+    db.commit()
+
+    stored = db.execute(text("SELECT embedding FROM experts WHERE id = 'e07'")).scalar()
+    assert len(stored) == 384 * 4
+    loaded = db.query(ExpertDB).filter_by(id="e07").one().embedding
+    assert loaded.dtype == np.float32 and np.array_equal(loaded, vectors[7])
+
+    monkeypatch.setattr("app.services.sql_vector_search.SQL_SCAN_BATCH_ROWS", 8)
+    hits = SQLVectorSearch(storage="bytea").query(db, vectors[7], limit=5)
+    exact = np.argsort(-(vectors @ vectors[7]))[:5]
+    assert [id_ for _, id_ in hits] == [f"e{i:02d}" for i in exact]
+    assert abs(hits[0][0]) < 1e-5
+
+    sql_vector_search.save_embeddings(db, {"e07": vectors[8]})
+    assert sql_vector_search.query(db, vectors[8], limit=2)[1][1] in ("e07", "e08")
+
+def test_sql_fallback_reports_similarity(tmp_path, monkeypatch):
+    from app.services import expert_service
+    from app.services.expert_service import ExpertService
+    engine = create_engine(f"sqlite:///{tmp_path / 'experts.db'}")
+    ExpertDB.__table__.create(engine)
+    session = sessionmaker(bind=engine)
+    db = session()
+    vectors = random_vectors(10, dim=384)
+    now = datetime.utcnow()
+    db.add_all([ExpertDB(id=f"e{i}", name=f"Expert {i}", embedding=vectors[i],
+                         created_at=now, updated_at=now) for i in range(10)])
+    db.commit()
+    monkeypatch.setattr(expert_service, "SessionLocal", session)
+    monkeypatch.setattr(expert_service, "sql_vector_search", SQLVectorSearch(storage="bytea"))
+
+    results = ExpertService()._search_sql(vectors[3], limit=3)
+    assert results[0].id == "e3" and abs(results[0].similarity - 1.0) < 1e-5
+    assert [round(expert.similarity, 4) for expert in results[1:]] == \
+        sorted((round(float(vectors[i] @ vectors[3]), 4) for i in range(10) if i != 3), reverse=True)[:2]
@@ -0,0 +1,153 @@
+import json
+import numpy as np
+from app.services.vector_index import NumpyVectorIndex, QuantizedVectorIndex
+
+def random_vectors(n, dim=32, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_quantized_index_rescoring_and_persistence(tmp_path):
+    vectors = random_vectors(500)
+    ids = [f"expert-{i}" for i in range(len(vectors))]
+    index = QuantizedVectorIndex(str(tmp_path), mode="pca_int8", dim=32, pca_dims=8, min_train=200)
+    index.add(ids, embeddings=vectors, metadatas=[{"name": id_} for id_ in ids], documents=ids)
+    assert index.is_trained
+    assert index.bytes_per_vector == 8
+
+    result = index.query(vectors[42][None, :], n_results=5)
+    assert result["ids"][0][0] == "expert-42"
+    assert result["metadatas"][0][0] == {"name": "expert-42"}
+    assert abs(result["distances"][0][0]) < 1e-5
+
+    index.upsert(["expert-42"], embeddings=vectors[7][None, :], metadatas=[{"name": "moved"}])
+    index.delete(["expert-7"])
+
+    reopened = QuantizedVectorIndex(str(tmp_path), mode="pca_int8", dim=32, pca_dims=8, min_train=200)
+    assert reopened.count() == 499
+    result = reopened.query(vectors[7][None, :], n_results=3)
+    assert result["ids"][0][0] == "expert-42"
+    assert result["metadatas"][0][0] == {"name": "moved"}
+    assert "expert-7" not in result["ids"][0]
+
+def test_numpy_index_exact_top_k_and_shared_reader(tmp_path):
+    vectors = random_vectors(300)
+    writer = NumpyVectorIndex(str(tmp_path), dim=32)
+    reader = NumpyVectorIndex(str(tmp_path), dim=32, read_only=True)
+    writer.add([f"e{i}" for i in range(200)], embeddings=vectors[:200])
+
+    exact = np.argsort(-(vectors[:200] @ vectors[5]))[:10]
+    result = reader.query(vectors[5][None, :], n_results=10, include=["distances"])
+    assert result["ids"][0] == [f"e{i}" for i in exact]
+    assert result["distances"][0] == sorted(result["distances"][0])
+
+    # Rows appended by another process become visible to the reader
+    writer.add([f"e{i}" for i in range(200, 300)], embeddings=vectors[200:])
+    writer.delete(["e250"])
+    assert reader.count() == 299
+    assert reader.query(vectors[260][None, :], n_results=1)["ids"][0] == ["e260"]
+    assert "e250" not in reader.query(vectors[250][None, :], n_results=5)["ids"][0]
+
+def test_hnsw_index_incremental_delete_and_reload(tmp_path):
+    from app.services.hnsw_index import HNSWVectorIndex
+    vectors = random_vectors(400)
+    index = HNSWVectorIndex(str(tmp_path), dim=32, M=8, ef_construction=50, ef_search=50, implementation="numpy")
+    index.add([f"e{i}" for i in range(300)], embeddings=vectors[:300])
+    index.add([f"e{i}" for i in range(300, 400)], embeddings=vectors[300:])
+    assert index.graph_size == 400
+    assert index.query(vectors[350][None, :], n_results=1)["ids"][0] == ["e350"]
+
+    index.delete(["e350"])
+    index.save()
+    reloaded = HNSWVectorIndex(str(tmp_path), dim=32, ef_search=50, implementation="numpy")
+    assert reloaded.graph_size == 400
+    exact = [f"e{i}" for i in np.argsort(-(vectors @ vectors[10]))[:5]]
+    assert reloaded.query(vectors[10][None, :], n_results=5)["ids"][0] == exact
+    assert "e350" not in reloaded.query(vectors[350][None, :], n_results=5)["ids"][0]
+
+def test_filtered_query_matches_brute_force_on_both_plans(tmp_path, monkeypatch):
+    from app.services import vector_index
+    from app.services.metadata_filter import matches, parse_filters
+    vectors = random_vectors(400)
+    rng = np.random.default_rng(1)
+    metadatas = [{
+        "location": str(rng.choice(["San Francisco, CA", "New York", "London, UK"])),
+        "skills": json.dumps(list(rng.choice(["Python", "Go", "R", "Rust"], size=2, replace=False))),
+        "rating": float(rng.integers(1, 6)),
+    } for _ in vectors]
+    index = NumpyVectorIndex(str(tmp_path), dim=32)
+    index.add([f"e{i}" for i in range(300)], embeddings=vectors[:300], metadatas=metadatas[:300])
+    filters = parse_filters({"location": "san francisco", "skills": ["go", "r"], "min_rating": 4})
+    index.query(vectors[0][None, :], n_results=1, where=filters)  # builds the filter index
+    index.add([f"e{i}" for i in range(300, 400)], embeddings=vectors[300:], metadatas=metadatas[300:])
+    index.delete(["e5"])
+
+    allowed = [i for i in range(400) if i != 5 and matches(metadatas[i], filters)]
+    exact = [f"e{allowed[i]}" for i in np.argsort(-(vectors[allowed] @ vectors[7]))[:10]]
+    for brute_force_rows in (10000, 0):
+        monkeypatch.setattr(vector_index, "FILTER_BRUTE_FORCE_ROWS", brute_force_rows)
+        monkeypatch.setattr(vector_index, "FILTER_BRUTE_FORCE_FRACTION", 0.0)
+        result = index.query(vectors[7][None, :], n_results=10, where=filters)
+        assert result["ids"][0] == exact
+
+def test_invalid_ratings_in_filters_and_metadata(tmp_path):
+    import pytest
+    from app.services.metadata_filter import InvalidFilterError, matches, parse_filters
+    with pytest.raises(InvalidFilterError):
+        parse_filters({"min_rating": "abc"})
+    filters = parse_filters({"min_rating": "4"})
+    assert filters == {"min_rating": 4.0}
+    # A stored rating that is not a number counts as unrated instead of raising
+    assert not matches({"rating": "n/a"}, filters)
+    index = NumpyVectorIndex(str(tmp_path), dim=32)
+    index.add(["a", "b"], embeddings=random_vectors(2), metadatas=[{"rating": "n/a"}, {"rating": 5}])
+    assert index.query(random_vectors(1), n_results=2, where=filters)["ids"][0] == ["b"]
+
+def test_hnsw_queries_are_safe_during_inserts(tmp_path):
+    import threading
+    from app.services.hnsw_index import HNSWVectorIndex
+    vectors = random_vectors(600)
+    index = HNSWVectorIndex(str(tmp_path), dim=32, M=8, ef_construction=30, ef_search=30, implementation="numpy")
+    index.add([f"e{i}" for i in range(50)], embeddings=vectors[:50])
+    errors = []
+
+    def query():
+        try:
+            for i in range(200):
+                index.query(vectors[i % 50][None, :], n_results=5)
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=query) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    for start in range(50, 600, 10):
+        index.add([f"e{i}" for i in range(start, start + 10)], embeddings=vectors[start:start + 10])
+    for reader in readers:
+        reader.join()
+    assert errors == []
+    assert index.graph_size == 600
+
+def test_exact_queries_are_safe_during_inserts(tmp_path, monkeypatch):
+    import threading
+    from app.services import vector_index
+    monkeypatch.setattr(vector_index, "SCORE_BLOCK_ROWS", 16)  # many blocks per query
+    vectors = random_vectors(2000)
+    index = NumpyVectorIndex(str(tmp_path), dim=32)
+    index.add([f"e{i}" for i in range(100)], embeddings=vectors[:100])
+    errors = []
+
+    def query():
+        try:
+            for i in range(300):
+                index._search_many(vectors[i % 100][None, :], 5)
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=query) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    for start in range(100, 2000, 5):
+        index.add([f"e{i}" for i in range(start, start + 5)], embeddings=vectors[start:start + 5])
+    for reader in readers:
+        reader.join()
+    assert errors == []